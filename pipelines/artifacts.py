@@ -0,0 +1,282 @@
+"""
+Artifact Store
+Content-addressed blob storage shared by all pipeline runs
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+
+DEFAULT_STORE_DIR = "outputs/.store"
+
+
+def _zstd():
+    """The optional zstandard module, or None if it isn't installed"""
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+class ArtifactStore:
+    """
+    Writes each distinct blob once, named by its SHA-256.
+
+    Run directories get files as hardlinks to stored blobs, so identical
+    outputs across runs (or across stages of one run) share one copy on
+    disk. Blobs that are only ever referenced by digest, such as raw model
+    responses, can additionally be zstd-compressed; blobs materialized into
+    run directories are kept uncompressed so they can be hardlinked.
+
+    Stored blobs are read-only. Files linked into run directories must be
+    replaced (write_file does this), never rewritten in place; export_run
+    turns a run into private copies that are safe to edit. Nothing is
+    deleted automatically, gc removes blobs no manifest refers to.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, compression: Optional[str] = None, level: int = 3):
+        """
+        Args:
+            root: Store directory
+            compression: "zstd" to compress referenced-only blobs, or None
+            level: zstd compression level
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.level = level
+        self.compression = compression if compression and compression != "none" else None
+
+        if self.compression == "zstd" and _zstd() is None:
+            print("  ⚠ zstandard is not installed, storing blobs uncompressed")
+            self.compression = None
+        elif self.compression not in (None, "zstd"):
+            raise ValueError(f"Unsupported artifact compression: {compression}")
+
+    @classmethod
+    def from_config(cls, settings: Dict) -> Optional["ArtifactStore"]:
+        """Store for an "artifacts" config section, or None if disabled"""
+        if not settings.get("enabled", False):
+            return None
+        return cls(
+            root=settings.get("store_dir", DEFAULT_STORE_DIR),
+            compression=settings.get("compression"),
+            level=settings.get("level", 3)
+        )
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return "sha256:" + hashlib.sha256(data).hexdigest()
+
+    def _blob_path(self, digest: str, compressed: bool = False) -> Path:
+        hexdigest = digest.split(":", 1)[1]
+        return self.root / hexdigest[:2] / (hexdigest + (".zst" if compressed else ""))
+
+    def _write_blob(self, path: Path, data: bytes):
+        """Write a blob atomically (concurrent writers of the same blob are harmless)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def _touch(path: Path) -> bool:
+        """Refresh a blob's mtime; False if it doesn't exist"""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        except OSError:
+            # Not ours to touch (shared store), but present
+            pass
+        return True
+
+    def put(self, data: bytes, compress: bool = False) -> str:
+        """
+        Store a blob unless it is already present
+
+        A blob that is already present has its mtime refreshed, so gc treats
+        it as just written until the new run's manifest names it.
+
+        Args:
+            data: Blob contents
+            compress: Compress with the configured codec (referenced-only blobs)
+
+        Returns:
+            Blob digest ("sha256:<hex>")
+        """
+        digest = self.digest(data)
+        if self._touch(self._blob_path(digest)) or self._touch(self._blob_path(digest, True)):
+            return digest
+
+        if compress and self.compression == "zstd":
+            data = _zstd().ZstdCompressor(level=self.level).compress(data)
+            self._write_blob(self._blob_path(digest, True), data)
+        else:
+            self._write_blob(self._blob_path(digest), data)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Read a blob, decompressing if it was stored compressed"""
+        path = self._blob_path(digest)
+        if path.exists():
+            return path.read_bytes()
+
+        compressed = self._blob_path(digest, True)
+        if compressed.exists():
+            codec = _zstd()
+            if codec is None:
+                raise RuntimeError(f"Blob {digest} is zstd-compressed; install zstandard to read it")
+            return codec.ZstdDecompressor().decompress(compressed.read_bytes())
+
+        raise FileNotFoundError(f"Blob not in artifact store: {digest}")
+
+    def put_text(self, text: str) -> str:
+        """Store a referenced-only text blob (compressed when enabled)"""
+        return self.put(text.encode("utf-8"), compress=True)
+
+    def get_text(self, digest: str) -> str:
+        return self.get(digest).decode("utf-8")
+
+    def write_file(self, dest: Path, data: bytes) -> str:
+        """
+        Materialize data at dest as a hardlink to its blob
+
+        Any existing file at dest is replaced, not overwritten, so other
+        links to its old blob are untouched. Falls back to a copy where
+        hardlinks are not supported.
+
+        Returns:
+            Blob digest
+        """
+        # put refreshes the mtime of a blob that is already stored
+        digest = self.put(data, compress=False)
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            # Stored compressed by an earlier put_text; keep an uncompressed copy for linking
+            self._write_blob(blob, data)
+
+        dest = Path(dest)
+        temp_path = dest.with_name(f".tmp_{dest.name}")
+        if temp_path.exists():
+            os.remove(temp_path)
+        try:
+            os.link(blob, temp_path)
+        except OSError:
+            shutil.copyfile(blob, temp_path)
+        os.replace(temp_path, dest)
+        return digest
+
+    def gc(self, outputs_dirs: Iterable[str] = ("outputs",), min_age_seconds: float = 3600.0,
+           dry_run: bool = False) -> Dict:
+        """
+        Delete blobs that no run manifest refers to
+
+        Every manifest.json under outputs_dirs counts as a reference, so runs
+        kept elsewhere must be listed too. Blobs newer than min_age_seconds
+        are kept, since a running pipeline stores blobs before its manifest
+        names them.
+
+        Returns:
+            Dict with blobs_kept, blobs_removed and bytes_freed
+        """
+        referenced = _referenced_digests(outputs_dirs, self.root)
+        cutoff = time.time() - min_age_seconds
+        kept = removed = freed = 0
+        for path in self.root.glob("??/*"):
+            hexdigest = path.name.split(".")[0]
+            if path.name.startswith(".tmp_"):
+                # Left behind by an interrupted write
+                unused = True
+            else:
+                unused = f"sha256:{hexdigest}" not in referenced
+            info = path.stat()
+            if not unused or info.st_mtime > cutoff:
+                kept += 1
+                continue
+            removed += 1
+            freed += info.st_size
+            if not dry_run:
+                os.remove(path)
+        return {"blobs_kept": kept, "blobs_removed": removed, "bytes_freed": freed}
+
+
+def _referenced_digests(outputs_dirs: Iterable[str], store_root: Path) -> Set[str]:
+    """Digests named by any manifest.json under the given directories"""
+    referenced = set()
+    store_root = store_root.resolve()
+    for outputs_dir in outputs_dirs:
+        for manifest_path in Path(outputs_dir).rglob("manifest.json"):
+            if store_root in manifest_path.resolve().parents:
+                continue
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+            referenced.update(manifest.get("files", {}).values())
+            referenced.update(manifest.get("blobs", []))
+    return referenced
+
+
+def _inline_raw_responses(data: Any, store: ArtifactStore) -> Any:
+    """Replace every raw_response_blob reference with the raw_response text"""
+    if isinstance(data, list):
+        return [_inline_raw_responses(item, store) for item in data]
+    if not isinstance(data, dict):
+        return data
+    inlined = {}
+    for key, value in data.items():
+        if key == "raw_response_blob":
+            inlined["raw_response"] = store.get_text(value)
+        else:
+            inlined[key] = _inline_raw_responses(value, store)
+    return inlined
+
+
+def export_run(run_dir: str) -> int:
+    """
+    Make a run directory independent of the artifact store
+
+    Each run file becomes a private, writable copy, raw responses are
+    written back inline as raw_response, and manifest.json is removed, so
+    the run can be edited, archived or moved to another machine and its
+    blobs become collectable by gc.
+
+    Returns:
+        Number of run files rewritten
+    """
+    run_dir = Path(run_dir)
+    manifest_path = run_dir / "manifest.json"
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+    store = ArtifactStore(manifest["store"])
+
+    # Read everything first, so a missing blob leaves the run untouched
+    contents = {}
+    for filename in manifest.get("files", {}):
+        data = (run_dir / filename).read_bytes()
+        if filename.endswith(".json"):
+            data = json.dumps(_inline_raw_responses(json.loads(data), store), indent=2).encode("utf-8")
+        contents[filename] = data
+
+    for filename, data in contents.items():
+        dest = run_dir / filename
+        temp_path = dest.with_name(f".tmp_{dest.name}")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, dest)
+
+    os.remove(manifest_path)
+    return len(contents)
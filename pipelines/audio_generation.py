@@ -4,23 +4,37 @@ Processes shot lists to generate dialogue and sound effects with refined timing
 """
 
 import os
+import base64
 import json
+import queue
 import re
 import shutil
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional
 import yaml
 import anthropic
 from elevenlabs import ElevenLabs
-import librosa
-import numpy as np
-import soundfile as sf
 import time
-from pydub import AudioSegment
-from pydub.generators import Sine
 
 from .base_pipeline import BasePipeline
+from .duration_model import SpeechDurationModel, text_features
+from .hedging import LatencyTracker, backoff_delay, hedged_stream
+from .journal import ShotJournal
+from .records import DialogueRender, SfxRecord, ShotRecord, shots_to_json
+from .scheduling import format_schedule, run_longest_first, shot_cost
+from .shot_list import build_enhanced_shot_list, load_shots
+from .timing_engine import LocalTimingEngine, estimate_sfx_duration
+from .transport import pool_stats, shared_clients
+from .tts_stream import StreamDurationTracker, alignment_to_words
+
+
+# Shared opening of the dialogue compression system prompts
+REWRITE_SPECIALIST_PROMPT = """You are a dialogue rewrite specialist. If a line of dialogue exceeds 10 seconds after being voiced by a tts engine, it will get sent to you and you will be responsible for rewriting it so that when it gets sent back to the tts engine it's shorter. You need to try your best not to change the meaning of the line or anything crucial because you wont have any context about how it needs to function within the content. all text in [square brackets] in the dialogue must remain unchanged (those are annotations for the tts engine and dont effect length)."""
 
 
 class AudioGenerationPipeline(BasePipeline):
@@ -29,7 +43,8 @@ class AudioGenerationPipeline(BasePipeline):
     Includes dialogue compression, SFX generation, and timing refinement
     """
 
-    def __init__(self, config_path: str, shot_list_path: str, start_stage: int = 1):
+    def __init__(self, config_path: str, shot_list_path: str, start_stage: int = 1,
+                 output_dir: Optional[str] = None, shard: Optional[Tuple[int, int]] = None):
         """
         Initialize audio generation pipeline
 
@@ -37,26 +52,102 @@ class AudioGenerationPipeline(BasePipeline):
             config_path: Path to audio_generation.yaml config
             shot_list_path: Path to shot list JSON from pitch_to_shotlist pipeline
             start_stage: Which stage to start from (for recovery)
+            output_dir: Previous run directory to resume (reuses clips from its checkpoint journal)
+            shard: (index, count) to process only every count-th shot, starting at shot
+                index (1-based); merge the shards with ShardMerge (run_audio_generation.py --merge)
         """
-        super().__init__(config_path, "audio_generation", start_stage)
-
+        # Set before base init, which registers the run under the shot list's show
         self.shot_list_path = shot_list_path
+        self.shard = shard
+        super().__init__(config_path, "audio_generation", start_stage, output_dir)
+
         self.shot_list_data = None
 
-        # Initialize clients
+        # Initialize clients on shared pooled transports (pre-warmed in the background)
+        http_clients = shared_clients(["anthropic", "elevenlabs"], self.config.get("http", {}))
         self.anthropic_client = anthropic.Anthropic(
-            api_key=os.getenv("ANTHROPIC_API_KEY")
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            http_client=http_clients["anthropic"]
         )
         self.elevenlabs_client = ElevenLabs(
-            api_key=os.getenv("ELEVENLABS_API_KEY") or self.config.get("elevenlabs_api_key")
+            api_key=os.getenv("ELEVENLABS_API_KEY") or self.config.get("elevenlabs_api_key"),
+            httpx_client=http_clients["elevenlabs"]
         )
 
+        # ElevenLabs request deadlines, retries and hedging
+        request_config = self.config.get("elevenlabs_requests", {})
+        self.request_deadline = request_config.get("deadline_seconds", 60)
+        self.request_options = {"timeout_in_seconds": int(self.request_deadline)}
+        self.request_retries = request_config.get("max_retries", 3)
+        self.backoff_base = request_config.get("backoff_base", 1.0)
+        self.backoff_max = request_config.get("backoff_max", 20.0)
+        self.hedging = request_config.get("hedging", True)
+        self.hedge_percentile = request_config.get("hedge_percentile", 95)
+        self.hedge_min_samples = request_config.get("hedge_min_samples", 10)
+        self.latency_tracker = LatencyTracker()
+
         # Audio settings
         self.model_id = self.config.get("model_id", "eleven_v3")
         self.dialogue_output_format = self.config.get("dialogue_output_format", "mp3_44100_128")
         self.max_dialogue_duration = self.config.get("max_dialogue_duration", 10)
         self.voice_mappings = self.config.get("voice_mappings", {})
 
+        # SFX settings: request only the length that survives mixing
+        sfx_settings = self.config.get("sfx_settings", {})
+        self.sfx_duration_limit = self.config.get("sfx_duration_limit", 10)
+        self.sfx_prompt_influence = sfx_settings.get("prompt_influence", 0.9)
+        self.sfx_duration_targeting = sfx_settings.get("duration_targeting", True)
+        self.sfx_impulse_duration = sfx_settings.get("impulse_duration", 1.5)
+        self.sfx_default_duration = sfx_settings.get("default_duration", 3.0)
+        self.sfx_sustain_padding = sfx_settings.get("sustain_padding", 1.0)
+
+        # Stream TTS and cancel lines as soon as they exceed max_dialogue_duration
+        audio_processing = self.config.get("audio_processing", {})
+        self.streaming_tts = (
+            audio_processing.get("streaming_tts", True)
+            and StreamDurationTracker.supports(self.dialogue_output_format)
+        )
+
+        # Capture per-word timings with TTS (replaces streaming for dialogue)
+        self.word_alignment = audio_processing.get("word_alignment", False)
+
+        # Speculative compression: several rewrites per Claude call, voiced concurrently
+        self.speculative_compression = audio_processing.get("speculative_compression", False)
+        self.speculative_targets = audio_processing.get("speculative_targets", [0.95, 0.85, 0.7])
+
+        # Predict voiced duration from past runs and compress long lines before TTS
+        prediction_config = self.config.get("duration_prediction", {})
+        self.duration_model = None
+        if prediction_config.get("enabled", True):
+            samples = SpeechDurationModel.load_samples(
+                prediction_config.get("history_glob", "outputs/audio_generation_*/debug_log.json"),
+                max_runs=prediction_config.get("history_runs", 200)
+            )
+            if len(samples) >= prediction_config.get("min_samples", 20):
+                self.duration_model = SpeechDurationModel().fit(samples)
+                print(f"Duration model trained on {len(samples)} past TTS attempts")
+        self.prediction_margin = prediction_config.get("safety_margin", 0.9)
+
+        # Waveform settings
+        timing_config = self.config.get("timing_refinement", {})
+        self.waveform_chars = timing_config.get("waveform_chars", 40)
+        self.waveform_resolutions = timing_config.get("waveform_resolutions", [])
+        self.waveform_scaling = timing_config.get("waveform_scaling", "absolute")
+        self.waveform_loudness_target_db = timing_config.get("waveform_loudness_target_db", -26.0)
+        self.timing_batching = timing_config.get("batched", True)
+        self.timing_batch_token_budget = timing_config.get("batch_token_budget", 6000)
+        self.timing_batch_max_shots = timing_config.get("batch_max_shots", 25)
+        self.local_timing_engine = LocalTimingEngine() if timing_config.get("local_engine", False) else None
+        self.timing_confidence_threshold = timing_config.get("confidence_threshold", 0.7)
+
+        # Shots voiced concurrently in stage 1, longest first
+        self.generation_workers = self.config.get("scheduling", {}).get("workers", 1)
+
+        # Stream each shot through stages 1-4 instead of running them as barriers
+        pipelining_config = self.config.get("pipelining", {})
+        self.pipelining = pipelining_config.get("enabled", False)
+        self.pipeline_queue_size = pipelining_config.get("queue_size", 4)
+
         # Testing settings
         self.scene_limit = self.config.get("scene_limit", None)  # Limit scenes for testing
         self.max_shots = self.config.get("max_shots", None)  # Limit total shots for testing
@@ -68,34 +159,22 @@ class AudioGenerationPipeline(BasePipeline):
         # Debug tracking
         self.debug_log = []
 
+        # Per-asset checkpoint journal; a resumed run reuses intact clips from it
+        self.journal = None
+        if audio_processing.get("checkpoint_journal", True):
+            self.journal = ShotJournal(self.output_dir / "01_audio_journal.jsonl")
+            if self.journal.dialogue or self.journal.sfx:
+                print(f"Checkpoint journal: {len(self.journal.dialogue)} dialogue and "
+                      f"{len(self.journal.sfx)} SFX clips recorded")
+
     def get_stage_count(self) -> int:
         """Return the total number of stages in this pipeline"""
-        return 4  # Added Stage 4 for audio mixing
+        return 5  # Stage 5 assembles the full episode
 
     def _load_shot_list(self):
         """Load shot list data from the provided path"""
-        with open(self.shot_list_path, 'r') as f:
-            raw_data = json.load(f)
-
-        # Extract shots from the nested structure
-        all_shots = []
-        scenes_processed = 0
-
-        for scene_data in raw_data.get('all_shot_lists', []):
-            # Apply scene limit if configured
-            if self.scene_limit and scenes_processed >= self.scene_limit:
-                print(f"Scene limit ({self.scene_limit}) reached, stopping shot list loading")
-                break
-
-            scene_shots = scene_data.get('shot_list', {}).get('shots', [])
-            all_shots.extend(scene_shots)
-            scenes_processed += 1
-
-            # Apply shot limit if configured
-            if self.max_shots and len(all_shots) >= self.max_shots:
-                all_shots = all_shots[:self.max_shots]
-                print(f"Shot limit ({self.max_shots}) reached")
-                break
+        # Stream shots from the nested structure, stopping at the configured limits
+        all_shots, scenes_processed = load_shots(self.shot_list_path, self.scene_limit, self.max_shots)
 
         self.shot_list_data = {'shots': all_shots}
         print(f"Loaded shot list with {len(all_shots)} shots from {scenes_processed} scenes")
@@ -103,6 +182,21 @@ class AudioGenerationPipeline(BasePipeline):
         if self.scene_limit or self.max_shots:
             print(f"  (Limited by config - scene_limit: {self.scene_limit}, max_shots: {self.max_shots})")
 
+        if self.shard:
+            # Round-robin so every shard gets a similar mix of scenes
+            index, count = self.shard
+            positions = [position for position in range(len(all_shots)) if position % count == index - 1]
+            self.shot_list_data = {'shots': [all_shots[position] for position in positions]}
+            self._write_run_file("shard.json", json.dumps({
+                "index": index,
+                "count": count,
+                "shot_list_path": self.shot_list_path,
+                "total_shots": len(all_shots),
+                "audio_dir": str(self.audio_dir),
+                "positions": positions
+            }, indent=2))
+            print(f"Shard {index}/{count}: {len(positions)} of {len(all_shots)} shots")
+
     def _strip_parentheticals(self, dialogue: str) -> str:
         """
         Remove parentheticals (text in parentheses) but keep square brackets
@@ -129,6 +223,8 @@ class AudioGenerationPipeline(BasePipeline):
         Returns:
             Duration in seconds
         """
+        import librosa  # Deferred so CLI startup does not pay for it
+
         try:
             y, sr = librosa.load(audio_path, sr=None)
             duration = librosa.get_duration(y=y, sr=sr)
@@ -137,33 +233,54 @@ class AudioGenerationPipeline(BasePipeline):
             print(f"  Warning: Could not check duration of {audio_path}: {e}")
             return 0.0
 
-    def _compress_dialogue(self, dialogue: str, shot_number: int) -> str:
+    def _compress_dialogue(
+        self,
+        dialogue: str,
+        shot_number: int,
+        target_duration: Optional[float] = None,
+        target_chars: Optional[int] = None
+    ) -> str:
         """
         Use Claude to compress dialogue text
 
         Args:
             dialogue: Original dialogue text
             shot_number: Shot number for context
+            target_duration: Optional spoken length to aim for, in seconds
+            target_chars: Optional spoken character count to aim for (excluding [tags])
 
         Returns:
             Compressed dialogue text
         """
-        message = self.anthropic_client.messages.create(
+        request = {
+            "shot_number": shot_number,
+            "dialogue": dialogue
+        }
+        if target_duration:
+            request["target_duration_seconds"] = round(target_duration, 1)
+        if target_chars:
+            request["target_max_characters"] = target_chars
+
+        message = self._claude_stream(1, lambda: self.anthropic_client.messages.create(
             model="claude-opus-4-1-20250805",
             max_tokens=32000,
             temperature=0.4,
             stream=True,
-            system="""You are a dialogue rewrite specialist. You have one simple job. If a line of dialogue exceeds 10 seconds after being voiced by a tts engine, it will get sent to you and you will be responsible for rewriting it so that when it gets sent back to the tts engine it's shorter. You need to try your best not to change the meaning of the line or anything crucial because you wont have any context about how it needs to function within the content. all text in [square brackets] in the dialogue must remain unchanged (those are annotations for the tts engine and dont effect length).
+            system=REWRITE_SPECIALIST_PROMPT + """
 
 Your input will the dialogue will come in as json like this:
 
 ```json
 {
   "shot_number": 42,
-  "dialogue": "This is the character's line of dialogue that would be spoken in the scene."
+  "dialogue": "This is the character's line of dialogue that would be spoken in the scene.",
+  "target_duration_seconds": 9.0,
+  "target_max_characters": 120
 }
 ```
 
+target_duration_seconds and target_max_characters are optional. When present, they give the spoken length the rewrite must fit: aim for the target duration and do not go over target_max_characters spoken characters (text in [square brackets] does not count). Keep as much of the original line as the target allows. When they are absent, just make the line noticeably shorter.
+
 and you will respond with the rewritten dialogue like this:
 
 ```json
@@ -178,15 +295,12 @@ and you will respond with the rewritten dialogue like this:
                     "content": [
                         {
                             "type": "text",
-                            "text": json.dumps({
-                                "shot_number": shot_number,
-                                "dialogue": dialogue
-                            })
+                            "text": json.dumps(request)
                         }
                     ]
                 }
             ]
-        )
+        ))
 
         # Collect streamed response
         content = ""
@@ -209,12 +323,379 @@ and you will respond with the rewritten dialogue like this:
             print(f"  Warning: Failed to parse compressed dialogue: {e}")
             return dialogue
 
+    def _log_tts_attempt(
+        self,
+        shot_number: int,
+        iteration: int,
+        dialogue: str,
+        tts_text: str,
+        voice_id: str,
+        duration: float,
+        file_size: int,
+        **extra
+    ):
+        """
+        Record a TTS attempt in the debug log
+
+        Text features, voice and model are stored so later runs can train
+        the speech duration model on complete lines.
+        """
+        chars, words, tags = text_features(tts_text)
+        entry = {
+            "shot": shot_number,
+            "iteration": iteration,
+            "dialogue": dialogue[:100],
+            "duration": duration,
+            "file_size": file_size,
+            "voice_id": voice_id,
+            "model_id": self.model_id,
+            "chars": chars,
+            "words": words,
+            "tags": tags
+        }
+        entry.update(extra)
+        self.debug_log.append(entry)
+
+    def _stream_tts_to_file(self, text: str, voice_id: str, temp_path: Path) -> Tuple[float, bool]:
+        """
+        Stream TTS audio to a file, cancelling once it exceeds the duration limit
+
+        Args:
+            text: Text to voice
+            voice_id: ElevenLabs voice ID
+            temp_path: Where to write the streamed audio
+
+        Returns:
+            Tuple of (streamed_duration, aborted)
+        """
+        tracker = StreamDurationTracker(self.dialogue_output_format)
+        audio = self._elevenlabs_audio("tts", lambda: self.elevenlabs_client.text_to_speech.stream(
+            text=text,
+            voice_id=voice_id,
+            model_id=self.model_id,
+            output_format=self.dialogue_output_format,
+            request_options=self.request_options
+        ))
+
+        aborted = False
+        try:
+            with open(temp_path, "wb") as f:
+                for chunk in audio:
+                    f.write(chunk)
+                    if tracker.feed(chunk) > self.max_dialogue_duration:
+                        aborted = True
+                        break
+        finally:
+            # Closing the generator drops the HTTP response and stops the request
+            if hasattr(audio, "close"):
+                audio.close()
+
+        return tracker.duration, aborted
+
+    def _voice_with_timestamps(self, tts_text: str, voice_id: str, temp_path: Path) -> List[Dict]:
+        """
+        Voice text with character alignment and write the decoded audio to temp_path
+
+        Args:
+            tts_text: Text to voice
+            voice_id: ElevenLabs voice ID
+            temp_path: Where to write the audio
+
+        Returns:
+            Per-word timings from alignment_to_words
+        """
+        started = time.monotonic()
+        try:
+            response = self.elevenlabs_client.text_to_speech.convert_with_timestamps(
+                text=tts_text,
+                voice_id=voice_id,
+                model_id=self.model_id,
+                output_format=self.dialogue_output_format,
+                request_options=self.request_options
+            )
+        except Exception:
+            if self.metrics:
+                self.metrics.api_call("elevenlabs", self.model_id, "1", time.monotonic() - started, "error")
+            raise
+
+        audio = base64.b64decode(response.audio_base_64)
+        if self.metrics:
+            self.metrics.api_call("elevenlabs", self.model_id, "1", time.monotonic() - started)
+            self.metrics.inc("audio_bytes_total", len(audio), provider="elevenlabs", kind="tts")
+
+        with open(temp_path, "wb") as f:
+            f.write(audio)
+
+        alignment = response.normalized_alignment or response.alignment
+        if not alignment:
+            return []
+        return alignment_to_words(
+            alignment.characters,
+            alignment.character_start_times_seconds,
+            alignment.character_end_times_seconds
+        )
+
+    def _elevenlabs_audio(self, kind: str, start_fn: Callable[[], Iterable[bytes]]) -> Iterator[bytes]:
+        """
+        Start an ElevenLabs audio request under the per-call deadline
+
+        Once enough latencies have been observed, a duplicate request is
+        fired if the first byte is slower than the configured percentile.
+
+        Args:
+            kind: Request kind for latency tracking ("tts" or "sfx")
+            start_fn: Starts the request and returns its chunk iterator
+
+        Returns:
+            Iterator over the audio chunks of the winning request
+        """
+        hedge_after = None
+        if self.hedging:
+            hedge_after = self.latency_tracker.percentile(kind, self.hedge_percentile, self.hedge_min_samples)
+        if not self.metrics:
+            return hedged_stream(start_fn, self.request_deadline, hedge_after, self.latency_tracker, kind)
+        return self.metrics.metered(
+            "elevenlabs", self.model_id if kind == "tts" else "sound_effects", "1",
+            lambda: hedged_stream(start_fn, self.request_deadline, hedge_after, self.latency_tracker, kind),
+            audio_kind=kind
+        )
+
+    def _voice_to_file(self, tts_text: str, voice_id: str, temp_path: Path) -> Tuple[float, bool, Optional[List[Dict]]]:
+        """
+        Voice text into temp_path using the configured TTS path, retrying failed requests
+
+        Args:
+            tts_text: Text to voice (parentheticals already stripped)
+            voice_id: ElevenLabs voice ID
+            temp_path: Where to write the audio
+
+        Returns:
+            Tuple of (duration, aborted, words); for aborted streams duration is what was
+            received, and words is only set when word alignment is enabled
+        """
+        for attempt in range(self.request_retries):
+            try:
+                return self._request_voice(tts_text, voice_id, temp_path)
+            except Exception as e:
+                if attempt == self.request_retries - 1:
+                    raise
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                if self.metrics:
+                    self.metrics.retry("elevenlabs", "1")
+                print(f"    TTS attempt {attempt + 1} failed: {e}")
+                print(f"    Retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
+
+    def _request_voice(self, tts_text: str, voice_id: str, temp_path: Path) -> Tuple[float, bool, Optional[List[Dict]]]:
+        """Single TTS request for _voice_to_file"""
+        words = None
+        if self.word_alignment:
+            words = self._voice_with_timestamps(tts_text, voice_id, temp_path)
+        elif self.streaming_tts:
+            streamed_duration, aborted = self._stream_tts_to_file(tts_text, voice_id, temp_path)
+            if aborted:
+                return streamed_duration, True, None
+        else:
+            audio = self._elevenlabs_audio("tts", lambda: self.elevenlabs_client.text_to_speech.convert(
+                text=tts_text,
+                voice_id=voice_id,
+                model_id=self.model_id,
+                output_format=self.dialogue_output_format,
+                request_options=self.request_options
+            ))
+
+            with open(temp_path, "wb") as f:
+                for chunk in audio:
+                    f.write(chunk)
+
+        return self._check_audio_duration(str(temp_path)), False, words
+
+    def _compress_dialogue_candidates(
+        self,
+        dialogue: str,
+        shot_number: int,
+        target_durations: List[float],
+        target_chars: List[int]
+    ) -> List[str]:
+        """
+        Use Claude to write several compressed versions of a line in one call
+
+        Args:
+            dialogue: Dialogue text to compress
+            shot_number: Shot number for context
+            target_durations: Spoken length to aim for with each rewrite, longest first
+            target_chars: Spoken character count to aim for with each rewrite
+
+        Returns:
+            Rewrites in the same order as the targets (may be shorter if parsing fails)
+        """
+        request = {
+            "shot_number": shot_number,
+            "dialogue": dialogue,
+            "targets": [
+                {"target_duration_seconds": round(duration, 1), "target_max_characters": chars}
+                for duration, chars in zip(target_durations, target_chars)
+            ]
+        }
+
+        message = self._claude_stream(1, lambda: self.anthropic_client.messages.create(
+            model="claude-opus-4-1-20250805",
+            max_tokens=32000,
+            temperature=0.4,
+            stream=True,
+            system=REWRITE_SPECIALIST_PROMPT + """
+
+You will be given several target lengths and must write one rewrite per target, each as close to its target as you can without going over. Keep as much of the original line as each target allows.
+
+Your input will come in as json like this:
+
+```json
+{
+  "shot_number": 42,
+  "dialogue": "This is the character's line of dialogue that would be spoken in the scene.",
+  "targets": [
+    {"target_duration_seconds": 9.5, "target_max_characters": 120},
+    {"target_duration_seconds": 8.5, "target_max_characters": 105}
+  ]
+}
+```
+
+and you will respond with one rewrite per target, in the same order, like this:
+
+```json
+{
+  "shot_number": 42,
+  "rewrites": [
+    {"target_duration_seconds": 9.5, "rewritten_dialogue": "..."},
+    {"target_duration_seconds": 8.5, "rewritten_dialogue": "..."}
+  ]
+}
+```""",
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": json.dumps(request)
+                        }
+                    ]
+                }
+            ]
+        ))
+
+        # Collect streamed response
+        content = ""
+        for event in message:
+            if event.type == "content_block_delta":
+                content += event.delta.text
+            elif event.type == "message_stop":
+                break
+
+        try:
+            json_match = re.search(r'```json\s*(.*?)\s*```', content, re.DOTALL)
+            if json_match:
+                result = json.loads(json_match.group(1))
+            else:
+                result = json.loads(content)
+            return [
+                rewrite["rewritten_dialogue"]
+                for rewrite in result.get("rewrites", [])
+                if rewrite.get("rewritten_dialogue")
+            ]
+        except Exception as e:
+            print(f"  Warning: Failed to parse compressed dialogue candidates: {e}")
+            return []
+
+    def _speculative_compression_round(
+        self,
+        dialogue: str,
+        shot_number: int,
+        voice_id: str,
+        over_duration: float,
+        iteration: int
+    ) -> Tuple[str, Optional[Tuple[Path, float, Optional[List[Dict]]]], float]:
+        """
+        Compress a line to several graduated targets and voice every candidate concurrently
+
+        Args:
+            dialogue: Dialogue that voiced too long
+            shot_number: Shot number
+            voice_id: ElevenLabs voice ID
+            over_duration: Duration the dialogue voiced at (or streamed before cancelling)
+            iteration: Current compression iteration (for file naming and logging)
+
+        Returns:
+            Tuple of (chosen_dialogue, (temp_path, duration, words) or None, duration). The chosen
+            dialogue is the longest candidate that fits, or the shortest one if none do.
+        """
+        tts_dialogue = self._strip_parentheticals(dialogue)
+        spoken_chars = text_features(tts_dialogue)[0]
+
+        target_durations = [self.max_dialogue_duration * f for f in self.speculative_targets]
+        target_chars = [
+            max(1, int(spoken_chars * target / max(over_duration, 0.1)))
+            for target in target_durations
+        ]
+
+        candidates = self._compress_dialogue_candidates(dialogue, shot_number, target_durations, target_chars)
+        if not candidates:
+            # Fall back to a single sequential rewrite
+            candidates = [self._compress_dialogue(dialogue, shot_number)]
+
+        print(f"    Voicing {len(candidates)} compression candidates concurrently...")
+
+        def voice_candidate(index: int) -> Tuple[int, Path, float, bool, Optional[Exception], Optional[List[Dict]]]:
+            temp_path = self.audio_dir / f"temp_shot_{shot_number:03d}_iter_{iteration}_cand_{index}.mp3"
+            try:
+                duration, aborted, words = self._voice_to_file(
+                    self._strip_parentheticals(candidates[index]), voice_id, temp_path
+                )
+                return index, temp_path, duration, aborted, None, words
+            except Exception as e:
+                return index, temp_path, float("inf"), True, e, None
+
+        with ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+            voiced = list(executor.map(voice_candidate, range(len(candidates))))
+
+        for index, temp_path, duration, aborted, error, _ in voiced:
+            if error is None:
+                self._log_tts_attempt(
+                    shot_number, iteration + 1, candidates[index],
+                    self._strip_parentheticals(candidates[index]), voice_id, duration,
+                    temp_path.stat().st_size if temp_path.exists() else 0,
+                    candidate=index + 1,
+                    **({"aborted_early": True} if aborted else {})
+                )
+                print(f"      Candidate {index + 1}: {duration:.1f}s{' (cancelled)' if aborted else ''}")
+            else:
+                print(f"      Candidate {index + 1}: failed ({error})")
+
+        if all(v[4] is not None for v in voiced):
+            for _, temp_path, *_ in voiced:
+                if temp_path.exists():
+                    os.remove(temp_path)
+            raise voiced[0][4]
+
+        fitting = [v for v in voiced if not v[3] and v[2] <= self.max_dialogue_duration]
+        chosen = max(fitting, key=lambda v: v[2]) if fitting else min(voiced, key=lambda v: v[2])
+
+        # Keep only the accepted candidate's audio
+        for index, temp_path, *_ in voiced:
+            if (not fitting or index != chosen[0]) and temp_path.exists():
+                os.remove(temp_path)
+
+        index, temp_path, duration, _, _, words = chosen
+        if fitting:
+            return candidates[index], (temp_path, duration, words), duration
+        return candidates[index], None, duration
+
     def _generate_dialogue_with_compression(
         self,
         dialogue: str,
         shot_number: int,
         voice_id: str
-    ) -> Tuple[str, str, float, int]:
+    ) -> Tuple[str, str, float, int, Optional[List[Dict]]]:
         """
         Generate dialogue audio with compression if needed
 
@@ -224,69 +705,93 @@ and you will respond with the rewritten dialogue like this:
             voice_id: ElevenLabs voice ID
 
         Returns:
-            Tuple of (audio_path, final_dialogue, duration, compression_iterations)
+            Tuple of (audio_path, final_dialogue, duration, compression_iterations, words);
+            words holds per-word timings when word alignment is enabled, else None
         """
         compression_iterations = 0
         current_dialogue = dialogue
         successful_temp_path = None
         successful_duration = None
+        successful_words = None
 
-        while compression_iterations < 5:  # Max 5 attempts
-            # Strip parentheticals before sending to TTS
+        # Compress up front when the line is predicted to run over the limit
+        if self.duration_model:
             tts_dialogue = self._strip_parentheticals(current_dialogue)
-
-            # Generate audio with ElevenLabs
-            print(f"    Generating audio (attempt {compression_iterations + 1})...")
-
-            try:
-                audio = self.elevenlabs_client.text_to_speech.convert(
-                    text=tts_dialogue,
-                    voice_id=voice_id,
-                    model_id=self.model_id,
-                    output_format=self.dialogue_output_format
+            predicted = self.duration_model.predict(tts_dialogue, voice_id, self.model_id)
+            if predicted > self.max_dialogue_duration:
+                target_duration = self.max_dialogue_duration * self.prediction_margin
+                target_chars = self.duration_model.target_chars(
+                    tts_dialogue, target_duration, voice_id, self.model_id
                 )
+                print(f"    Predicted {predicted:.1f}s, compressing to ~{target_chars} chars before TTS...")
+                current_dialogue = self._compress_dialogue(
+                    current_dialogue, shot_number,
+                    target_duration=target_duration,
+                    target_chars=target_chars
+                )
+                compression_iterations += 1
 
-                # Save audio to temp file
-                temp_path = self.audio_dir / f"temp_shot_{shot_number:03d}_iter_{compression_iterations}.mp3"
-                with open(temp_path, "wb") as f:
-                    for chunk in audio:
-                        f.write(chunk)
-
-                # Check duration
-                duration = self._check_audio_duration(str(temp_path))
-
-                # Log for debugging
-                self.debug_log.append({
-                    "shot": shot_number,
-                    "iteration": compression_iterations + 1,
-                    "dialogue": current_dialogue[:100],
-                    "duration": duration,
-                    "file_size": temp_path.stat().st_size
-                })
+        last_duration = None
 
-                if duration <= self.max_dialogue_duration:
-                    # Success! Under 10 seconds
-                    successful_temp_path = temp_path
-                    successful_duration = duration
+        while compression_iterations < 5:  # Max 5 attempts
+            if self.speculative_compression and last_duration is not None:
+                # One Claude call, several rewrites voiced concurrently
+                current_dialogue, accepted, last_duration = self._speculative_compression_round(
+                    current_dialogue, shot_number, voice_id, last_duration, compression_iterations
+                )
+                if accepted:
+                    successful_temp_path, successful_duration, successful_words = accepted
                     break
-                else:
-                    # Need to compress
-                    print(f"    Dialogue too long ({duration:.1f}s), compressing...")
+                compression_iterations += 1
+                continue
+
+            # Strip parentheticals before sending to TTS
+            tts_dialogue = self._strip_parentheticals(current_dialogue)
 
-                    # Clean up this iteration's temp file since it's too long
-                    if temp_path.exists():
-                        os.remove(temp_path)
+            # Generate audio with ElevenLabs
+            print(f"    Generating audio (attempt {compression_iterations + 1})...")
 
-                    compression_iterations += 1
-                    if compression_iterations < 5:
-                        current_dialogue = self._compress_dialogue(current_dialogue, shot_number)
+            # Save audio to temp file
+            temp_path = self.audio_dir / f"temp_shot_{shot_number:03d}_iter_{compression_iterations}.mp3"
 
+            try:
+                duration, aborted, words = self._voice_to_file(tts_dialogue, voice_id, temp_path)
             except Exception as e:
                 print(f"    Error generating dialogue: {e}")
-                if 'temp_path' in locals() and temp_path.exists():
+                if temp_path.exists():
                     os.remove(temp_path)
                 raise
 
+            # Log for debugging
+            self._log_tts_attempt(
+                shot_number, compression_iterations + 1, current_dialogue, tts_dialogue,
+                voice_id, duration, temp_path.stat().st_size if temp_path.exists() else 0,
+                **({"aborted_early": True} if aborted else {})
+            )
+
+            if not aborted and duration <= self.max_dialogue_duration:
+                # Success! Under 10 seconds
+                successful_temp_path = temp_path
+                successful_duration = duration
+                successful_words = words
+                break
+
+            # Need to compress
+            if aborted:
+                # Over the limit before the clip finished - cancelled, compress now
+                print(f"    Dialogue too long ({duration:.1f}s streamed), cancelled TTS, compressing...")
+            else:
+                print(f"    Dialogue too long ({duration:.1f}s), compressing...")
+
+            # Clean up this iteration's temp file since it's too long
+            if temp_path.exists():
+                os.remove(temp_path)
+
+            last_duration = duration
+            compression_iterations += 1
+            if compression_iterations < 5 and not self.speculative_compression:
+                current_dialogue = self._compress_dialogue(current_dialogue, shot_number)
+
         # Move successful file to final location
         if successful_temp_path and successful_temp_path.exists():
             final_path = self.audio_dir / f"shot_{shot_number:03d}_dialogue.mp3"
@@ -297,43 +802,51 @@ and you will respond with the rewritten dialogue like this:
             else:
                 print(f"    ✓ Generated ({successful_duration:.1f}s)")
 
-            return str(final_path), current_dialogue, successful_duration, compression_iterations
+            return str(final_path), current_dialogue, successful_duration, compression_iterations, successful_words
         else:
             # Failed to compress under 10 seconds
             raise ValueError(f"Could not compress dialogue under 10 seconds after {compression_iterations} attempts")
 
-    def _generate_sfx_with_retry(self, sfx_description: str, shot_number: int, sfx_index: int, max_retries: int = 3) -> Tuple[str, float]:
+    def _generate_sfx_with_retry(self, sfx_description: str, shot_number: int, sfx_index: int,
+                                 max_retries: Optional[int] = None,
+                                 duration_seconds: Optional[float] = None) -> Tuple[str, float]:
         """
-        Generate sound effect audio with retry logic
+        Generate sound effect audio with retry logic (jittered exponential backoff)
 
         Args:
             sfx_description: Description of the sound effect
             shot_number: Shot number
             sfx_index: Index of this SFX in the shot
-            max_retries: Maximum number of retry attempts
+            max_retries: Maximum number of retry attempts (defaults to elevenlabs_requests.max_retries)
+            duration_seconds: Requested clip length (None lets ElevenLabs decide)
 
         Returns:
             Tuple of (audio_path, duration)
         """
+        max_retries = max_retries or self.request_retries
         for attempt in range(max_retries):
             try:
-                print(f"    Generating SFX {sfx_index}: {sfx_description[:50]}... (attempt {attempt + 1})")
+                length = f", {duration_seconds:.1f}s" if duration_seconds else ""
+                print(f"    Generating SFX {sfx_index}: {sfx_description[:50]}...{length} (attempt {attempt + 1})")
 
-                audio = self.elevenlabs_client.text_to_sound_effects.convert(
+                audio = self._elevenlabs_audio("sfx", lambda: self.elevenlabs_client.text_to_sound_effects.convert(
                     text=sfx_description,
-                    prompt_influence=0.9  # Higher influence for better prompt adherence
-                    # No duration_seconds - let ElevenLabs decide
-                )
+                    duration_seconds=duration_seconds,
+                    prompt_influence=self.sfx_prompt_influence,  # Higher influence for better prompt adherence
+                    request_options=self.request_options
+                ))
 
-                # Save SFX audio
+                # Save SFX audio (temp file + rename so a crash never leaves a partial clip)
                 sfx_path = self.audio_dir / f"shot_{shot_number:03d}_sfx_{sfx_index}.mp3"
-                with open(sfx_path, "wb") as f:
+                temp_path = self.audio_dir / f"temp_shot_{shot_number:03d}_sfx_{sfx_index}.mp3"
+                with open(temp_path, "wb") as f:
                     for chunk in audio:
                         f.write(chunk)
 
                 # Verify file was created and has content
-                if not sfx_path.exists() or sfx_path.stat().st_size == 0:
+                if not temp_path.exists() or temp_path.stat().st_size == 0:
                     raise ValueError("SFX file was not created or is empty")
+                os.replace(temp_path, sfx_path)
 
                 # Get duration
                 duration = self._check_audio_duration(str(sfx_path))
@@ -344,100 +857,60 @@ and you will respond with the rewritten dialogue like this:
             except Exception as e:
                 print(f"    Attempt {attempt + 1} failed: {e}")
                 if attempt < max_retries - 1:
-                    print(f"    Retrying in 2 seconds...")
-                    time.sleep(2)
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                    if self.metrics:
+                        self.metrics.retry("elevenlabs", "1")
+                    print(f"    Retrying in {delay:.1f} seconds...")
+                    time.sleep(delay)
                 else:
                     raise
 
-    def _generate_waveform(self, audio_path: str, num_chars: int = 40) -> str:
+    def _build_timing_block(self, shot_data: ShotRecord) -> str:
         """
-        Convert audio to Unicode waveform visualization
+        Build the waveform analysis text for one shot
 
         Args:
-            audio_path: Path to audio file
-            num_chars: Number of Unicode characters (default 40)
+            shot_data: Shot record with waveforms
 
         Returns:
-            Unicode string representation of waveform
+            Text block describing the shot's dialogue and SFX waveforms
         """
-        try:
-            # Check if file exists and has content
-            if not Path(audio_path).exists():
-                print(f"    Warning: Audio file does not exist: {audio_path}")
-                return "▁" * num_chars  # Return flat waveform
-
-            if Path(audio_path).stat().st_size == 0:
-                print(f"    Warning: Audio file is empty: {audio_path}")
-                return "▁" * num_chars  # Return flat waveform
-
-            # Load audio
-            y, sr = librosa.load(audio_path, sr=None, mono=True)
-
-            # Split into chunks
-            chunk_size = len(y) // num_chars
-            if chunk_size == 0:
-                chunk_size = 1
-
-            # Calculate RMS for each chunk
-            waveform_chars = []
-            unicode_chars = "▁▂▃▄▅▆▇█"
-
-            for i in range(num_chars):
-                start = i * chunk_size
-                end = min((i + 1) * chunk_size, len(y))
-                chunk = y[start:end]
-
-                if len(chunk) > 0:
-                    rms = np.sqrt(np.mean(chunk**2))
-                    # Normalize to 0-7 for character selection
-                    char_index = min(int(rms * len(unicode_chars) / 0.1), len(unicode_chars) - 1)
-                    waveform_chars.append(unicode_chars[char_index])
-                else:
-                    waveform_chars.append(unicode_chars[0])
-
-            return ''.join(waveform_chars)
+        dialogue_text = shot_data.final_dialogue if shot_data.render else (shot_data.dialogue or '')
+        waveform_text = f"Shot {shot_data.shot_number}:\n"
+        waveform_text += f"Dialogue: {shot_data.dialogue_waveform or 'N/A'}\n"
+        waveform_text += f"Dialogue text: \"{dialogue_text}\"\n\n"
+
+        for i, sfx in enumerate(shot_data.sfx):
+            waveform_text += f"SFX {i+1}: {sfx.waveform or 'N/A'}\n"
+            waveform_text += f"Description: {sfx.description}\n"
+            waveform_text += f"Current timing: 50% (default)\n\n"
 
-        except Exception as e:
-            print(f"    Error generating waveform for {audio_path}: {e}")
-            return "▁" * num_chars  # Return flat waveform on error
+        return waveform_text
 
-    def _refine_sfx_timing(self, shot_data: Dict) -> Dict:
+    def _request_timing_refinement(self, user_text: str, max_tokens: int = 8000) -> str:
         """
-        Use Claude to refine SFX timing based on waveforms
+        Send a timing refinement request to Claude and collect the streamed reply
 
         Args:
-            shot_data: Shot data with waveforms
+            user_text: User message containing one or more waveform blocks
+            max_tokens: Response token limit
 
         Returns:
-            Updated shot data with refined timings
+            Raw response text
         """
-        if not shot_data.get("sfx") or len(shot_data["sfx"]) == 0:
-            return shot_data
-
-        # Build waveform analysis prompt
-        waveform_text = f"Shot {shot_data['shot_number']}:\n"
-        waveform_text += f"Dialogue: {shot_data.get('dialogue_waveform', 'N/A')}\n"
-        waveform_text += f"Dialogue text: \"{shot_data.get('final_dialogue', shot_data.get('dialogue', ''))}\"\n\n"
-
-        for i, sfx in enumerate(shot_data["sfx"]):
-            waveform_text += f"SFX {i+1}: {sfx.get('waveform', 'N/A')}\n"
-            waveform_text += f"Description: {sfx['description']}\n"
-            waveform_text += f"Current timing: 50% (default)\n\n"
-
-        # Call Claude for timing refinement
-        message = self.anthropic_client.messages.create(
+        message = self._claude_stream(3, lambda: self.anthropic_client.messages.create(
             model="claude-opus-4-1-20250805",
-            max_tokens=8000,
+            max_tokens=max_tokens,
             temperature=0.3,
             stream=True,
             system="""You are an expert audio-visual alignment specialist. Your task is to precisely place sound effects within dialogue clips by analyzing waveform representations and understanding the natural timing of speech and sound.\n\nYour Core Task\nYou receive dialogue audio and sound effect audio represented as text-based waveforms. You must determine where the sound effect should START within the dialogue timeline to achieve natural, realistic placement.\n\nInput Structure\nYou will receive YAML formatted input:\n\n```json\n{\n  "shot": "[number]",\n  "dialogue_text": "[the spoken words]",\n  "sound_effects": [\n    {\n      "name": "[description of sound 1]",\n      "waveform": "[sound effect 1 waveform characters]"\n    },\n    {\n      "name": "[description of sound 2]",\n      "waveform": "[sound effect 2 waveform characters]"\n    }\n  ],\n  "alignment_view": "[dialogue waveform characters]                [dialogue]\\n[sound effect 1 waveform characters]          [sound_1 at 0.0]\\n[sound effect 2 waveform characters]          [sound_2 at 0.0]"\n}\n```\n\nHow to Read Waveforms\nCharacters like ▁▂▃▄▅▆▇█ represent amplitude (volume) from quiet to loud\nThe dialogue waveform spans the entire clip duration\nBoth waveforms start aligned at position 0.0\nEach character position represents a time slice\n\nYour Analysis Process\nMap the dialogue text to its waveform - identify where each word occurs by matching speech patterns (peaks) with syllables and pauses (valleys) with spaces/punctuation\nIdentify the sound effect's actual sound moment (where amplitude peaks) versus any leading silence\n\nDetermine the logical placement based on:\nSemantic context (what's happening in the dialogue)\nNatural pauses or emphasis points\nThe sound effect's purpose and typical timing\nCalculate what percentage through the dialogue the sound effect's FIRST character should begin\n\nOutput Structure\nReturn ONLY a JSON object:\n\n```json\n{\n  "shot": "[number]",\n  "timings": [\n    {\n      "name": "[description of sound 1]",\n      "timing": 0.25\n    },\n    {\n      "name": "[description of sound 2]",\n      "timing": -0.15\n    }\n  ]\n}\n```\n\nWhere timing represents the percentage through the dialogue where the sound effect file should START (not where its peak occurs, but where its first character begins).\n\nCritical Reminders\nYou're positioning the START of the sound effect file, including any leading silence\nTiming values can be negative (sound starts before dialogue) or greater than 1.0 (starts near the end)\n\nNegative values mean the sound effect begins before the dialogue, with only its latter portion audible\n\n0.0 = beginning of dialogue, 1.0 = end of dialogue\n\nExample: -0.2 means the sound effect starts 20% of the dialogue duration before the dialogue begins\n\nAccount for the sound effect's dead space when determining placement\nThe sound effect may extend beyond the dialogue end - that's acceptable\nThink naturistically about when sounds would actually occur relative to speech""",
             messages=[
                 {
                     "role": "user",
-                    "content": f"Analyze these waveforms and refine the SFX timing:\n\n{waveform_text}\n\nReturn a JSON object with refined timings:\n```json\n{{\"sfx_timings\": [percentage1, percentage2, ...]}}\n```"
+                    "content": user_text
                 }
             ]
-        )
+        ))
 
         # Collect response
         content = ""
@@ -447,162 +920,383 @@ and you will respond with the rewritten dialogue like this:
             elif event.type == "message_stop":
                 break
 
+        return content
+
+    def _apply_refined_timings(self, shot_data: ShotRecord, timings: List) -> None:
+        """Store refined timing percentages on a shot's SFX"""
+        for i, timing in enumerate(timings):
+            if i < len(shot_data.sfx):
+                shot_data.sfx[i].refined_timing_percentage = timing
+                shot_data.sfx[i].timing_method = "llm"
+                print(f"    SFX {i+1} timing: 50% (default) → {timing}% (refined)")
+
+    def _refine_sfx_timing(self, shot_data: ShotRecord) -> ShotRecord:
+        """
+        Use Claude to refine SFX timing based on waveforms
+
+        Args:
+            shot_data: Shot record with waveforms
+
+        Returns:
+            Updated shot record with refined timings
+        """
+        if not shot_data.sfx:
+            return shot_data
+
+        # Build waveform analysis prompt
+        waveform_text = self._build_timing_block(shot_data)
+
+        # Call Claude for timing refinement
+        content = self._request_timing_refinement(
+            f"Analyze these waveforms and refine the SFX timing:\n\n{waveform_text}\n\nReturn a JSON object with refined timings:\n```json\n{{\"sfx_timings\": [percentage1, percentage2, ...]}}\n```"
+        )
+
         # Parse refined timings
         try:
             json_match = re.search(r'```json\s*(.*?)\s*```', content, re.DOTALL)
             if json_match:
                 result = json.loads(json_match.group(1))
-                timings = result.get("sfx_timings", [])
-
-                # Update SFX timings
-                for i, timing in enumerate(timings):
-                    if i < len(shot_data["sfx"]):
-                        shot_data["sfx"][i]["refined_timing_percentage"] = timing
-                        print(f"    SFX {i+1} timing: 50% (default) → {timing}% (refined)")
+                self._apply_refined_timings(shot_data, result.get("sfx_timings", []))
         except Exception as e:
             print(f"    Warning: Failed to parse refined timings: {e}")
             # Add default timing of 50% if refinement failed
-            for i, sfx in enumerate(shot_data["sfx"]):
-                if not sfx.get("refined_timing_percentage"):
-                    sfx["refined_timing_percentage"] = 50
+            for i, sfx in enumerate(shot_data.sfx):
+                if not sfx.refined_timing_percentage:
+                    sfx.refined_timing_percentage = 50
                     print(f"    SFX {i+1}: Using default timing 50%")
 
         return shot_data
 
-    def stage_1_audio_generation(self):
-        """Generate dialogue and SFX audio with compression"""
-        print("\n" + "="*50)
-        print("STAGE 1: Audio Generation with Compression")
-        print("="*50)
+    def _pack_timing_batches(self, shots: List[ShotRecord]) -> List[List[ShotRecord]]:
+        """
+        Group shots into timing requests that fit the batch token budget
 
-        # Load shot list if not already loaded
-        if not self.shot_list_data:
-            self._load_shot_list()
+        Token counts are estimated at ~4 characters per token. A shot number
+        never appears twice in one batch so the keyed response is unambiguous.
 
-        processed_shots = []
+        Args:
+            shots: Shots with successful SFX and waveforms
 
-        for shot in self.shot_list_data.get("shots", []):
-            shot_number = shot.get("shot_number", 0)
-            print(f"\nProcessing Shot {shot_number}...")
+        Returns:
+            List of shot batches
+        """
+        batches = []
+        current = []
+        current_tokens = 0
+        current_numbers = set()
+
+        for shot in shots:
+            tokens = len(self._build_timing_block(shot)) // 4 + 1
+            if current and (
+                current_tokens + tokens > self.timing_batch_token_budget
+                or len(current) >= self.timing_batch_max_shots
+                or shot.shot_number in current_numbers
+            ):
+                batches.append(current)
+                current, current_tokens, current_numbers = [], 0, set()
+
+            current.append(shot)
+            current_tokens += tokens
+            current_numbers.add(shot.shot_number)
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    def _refine_sfx_timing_batch(self, shots: List[ShotRecord]) -> List[ShotRecord]:
+        """
+        Refine SFX timing for many shots in one Claude call
 
-            shot_data = {
-                "shot_number": shot_number,
-                "dialogue": shot.get("dialogue"),
-                "character": shot.get("character"),
-                "sfx": []
-            }
+        Args:
+            shots: Shots with successful SFX and waveforms
 
-            # Generate dialogue if present and character is not "none"
-            if shot.get("dialogue") and shot.get("character") and shot["character"].lower() != "none":
-                character = shot["character"]
-                voice_id = self.voice_mappings.get(
-                    character,
-                    self.voice_mappings.get("DEFAULT", "21m00Tcm4TlvDq8ikWAM")
-                )
+        Returns:
+            Shots missing from (or malformed in) the response, for per-shot fallback
+        """
+        blocks = "\n---\n\n".join(self._build_timing_block(shot) for shot in shots)
+        user_text = (
+            f"Analyze the waveforms for each of these {len(shots)} shots independently and refine their SFX timing:\n\n"
+            f"{blocks}\n"
+            "Return ONE JSON object keyed by shot number, with one timing percentage per SFX in order:\n"
+            "```json\n{\"shots\": {\"<shot_number>\": [percentage1, percentage2, ...]}}\n```"
+        )
+
+        # ~20 output tokens per SFX plus overhead
+        sfx_total = sum(len(shot.sfx) for shot in shots)
+        content = self._request_timing_refinement(user_text, max_tokens=max(1000, 40 * sfx_total + 500))
+
+        timings_by_shot = {}
+        try:
+            json_match = re.search(r'```json\s*(.*?)\s*```', content, re.DOTALL)
+            result = json.loads(json_match.group(1) if json_match else content)
+            timings_by_shot = {str(k): v for k, v in result.get("shots", {}).items()}
+        except Exception as e:
+            print(f"  Warning: Failed to parse batched timings: {e}")
+
+        missing = []
+        for shot in shots:
+            timings = timings_by_shot.get(str(shot.shot_number))
+            if not isinstance(timings, list) or len(timings) != len(shot.sfx):
+                missing.append(shot)
+                continue
+            print(f"\nRefined timings for Shot {shot.shot_number} (batched)")
+            self._apply_refined_timings(shot, timings)
 
+        return missing
+
+    def _generate_shot_audio(self, shot: Dict) -> ShotRecord:
+        """
+        Generate dialogue and SFX audio for one shot
+
+        Args:
+            shot: Shot from the loaded shot list
+
+        Returns:
+            Shot record with audio paths, durations and any errors
+        """
+        shot_number = shot.get("shot_number", 0)
+        print(f"\nProcessing Shot {shot_number}...")
+
+        shot_data = ShotRecord(
+            shot_number=shot_number,
+            dialogue=shot.get("dialogue"),
+            character=shot.get("character")
+        )
+
+        # Generate dialogue if present and character is not "none"
+        if shot.get("dialogue") and shot.get("character") and shot["character"].lower() != "none":
+            character = shot["character"]
+            voice_id = self.voice_mappings.get(
+                character,
+                self.voice_mappings.get("DEFAULT", "21m00Tcm4TlvDq8ikWAM")
+            )
+
+            restored = self.journal.completed_dialogue(shot_number, shot["dialogue"]) if self.journal else None
+            if self.journal and self.metrics:
+                self.metrics.cache("checkpoint_journal", bool(restored))
+            if restored:
+                print(f"  Dialogue for {character} restored from checkpoint journal")
+                shot_data.render = DialogueRender.from_json(restored)
+            else:
                 print(f"  Generating dialogue for {character}...")
 
                 try:
-                    audio_path, final_dialogue, duration, iterations = self._generate_dialogue_with_compression(
+                    audio_path, final_dialogue, duration, iterations, words = self._generate_dialogue_with_compression(
                         dialogue=shot["dialogue"],
                         shot_number=shot_number,
                         voice_id=voice_id
                     )
 
-                    shot_data["dialogue_audio_path"] = audio_path
-                    shot_data["final_dialogue"] = final_dialogue
-                    shot_data["dialogue_duration"] = duration
-                    shot_data["compression_iterations"] = iterations
-                    shot_data["original_dialogue"] = shot["dialogue"] if iterations > 0 else None
+                    shot_data.render = DialogueRender(
+                        audio_path=audio_path,
+                        final_dialogue=final_dialogue,
+                        duration=duration,
+                        compression_iterations=iterations,
+                        original_dialogue=shot["dialogue"] if iterations > 0 else None,
+                        words=words
+                    )
+
+                    if self.journal:
+                        self.journal.record_dialogue(shot_number, shot["dialogue"], shot_data.render.to_json())
+                    if self.metrics:
+                        self.metrics.observe("compression_iterations", iterations)
 
                 except Exception as e:
                     print(f"  ERROR generating dialogue: {e}")
-                    shot_data["dialogue_error"] = str(e)
-            elif shot.get("character") and shot["character"].lower() == "none":
-                print(f"  Skipping dialogue generation for 'none' character")
-                shot_data["character"] = "none"
-                shot_data["dialogue_skipped"] = True
-
-            # Generate SFX if present (new format: array of strings)
-            sound_effects = shot.get("sound_effects", [])
-            if sound_effects:
-                for i, sfx_text in enumerate(sound_effects, 1):
-                    # Handle string format (new) or dict format (legacy)
-                    if isinstance(sfx_text, dict):
-                        # Legacy format compatibility
-                        sfx_text = sfx_text.get("sfx", sfx_text.get("description", ""))
-                    else:
-                        # New format: just strings
-                        sfx_text = str(sfx_text)
-
-                    # Clean SFX text (remove {{SFX: }} wrapper if present)
-                    sfx_text = re.sub(r'\{\{SFX:\s*|\}\}', '', sfx_text).strip()
-
-                    try:
-                        sfx_path, duration = self._generate_sfx_with_retry(
-                            sfx_description=sfx_text,
-                            shot_number=shot_number,
-                            sfx_index=i
-                        )
-
-                        shot_data["sfx"].append({
-                            "description": sfx_text,
-                            "audio_path": sfx_path,
-                            "duration": duration
-                            # No timing_percentage - will be generated in Stage 3
-                        })
-
-                    except Exception as e:
-                        print(f"  ERROR generating SFX after retries: {e}")
-                        shot_data["sfx"].append({
-                            "description": sfx_text,
-                            "error": str(e)
-                            # No timing_percentage
-                        })
-
-            processed_shots.append(shot_data)
+                    shot_data.dialogue_error = str(e)
+        elif shot.get("character") and shot["character"].lower() == "none":
+            print(f"  Skipping dialogue generation for 'none' character")
+            shot_data.character = "none"
+            shot_data.dialogue_skipped = True
+
+        # Generate SFX if present (new format: array of strings)
+        sound_effects = shot.get("sound_effects", [])
+        if sound_effects:
+            for i, sfx_text in enumerate(sound_effects, 1):
+                # Handle string format (new) or dict format (legacy)
+                if isinstance(sfx_text, dict):
+                    # Legacy format compatibility
+                    sfx_text = sfx_text.get("sfx", sfx_text.get("description", ""))
+                else:
+                    # New format: just strings
+                    sfx_text = str(sfx_text)
+
+                # Clean SFX text (remove {{SFX: }} wrapper if present)
+                sfx_text = re.sub(r'\{\{SFX:\s*|\}\}', '', sfx_text).strip()
+
+                restored = self.journal.completed_sfx(shot_number, i, sfx_text) if self.journal else None
+                if self.journal and self.metrics:
+                    self.metrics.cache("checkpoint_journal", bool(restored))
+                if restored:
+                    print(f"    SFX {i} restored from checkpoint journal")
+                    shot_data.sfx.append(SfxRecord.from_json(restored))
+                    continue
+
+                duration_target = None
+                if self.sfx_duration_targeting:
+                    duration_target = estimate_sfx_duration(
+                        sfx_text,
+                        shot_data.dialogue_duration,
+                        window=self.config.get("mixing", {}).get("target_duration", 10),
+                        limit=self.sfx_duration_limit,
+                        impulse_duration=self.sfx_impulse_duration,
+                        default_duration=self.sfx_default_duration,
+                        sustain_padding=self.sfx_sustain_padding
+                    )
+
+                try:
+                    sfx_path, duration = self._generate_sfx_with_retry(
+                        sfx_description=sfx_text,
+                        shot_number=shot_number,
+                        sfx_index=i,
+                        duration_seconds=duration_target
+                    )
+
+                    # No timing yet - will be refined in Stage 3
+                    sfx_result = SfxRecord(description=sfx_text, audio_path=sfx_path, duration=duration)
+                    shot_data.sfx.append(sfx_result)
+
+                    if self.journal:
+                        self.journal.record_sfx(shot_number, i, sfx_result.to_json())
+
+                except Exception as e:
+                    print(f"  ERROR generating SFX after retries: {e}")
+                    shot_data.sfx.append(SfxRecord(description=sfx_text, error=str(e)))
+
+        return shot_data
+
+    def _place_sfx_locally(self, shot: ShotRecord) -> bool:
+        """
+        Time a shot's SFX with the local engine
+
+        Args:
+            shot: Shot record with dialogue and SFX audio
+
+        Returns:
+            True if every placement met the confidence threshold and was applied
+        """
+        try:
+            placements = self.local_timing_engine.refine_shot(shot)
+        except Exception as e:
+            print(f"\nShot {shot.shot_number}: local timing failed ({e}), using Claude")
+            return False
+
+        scored = [p for p in placements if p]
+        confidence = min(p["confidence"] for p in scored) if scored else 0.0
+        if not scored or confidence < self.timing_confidence_threshold:
+            return False
+
+        print(f"\nShot {shot.shot_number}: placed locally (confidence {confidence:.2f})")
+        for i, (sfx, placement) in enumerate(zip(shot.sfx, placements)):
+            if placement:
+                sfx.refined_timing_percentage = placement["timing"]
+                sfx.timing_confidence = placement["confidence"]
+                sfx.timing_method = "local"
+                print(f"    SFX {i+1} timing: {placement['timing']}% ({placement['reason']})")
+        return True
+
+    def stage_1_audio_generation(self):
+        """Generate dialogue and SFX audio with compression"""
+        print("\n" + "="*50)
+        print("STAGE 1: Audio Generation with Compression")
+        print("="*50)
+
+        # Load shot list if not already loaded
+        if not self.shot_list_data:
+            self._load_shot_list()
+
+        shots = self.shot_list_data.get("shots", [])
+        if self.generation_workers > 1 and len(shots) > 1:
+            # Concurrent shots start longest first so one long shot doesn't finish last
+            processed_shots, schedule = run_longest_first(
+                shots, self._generate_shot_audio, shot_cost, self.generation_workers,
+                label=lambda shot: f"shot {shot.get('shot_number', 0)}"
+            )
+            self._write_run_file("01_schedule.json", json.dumps(schedule, indent=2))
+            print(f"\n{format_schedule(schedule)}")
+        else:
+            processed_shots = [self._generate_shot_audio(shot) for shot in shots]
 
         # Save stage output
         self.variables["processed_shots"] = processed_shots
-        self._save_output(1, "audio_generated", {"shots": processed_shots})
+        self._save_output(1, "audio_generated", {"shots": shots_to_json(processed_shots)})
 
         # Save debug log
         self._save_debug_log()
 
         print(f"\n✓ Generated audio for {len(processed_shots)} shots")
 
+    def _render_shot_waveforms(self, shots: List[ShotRecord]):
+        """
+        Render dialogue and SFX waveforms for a set of shots in one batch
+
+        Args:
+            shots: Shots whose clips should get waveform strings
+        """
+        from .waveform import render_waveforms
+
+        targets = []
+        for shot in shots:
+            if shot.dialogue_audio_path:
+                targets.append((shot, "dialogue_waveform", shot.dialogue_audio_path))
+            for sfx in shot.generated_sfx:
+                targets.append((sfx, "waveform", sfx.audio_path))
+
+        if not targets:
+            return
+
+        resolutions = sorted({self.waveform_chars, *self.waveform_resolutions})
+        print(f"Rendering {len(targets)} clips at {resolutions} characters ({self.waveform_scaling} scaling)...")
+
+        waveforms = render_waveforms(
+            [path for _, _, path in targets],
+            resolutions=resolutions,
+            scaling=self.waveform_scaling,
+            loudness_target_db=self.waveform_loudness_target_db
+        )
+
+        for i, (record, key, _) in enumerate(targets):
+            setattr(record, key, waveforms[self.waveform_chars][i])
+            if self.waveform_resolutions:
+                setattr(record, f"{key}s", {
+                    str(num_chars): waveforms[num_chars][i] for num_chars in resolutions
+                })
+
     def stage_2_waveform_generation(self):
         """Generate waveform visualizations for all audio"""
         print("\n" + "="*50)
         print("STAGE 2: Waveform Generation")
         print("="*50)
 
-        shots_with_waveforms = []
-
-        for shot in self.variables.get("processed_shots", []):
-            shot_number = shot["shot_number"]
-            print(f"\nGenerating waveforms for Shot {shot_number}...")
-
-            # Generate dialogue waveform
-            if shot.get("dialogue_audio_path"):
-                waveform = self._generate_waveform(shot["dialogue_audio_path"])
-                shot["dialogue_waveform"] = waveform
-                print(f"  Dialogue: {waveform}")
-
-            # Generate SFX waveforms
-            for i, sfx in enumerate(shot.get("sfx", [])):
-                if sfx.get("audio_path") and not sfx.get("error"):
-                    waveform = self._generate_waveform(sfx["audio_path"])
-                    sfx["waveform"] = waveform
-                    print(f"  SFX {i+1}: {waveform}")
-                elif sfx.get("error"):
-                    print(f"  SFX {i+1}: Skipped (generation failed)")
+        shots_with_waveforms = self.variables.get("processed_shots", [])
 
-            shots_with_waveforms.append(shot)
+        # Word-aligned shots are timed locally; their waveforms are only
+        # rendered in stage 3 if the local placement falls back to Claude
+        if self.local_timing_engine:
+            to_render = [s for s in shots_with_waveforms if s.dialogue_words is None]
+            skipped = len(shots_with_waveforms) - len(to_render)
+            if skipped:
+                print(f"Skipping {skipped} word-aligned shot(s)")
+        else:
+            to_render = shots_with_waveforms
+
+        # Collect every clip in the run so the envelopes are computed in one batch
+        self._render_shot_waveforms(to_render)
+
+        for shot in shots_with_waveforms:
+            print(f"\nWaveforms for Shot {shot.shot_number}:")
+            if shot.dialogue_waveform:
+                print(f"  Dialogue: {shot.dialogue_waveform}")
+            for i, sfx in enumerate(shot.sfx):
+                if sfx.waveform:
+                    print(f"  SFX {i+1}: {sfx.waveform}")
+                elif sfx.error:
+                    print(f"  SFX {i+1}: Skipped (generation failed)")
 
         # Save stage output
         self.variables["shots_with_waveforms"] = shots_with_waveforms
-        self._save_output(2, "waveforms", {"shots": shots_with_waveforms})
+        self._save_output(2, "waveforms", {"shots": shots_to_json(shots_with_waveforms)})
 
         print(f"\n✓ Generated waveforms for {len(shots_with_waveforms)} shots")
 
@@ -612,204 +1306,344 @@ and you will respond with the rewritten dialogue like this:
         print("STAGE 3: Timing Refinement")
         print("="*50)
 
-        refined_shots = []
+        refined_shots = self.variables.get("shots_with_waveforms", [])
+
+        # Only refine shots that have successful SFX
+        to_refine = [shot for shot in refined_shots if any(not s.error for s in shot.sfx)]
 
-        for shot in self.variables.get("shots_with_waveforms", []):
-            shot_number = shot["shot_number"]
+        # Place SFX locally first; only low-confidence shots go to Claude
+        if self.local_timing_engine:
+            llm_shots = [shot for shot in to_refine if not self._place_sfx_locally(shot)]
 
-            if shot.get("sfx") and len(shot["sfx"]) > 0:
-                # Only refine if there are successful SFX
-                successful_sfx = [s for s in shot["sfx"] if not s.get("error")]
-                if successful_sfx:
-                    print(f"\nRefining timings for Shot {shot_number}...")
-                    shot = self._refine_sfx_timing(shot)
+            print(f"\n{len(to_refine) - len(llm_shots)} shot(s) timed locally, "
+                  f"{len(llm_shots)} below confidence {self.timing_confidence_threshold} sent to Claude")
+            to_refine = llm_shots
 
-            refined_shots.append(shot)
+            # Word-aligned shots skipped waveform rendering in stage 2
+            self._render_shot_waveforms([s for s in to_refine if not s.dialogue_waveform])
+
+        if self.timing_batching and len(to_refine) > 1:
+            batches = self._pack_timing_batches(to_refine)
+            print(f"Refining {len(to_refine)} shots in {len(batches)} batched request(s)...")
+
+            fallback = []
+            for batch in batches:
+                fallback.extend(self._refine_sfx_timing_batch(batch))
+
+            if fallback:
+                print(f"\n{len(fallback)} shot(s) missing from batched responses, refining individually")
+            to_refine = fallback
+
+        for shot in to_refine:
+            print(f"\nRefining timings for Shot {shot.shot_number}...")
+            self._refine_sfx_timing(shot)
 
         # Save final output
         self.variables["refined_shots"] = refined_shots
-        self._save_output(3, "refined_timings", {"shots": refined_shots})
+        self._save_output(3, "refined_timings", {"shots": shots_to_json(refined_shots)})
 
-        # Create enhanced shot list with updated dialogue
-        self._create_enhanced_shot_list()
+        # Create enhanced shot list with updated dialogue (shards get one when merged)
+        if not self.shard:
+            self._create_enhanced_shot_list()
 
         print(f"\n✓ Refined timings for {len(refined_shots)} shots")
-        print(f"✓ Saved enhanced shot list to {self.output_dir}/enhanced_shot_list.json")
+
+    def _build_mix_job(self, shot: ShotRecord) -> Optional[Dict]:
+        """
+        Build the picklable mixing job for one shot
+
+        Args:
+            shot: Shot record with dialogue, SFX and refined timings
+
+        Returns:
+            Job descriptor for run_mix_job, or None if the shot cannot be mixed
+        """
+        # Get mixing settings from config
+        mixing_config = self.config.get("mixing", {})
+        shot_number = shot.shot_number
+
+        # Skip if no dialogue audio
+        if not shot.dialogue_audio_path:
+            print(f"\nShot {shot_number}: No dialogue, skipping mixing")
+            return None
+
+        dialogue_path = shot.dialogue_audio_path
+        if not Path(dialogue_path).exists():
+            print(f"\nShot {shot_number}: Warning: Dialogue file not found: {dialogue_path}")
+            return None
+
+        # Collect SFX that can be mixed (timing: refined or default)
+        sfx_entries = []
+        for i, sfx in enumerate(shot.sfx):
+            if not sfx.ok:
+                continue
+            if not Path(sfx.audio_path).exists():
+                print(f"\nShot {shot_number}: Warning: SFX file not found: {sfx.audio_path}")
+                continue
+            sfx_entries.append({
+                "index": i,
+                "audio_path": sfx.audio_path,
+                "timing_percentage": 50 if sfx.refined_timing_percentage is None else sfx.refined_timing_percentage
+            })
+
+        return {
+            "shot_number": shot_number,
+            "dialogue_path": dialogue_path,
+            "sfx": sfx_entries,
+            "output_path": str(self.audio_dir / f"shot_{shot_number:03d}_combined.mp3"),
+            "target_duration": mixing_config.get("target_duration", 10),
+            "sfx_volume": mixing_config.get("sfx_volume", 0.7),
+            "center_dialogue": mixing_config.get("center_dialogue", True),
+            "bitrate": "128k"
+        }
+
+    def _apply_mix_result(self, shot: ShotRecord, result: Dict):
+        """Print a mixing job's log and copy its result fields onto the shot"""
+        print(f"\nMixing Shot {result['shot_number']}...")
+        for line in result["log"]:
+            print(line)
+        for key in ("combined_audio_path", "combined_duration", "sfx_mixed_count", "mixing_error"):
+            if key in result:
+                setattr(shot, key, result[key])
 
     def stage_4_audio_mixing(self):
         """Mix dialogue and SFX into combined 10-second clips"""
+        from .mixing import run_mix_job
+
         print("\n" + "="*50)
         print("STAGE 4: Audio Mixing & Trimming")
         print("="*50)
 
-        # Get mixing settings from config
-        sfx_volume = self.config.get("mixing", {}).get("sfx_volume", 0.7)
-        target_duration_ms = self.config.get("mixing", {}).get("target_duration", 10) * 1000
-        center_dialogue = self.config.get("mixing", {}).get("center_dialogue", True)
+        mixing_config = self.config.get("mixing", {})
+        workers = mixing_config.get("workers", 1) or os.cpu_count() or 1
 
-        mixed_shots = []
+        mixed_shots = self.variables.get("refined_shots", [])
 
-        for shot in self.variables.get("refined_shots", []):
-            shot_number = shot["shot_number"]
+        # Build small job descriptors; audio is decoded inside the job
+        jobs = []
+        job_shots = []
+        for shot in mixed_shots:
+            job = self._build_mix_job(shot)
+            if job:
+                jobs.append(job)
+                job_shots.append(shot)
 
-            # Skip if no dialogue audio
-            if not shot.get("dialogue_audio_path"):
-                print(f"\nShot {shot_number}: No dialogue, skipping mixing")
-                mixed_shots.append(shot)
-                continue
+        # Results are applied in shot order as they arrive, so progress prints per shot
+        applied = 0
+        if workers > 1 and len(jobs) > 1:
+            print(f"\nMixing {len(jobs)} shots across {workers} worker processes...")
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    chunksize = max(1, len(jobs) // (workers * 4))
+                    for shot, result in zip(job_shots, executor.map(run_mix_job, jobs, chunksize=chunksize)):
+                        self._apply_mix_result(shot, result)
+                        applied += 1
+            except BrokenProcessPool as e:
+                # A worker died (e.g. OOM-killed); the unfinished shots are mixed serially
+                print(f"\n⚠ Mixing worker pool failed ({e or 'worker died'}), "
+                      f"mixing the remaining {len(jobs) - applied} shots serially")
+                for shot in job_shots[applied:]:
+                    shot.mixing_error = f"Mixing worker pool failed: {e or 'worker died'}"
+
+        for shot, job in zip(job_shots[applied:], jobs[applied:]):
+            result = run_mix_job(job)
+            if not result.get("mixing_error"):
+                shot.mixing_error = None
+            self._apply_mix_result(shot, result)
 
-            print(f"\nMixing Shot {shot_number}...")
+        # Save stage output
+        self.variables["mixed_shots"] = mixed_shots
+        self._save_output(4, "mixed_audio", {"shots": shots_to_json(mixed_shots)})
 
-            try:
-                # Load dialogue audio
-                dialogue_path = shot["dialogue_audio_path"]
-                if not Path(dialogue_path).exists():
-                    print(f"  Warning: Dialogue file not found: {dialogue_path}")
-                    mixed_shots.append(shot)
-                    continue
+        print(f"\n✓ Created mixed audio for {len([s for s in mixed_shots if s.combined_audio_path])} shots")
 
-                dialogue_audio = AudioSegment.from_mp3(dialogue_path)
-                dialogue_duration_ms = len(dialogue_audio)
-                dialogue_duration_s = dialogue_duration_ms / 1000.0
+    def stage_5_episode_assembly(self):
+        """Assemble every mixed shot into one episode file with a cue sheet"""
+        from .episode import assemble_episode
 
-                print(f"  Dialogue duration: {dialogue_duration_s:.2f}s")
+        print("\n" + "="*50)
+        print("STAGE 5: Episode Assembly")
+        print("="*50)
 
-                # Create base 10-second silent track
-                combined = AudioSegment.silent(duration=target_duration_ms)
+        episode_config = self.config.get("episode", {})
+        if not episode_config.get("enabled", True):
+            print("Episode assembly disabled, skipping")
+            return
+        if self.shard:
+            print("Shard run, the episode is assembled when shards are merged")
+            return
 
-                # Calculate dialogue position (center if configured)
-                if center_dialogue:
-                    dialogue_start_ms = (target_duration_ms - dialogue_duration_ms) // 2
-                else:
-                    dialogue_start_ms = 0
-
-                # Ensure dialogue doesn't go past 10 seconds
-                if dialogue_start_ms + dialogue_duration_ms > target_duration_ms:
-                    dialogue_start_ms = target_duration_ms - dialogue_duration_ms
-
-                if dialogue_start_ms < 0:
-                    # Dialogue is longer than 10 seconds - trim it
-                    print(f"  Warning: Dialogue exceeds 10s, trimming...")
-                    dialogue_audio = dialogue_audio[:target_duration_ms]
-                    dialogue_start_ms = 0
-                    dialogue_duration_ms = target_duration_ms
-
-                # Overlay dialogue
-                combined = combined.overlay(dialogue_audio, position=dialogue_start_ms)
-                print(f"  Dialogue positioned at {dialogue_start_ms/1000:.2f}s")
-
-                # Process each SFX
-                sfx_count = 0
-                for i, sfx in enumerate(shot.get("sfx", [])):
-                    if sfx.get("error") or not sfx.get("audio_path"):
-                        continue
-
-                    sfx_path = sfx["audio_path"]
-                    if not Path(sfx_path).exists():
-                        print(f"  Warning: SFX file not found: {sfx_path}")
-                        continue
-
-                    # Load SFX audio
-                    sfx_audio = AudioSegment.from_mp3(sfx_path)
-
-                    # Apply volume reduction
-                    sfx_audio = sfx_audio - (20 * np.log10(1/sfx_volume))  # Convert to dB reduction
-
-                    # Get timing percentage (use refined or default)
-                    timing_pct = sfx.get("refined_timing_percentage", 50)
-
-                    # Calculate SFX start position relative to dialogue
-                    sfx_start_relative_ms = (timing_pct / 100.0) * dialogue_duration_ms
-                    sfx_start_absolute_ms = dialogue_start_ms + sfx_start_relative_ms
-
-                    # Handle negative timing (SFX starts before dialogue)
-                    if timing_pct < 0:
-                        # Negative percentage means start before dialogue
-                        sfx_start_absolute_ms = dialogue_start_ms + sfx_start_relative_ms
-
-                    print(f"  SFX {i+1} timing: {timing_pct}% → {sfx_start_absolute_ms/1000:.2f}s")
-
-                    # Trim SFX if it starts before 0
-                    if sfx_start_absolute_ms < 0:
-                        trim_amount_ms = int(-sfx_start_absolute_ms)
-                        sfx_audio = sfx_audio[trim_amount_ms:]
-                        print(f"    Trimmed {trim_amount_ms/1000:.2f}s from SFX start")
-                        sfx_start_absolute_ms = 0
-
-                    # Trim SFX if it extends past 10 seconds
-                    sfx_end_ms = sfx_start_absolute_ms + len(sfx_audio)
-                    if sfx_end_ms > target_duration_ms:
-                        trim_amount_ms = int(sfx_end_ms - target_duration_ms)
-                        sfx_audio = sfx_audio[:-trim_amount_ms]
-                        print(f"    Trimmed {trim_amount_ms/1000:.2f}s from SFX end")
-
-                    # Overlay SFX
-                    if sfx_start_absolute_ms >= 0 and sfx_start_absolute_ms < target_duration_ms:
-                        combined = combined.overlay(sfx_audio, position=int(sfx_start_absolute_ms))
-                        sfx_count += 1
-                        print(f"    ✓ Added SFX at {sfx_start_absolute_ms/1000:.2f}s ({len(sfx_audio)/1000:.2f}s duration)")
-
-                # Export combined audio
-                combined_path = self.audio_dir / f"shot_{shot_number:03d}_combined.mp3"
-                combined.export(combined_path, format="mp3", bitrate="128k")
-
-                shot["combined_audio_path"] = str(combined_path)
-                shot["combined_duration"] = len(combined) / 1000.0
-                shot["sfx_mixed_count"] = sfx_count
-
-                print(f"  ✓ Mixed {sfx_count} SFX into combined audio ({len(combined)/1000:.2f}s)")
+        cue_sheet = assemble_episode(self.variables.get("mixed_shots", []), self.output_dir, episode_config)
+        if cue_sheet:
+            self.variables["episode"] = cue_sheet
+            self._save_output(5, "episode_cue_sheet", cue_sheet)
 
-            except Exception as e:
-                print(f"  ERROR mixing audio: {e}")
-                shot["mixing_error"] = str(e)
+    def _time_shot(self, shot: ShotRecord):
+        """
+        Render waveforms and time the SFX of one shot (stages 2 and 3 for a single shot)
 
-            mixed_shots.append(shot)
+        Args:
+            shot: Shot record from _generate_shot_audio
+        """
+        has_sfx = any(not s.error for s in shot.sfx)
+        word_aligned = self.local_timing_engine and shot.dialogue_words is not None
+
+        if not word_aligned:
+            self._render_shot_waveforms([shot])
+        if not has_sfx:
+            return
+        if self.local_timing_engine and self._place_sfx_locally(shot):
+            return
+
+        if not shot.dialogue_waveform:
+            self._render_shot_waveforms([shot])
+        print(f"\nRefining timings for Shot {shot.shot_number}...")
+        self._refine_sfx_timing(shot)
+
+    def _run_pipelined(self):
+        """
+        Run stages 1-4 shot by shot
+
+        A generation thread voices shots in order, a timing thread renders
+        waveforms and places SFX, and the calling thread mixes (in the
+        process pool when mixing.workers > 1). Bounded queues between the
+        steps keep generation at most queue_size shots ahead, so combined
+        clips appear as soon as each shot is ready and total time tracks
+        the slowest step. Batched Claude timing requests are not used in
+        this mode since shots arrive one at a time.
+        """
+        from .mixing import run_mix_job
 
-        # Save stage output
-        self.variables["mixed_shots"] = mixed_shots
-        self._save_output(4, "mixed_audio", {"shots": mixed_shots})
+        print("\n" + "="*50)
+        print("PIPELINED: Generation → Waveforms/Timing → Mixing")
+        print("="*50)
+
+        if not self.shot_list_data:
+            self._load_shot_list()
+
+        shots = self.shot_list_data.get("shots", [])
+        generated = queue.Queue(maxsize=self.pipeline_queue_size)
+        timed = queue.Queue(maxsize=self.pipeline_queue_size)
+        processed_shots = []
+        errors = []
+        # Set on any failure (including Ctrl-C) so no step blocks on a queue the others stopped serving
+        stop = threading.Event()
+
+        def put(target: queue.Queue, item) -> bool:
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
 
-        print(f"\n✓ Created mixed audio for {len([s for s in mixed_shots if s.get('combined_audio_path')])} shots")
+        def get(source: queue.Queue):
+            while not stop.is_set():
+                try:
+                    return source.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return None
+
+        def generate():
+            try:
+                for shot in shots:
+                    if stop.is_set():
+                        break
+                    shot_data = self._generate_shot_audio(shot)
+                    processed_shots.append(shot_data)
+                    put(generated, shot_data)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                put(generated, None)
+
+        def time_shots():
+            try:
+                while True:
+                    shot = get(generated)
+                    if shot is None:
+                        break
+                    self._time_shot(shot)
+                    put(timed, shot)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                put(timed, None)
+
+        workers = [threading.Thread(target=generate), threading.Thread(target=time_shots)]
+        for worker in workers:
+            worker.start()
+
+        mix_workers = self.config.get("mixing", {}).get("workers", 1) or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=mix_workers) if mix_workers > 1 else None
+        pending = []
+        try:
+            while True:
+                shot = get(timed)
+                if shot is None:
+                    break
+                job = self._build_mix_job(shot)
+                if not job:
+                    continue
+                if executor:
+                    pending.append((shot, executor.submit(run_mix_job, job)))
+                    # Report finished mixes in shot order
+                    while pending and pending[0][1].done():
+                        done_shot, future = pending.pop(0)
+                        self._apply_mix_result(done_shot, future.result())
+                else:
+                    self._apply_mix_result(shot, run_mix_job(job))
+
+            if not stop.is_set():
+                for done_shot, future in pending:
+                    self._apply_mix_result(done_shot, future.result())
+        except BaseException as e:
+            # BaseException so Ctrl-C also stops the worker threads instead of hanging the joins below
+            errors.append(e)
+        finally:
+            failed = bool(errors)
+            stop.set()
+            if executor:
+                executor.shutdown(cancel_futures=failed)
+            # Threads finish the API call in flight, then see the stop flag
+            for worker in workers:
+                worker.join()
+
+        if errors:
+            raise errors[0]
+
+        # Same stage outputs as the staged run
+        self.variables["processed_shots"] = processed_shots
+        self.variables["shots_with_waveforms"] = processed_shots
+        self.variables["refined_shots"] = processed_shots
+        self.variables["mixed_shots"] = processed_shots
+        shots_json = shots_to_json(processed_shots)
+        self._save_output(1, "audio_generated", {"shots": shots_json})
+        self._save_output(2, "waveforms", {"shots": shots_json})
+        self._save_output(3, "refined_timings", {"shots": shots_json})
+        self._save_output(4, "mixed_audio", {"shots": shots_json})
+        self._save_debug_log()
+        if not self.shard:
+            self._create_enhanced_shot_list()
+
+        print(f"\n✓ Created mixed audio for {len([s for s in processed_shots if s.combined_audio_path])} "
+              f"of {len(processed_shots)} shots")
 
     def _create_enhanced_shot_list(self):
         """Create enhanced shot list with compressed dialogue for lip sync"""
-        # Load original shot list
-        with open(self.shot_list_path, 'r') as f:
-            original_data = json.load(f)
-
-        # Create mapping of shot numbers to final dialogue
-        dialogue_updates = {}
-        for shot in self.variables.get("refined_shots", []):
-            if shot.get("final_dialogue") and shot.get("compression_iterations", 0) > 0:
-                dialogue_updates[shot["shot_number"]] = shot["final_dialogue"]
-
-        # Update the original shot list with compressed dialogue
-        enhanced_data = original_data.copy()
-        shots_updated = 0
-
-        for scene_data in enhanced_data.get('all_shot_lists', []):
-            for shot in scene_data.get('shot_list', {}).get('shots', []):
-                shot_num = shot.get('shot_number')
-                if shot_num in dialogue_updates:
-                    shot['original_dialogue'] = shot.get('dialogue')
-                    shot['dialogue'] = dialogue_updates[shot_num]
-                    shot['was_compressed'] = True
-                    shots_updated += 1
-
-        # Add metadata and audio information
-        enhanced_shot_list = {
-            "original_shot_list_path": self.shot_list_path,
-            "generation_timestamp": datetime.now().isoformat(),
-            "model_id": self.model_id,
-            "compressed_dialogues_count": shots_updated,
-            "audio_generation_results": self.variables.get("refined_shots", []),
-            "enhanced_shot_lists": enhanced_data.get('all_shot_lists', [])
-        }
+        enhanced, shots_updated = build_enhanced_shot_list(
+            self.shot_list_path, self.variables.get("refined_shots", []), self.model_id
+        )
 
         with open(self.output_dir / "enhanced_shot_list.json", 'w') as f:
-            json.dump(enhanced_shot_list, f, indent=2)
+            json.dump(enhanced, f, indent=2)
 
         print(f"  Updated {shots_updated} shots with compressed dialogue for lip sync")
+        print(f"✓ Saved enhanced shot list to {self.output_dir}/enhanced_shot_list.json")
 
     def _save_debug_log(self):
         """Save detailed debug log for troubleshooting"""
@@ -822,15 +1656,16 @@ and you will respond with the rewritten dialogue like this:
                 "max_shots": self.max_shots
             },
             "compression_attempts": self.debug_log,
+            "http_pools": pool_stats(),
             "statistics": {
                 "total_shots": len(self.variables.get("processed_shots", [])),
                 "dialogue_generated": sum(1 for s in self.variables.get("processed_shots", [])
-                                        if s.get("dialogue_audio_path")),
+                                        if s.dialogue_audio_path),
                 "dialogue_compressed": sum(1 for s in self.variables.get("processed_shots", [])
-                                         if s.get("compression_iterations", 0) > 0),
-                "sfx_generated": sum(len(s.get("sfx", [])) for s in self.variables.get("processed_shots", [])),
+                                         if s.compression_iterations > 0),
+                "sfx_generated": sum(len(s.sfx) for s in self.variables.get("processed_shots", [])),
                 "errors": sum(1 for s in self.variables.get("processed_shots", [])
-                            if s.get("dialogue_error") or any(sfx.get("error") for sfx in s.get("sfx", [])))
+                            if s.dialogue_error or any(sfx.error for sfx in s.sfx))
             }
         }
 
@@ -849,12 +1684,22 @@ and you will respond with the rewritten dialogue like this:
             (1, self.stage_1_audio_generation),
             (2, self.stage_2_waveform_generation),
             (3, self.stage_3_timing_refinement),
-            (4, self.stage_4_audio_mixing)
+            (4, self.stage_4_audio_mixing),
+            (5, self.stage_5_episode_assembly)
         ]
 
-        for stage_num, stage_func in stages:
-            if stage_num >= self.start_stage:
-                stage_func()
+        try:
+            if self.pipelining and self.start_stage == 1:
+                self._run_stage("1-4", self._run_pipelined)
+                self._run_stage(5, self.stage_5_episode_assembly)
+            else:
+                for stage_num, stage_func in stages:
+                    if stage_num >= self.start_stage:
+                        self._run_stage(stage_num, stage_func)
+        except BaseException:
+            # BaseException so Ctrl-C and SystemExit don't leave the run marked running
+            self._finish_run("failed")
+            raise
 
         # Create summary
         summary = self._create_summary()
@@ -868,23 +1713,43 @@ and you will respond with the rewritten dialogue like this:
         print("\nSummary:")
         print(summary)
 
+        self._finish_run("completed")
+
+    def _run_id(self) -> str:
+        """Shards share their run's directory, so include it in the run ID"""
+        if self.shard:
+            return f"{self.output_dir.parent.name}/{self.output_dir.name}"
+        return super()._run_id()
+
+    def _show_name(self) -> Optional[str]:
+        """Inherit the show from the pitch_to_shotlist run that produced the shot list"""
+        source_run = None
+        if self.registry is not None:
+            try:
+                source_run = self.registry.run_for_path(self.shot_list_path)
+            except sqlite3.Error:
+                pass
+        if source_run and source_run.get("show"):
+            return source_run["show"]
+        return super()._show_name()
+
     def _create_summary(self) -> str:
         """Create a human-readable summary of the pipeline run"""
         shots = self.variables.get("mixed_shots", self.variables.get("refined_shots", []))
 
-        total_dialogue = sum(1 for s in shots if s.get("dialogue_audio_path"))
-        total_sfx = sum(len([sfx for sfx in s.get("sfx", []) if not sfx.get("error")]) for s in shots)
-        compressed_count = sum(1 for s in shots if s.get("compression_iterations", 0) > 0)
-        skipped_none = sum(1 for s in shots if s.get("dialogue_skipped"))
-        sfx_errors = sum(len([sfx for sfx in s.get("sfx", []) if sfx.get("error")]) for s in shots)
-        mixed_count = sum(1 for s in shots if s.get("combined_audio_path"))
+        total_dialogue = sum(1 for s in shots if s.dialogue_audio_path)
+        total_sfx = sum(len([sfx for sfx in s.sfx if not sfx.error]) for s in shots)
+        compressed_count = sum(1 for s in shots if s.compression_iterations > 0)
+        skipped_none = sum(1 for s in shots if s.dialogue_skipped)
+        sfx_errors = sum(len([sfx for sfx in s.sfx if sfx.error]) for s in shots)
+        mixed_count = sum(1 for s in shots if s.combined_audio_path)
 
-        total_dialogue_duration = sum(s.get("dialogue_duration", 0) for s in shots)
+        total_dialogue_duration = sum(s.dialogue_duration or 0 for s in shots)
         total_sfx_duration = sum(
-            sfx.get("duration", 0)
+            sfx.duration or 0
             for s in shots
-            for sfx in s.get("sfx", [])
-            if not sfx.get("error")
+            for sfx in s.sfx
+            if not sfx.error
         )
 
         summary = f"""Audio Generation Pipeline Summary
@@ -899,6 +1764,7 @@ Statistics:
 - SFX generation errors: {sfx_errors}
 - Dialogues compressed: {compressed_count}
 - Combined audio created: {mixed_count}
+- Episode: {self.variables.get("episode", {}).get("episode_path", "not assembled")}
 
 Duration:
 - Total dialogue: {total_dialogue_duration:.1f} seconds
@@ -912,7 +1778,7 @@ Configuration:
 - Max shots: {self.max_shots or 'None'}
 
 Debug log available: debug_log.json
-Enhanced shot list: enhanced_shot_list.json
+Enhanced shot list: {"written when the shards are merged" if self.shard else "enhanced_shot_list.json"}
 """
 
         return summary
\ No newline at end of file
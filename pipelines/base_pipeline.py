@@ -5,11 +5,17 @@ Abstract base class for all content generation pipelines
 
 import os
 import json
+import sqlite3
+import time
 import yaml
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .artifacts import ArtifactStore
+from .metrics import RunMetrics
+from .registry import RunRegistry, config_hash, show_name
 
 
 class BasePipeline(ABC):
@@ -18,7 +24,8 @@ class BasePipeline(ABC):
     Provides common functionality for configuration, output management, and execution flow.
     """
 
-    def __init__(self, config_path: str, pipeline_name: str, start_stage: int = 1):
+    def __init__(self, config_path: str, pipeline_name: str, start_stage: int = 1,
+                 output_dir: Optional[str] = None):
         """
         Initialize base pipeline with common setup.
 
@@ -26,6 +33,7 @@ class BasePipeline(ABC):
             config_path: Path to YAML configuration file
             pipeline_name: Name of the pipeline (used for output directory)
             start_stage: Stage number to start from (for recovery)
+            output_dir: Existing run directory to resume into (default: new timestamped directory)
         """
         self.config = self._load_config(config_path)
         self.pipeline_name = pipeline_name
@@ -33,12 +41,21 @@ class BasePipeline(ABC):
         self.run_timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
         # Create output directory for this pipeline run
-        self.output_dir = Path(f"outputs/{pipeline_name}_{self.run_timestamp}")
+        self.output_dir = Path(output_dir or f"outputs/{pipeline_name}_{self.run_timestamp}")
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+        # Shared content-addressed store; run files are hardlinks into it
+        self.artifacts = ArtifactStore.from_config(self.config.get("artifacts", {}))
+        self.manifest = {"started_at": time.time(), "files": {}}
+        manifest_path = self.output_dir / "manifest.json"
+        if self.artifacts and manifest_path.exists():
+            # Resumed run: keep the blobs recorded so far
+            previous = self._load_previous_output(str(manifest_path))
+            self.manifest["files"] = previous.get("files", {})
+            self.manifest["blobs"] = previous.get("blobs", [])
+
         # Copy config to output directory for reference
-        with open(self.output_dir / "config.yaml", "w") as f:
-            yaml.dump(self.config, f, default_flow_style=False)
+        self._write_run_file("config.yaml", yaml.dump(self.config, default_flow_style=False))
 
         # Storage for pipeline variables (data passed between stages)
         self.variables = {}
@@ -46,11 +63,105 @@ class BasePipeline(ABC):
         # Track stage outputs for summary
         self.stage_outputs = []
 
+        # Register the run so later lookups don't have to scan outputs/
+        self.run_id = self._run_id()
+        try:
+            self.registry = RunRegistry()
+        except sqlite3.Error as e:
+            # Run without a registry rather than not at all
+            print(f"  ⚠ Run registry unavailable, this run won't be registered: {e}")
+            self.registry = None
+        self._last_stage_time = time.monotonic()
+        self._registry_call(
+            "start_run", self.run_id, self.pipeline_name, str(self.output_dir.resolve()),
+            show=self._show_name(), config_digest=config_hash(self.config)
+        )
+
+        # Prometheus textfile metrics, rewritten as the run progresses
+        self.metrics = RunMetrics.from_config(self.config.get("metrics", {}), self.pipeline_name, self.run_id)
+
     def _load_config(self, config_path: str) -> Dict:
         """Load YAML configuration file"""
         with open(config_path, "r") as f:
             return yaml.safe_load(f)
 
+    def _run_id(self) -> str:
+        """Registry ID of this run. Can be overridden."""
+        return self.output_dir.name
+
+    def _show_name(self) -> Optional[str]:
+        """Show this run belongs to, for registry queries. Can be overridden."""
+        return show_name(self.config)
+
+    def _registry_call(self, method: str, *args, **kwargs):
+        """Update the run registry; a registry failure never fails the pipeline"""
+        if self.registry is None:
+            return
+        try:
+            getattr(self.registry, method)(*args, **kwargs)
+        except sqlite3.Error as e:
+            print(f"  ⚠ Run registry update failed ({method}): {e}")
+
+    def _finish_run(self, status: str = "completed"):
+        """Mark this run completed or failed in the registry"""
+        self._registry_call("finish_run", self.run_id, status)
+        if self.metrics:
+            self.metrics.finish(status)
+
+    def _run_stage(self, stage, stage_func: Callable):
+        """Run one stage, recording its duration in the run metrics"""
+        started = time.monotonic()
+        try:
+            return stage_func()
+        finally:
+            if self.metrics:
+                self.metrics.stage(str(stage), time.monotonic() - started)
+
+    def _claude_stream(self, stage, start_fn: Callable[[], Iterable]) -> Iterable:
+        """Start a streamed Claude request, metered when metrics are enabled"""
+        if not self.metrics:
+            return start_fn()
+        return self.metrics.metered("anthropic", "unknown", str(stage), start_fn)
+
+    def _write_run_file(self, filename: str, text: str):
+        """
+        Write a file into the run directory
+
+        With the artifact store enabled the file is a hardlink to its blob
+        and is listed in the run's manifest.json.
+        """
+        filepath = self.output_dir / filename
+        if not self.artifacts:
+            with open(filepath, "w") as f:
+                f.write(text)
+            return
+
+        self.manifest["files"][filename] = self.artifacts.write_file(filepath, text.encode("utf-8"))
+        self._write_manifest()
+
+    def _write_manifest(self):
+        """Write manifest.json: run start time and the blob behind each run file"""
+        manifest = dict(self.manifest, store=str(self.artifacts.root))
+        with open(self.output_dir / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    def _raw_response(self, content: str) -> Dict:
+        """
+        Raw model response field for a stage output
+
+        Inline when the artifact store is disabled; otherwise stored once
+        as a blob (compressed if configured) and referenced by digest.
+        """
+        if not self.artifacts:
+            return {"raw_response": content}
+        digest = self.artifacts.put_text(content)
+        self.manifest.setdefault("blobs", [])
+        if digest not in self.manifest["blobs"]:
+            self.manifest["blobs"].append(digest)
+            # Reference the blob on disk right away, so gc can't collect it before the stage output lands
+            self._write_manifest()
+        return {"raw_response_blob": digest}
+
     def _save_output(self, stage_num: int, stage_name: str, data: Dict):
         """
         Save stage output to JSON file.
@@ -63,8 +174,7 @@ class BasePipeline(ABC):
         filename = f"{stage_num:02d}_{stage_name}.json"
         filepath = self.output_dir / filename
 
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=2)
+        self._write_run_file(filename, json.dumps(data, indent=2))
 
         print(f"  → Saved output to {filename}")
 
@@ -75,6 +185,11 @@ class BasePipeline(ABC):
             "file": filename
         })
 
+        now = time.monotonic()
+        self._registry_call("record_stage", self.run_id, stage_num, stage_name, round(now - self._last_stage_time, 3))
+        self._registry_call("record_artifact", self.run_id, stage_name, str(filepath.resolve()), stage_num)
+        self._last_stage_time = now
+
     def _load_previous_output(self, filepath: str) -> Dict:
         """
         Load output from a previous pipeline run.
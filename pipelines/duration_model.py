@@ -0,0 +1,207 @@
+"""
+Speech Duration Model
+Predicts voiced dialogue duration from text, learned from past debug logs
+"""
+
+import json
+import os
+import re
+from glob import glob
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Typical TTS speaking rate used before any history is available
+DEFAULT_CHARS_PER_SECOND = 15.0
+
+# Pseudo-count pulling per-voice/per-model rates toward the parent estimate
+RATE_SHRINKAGE = 5.0
+
+TAG_PATTERN = re.compile(r'\[[^\]]*\]')
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def text_features(text: str) -> Tuple[int, int, int]:
+    """
+    Extract duration features from TTS text
+
+    Parentheticals are removed (they are never voiced) and [bracketed] tags
+    are counted separately from the spoken characters and words.
+
+    Args:
+        text: Dialogue text
+
+    Returns:
+        Tuple of (spoken_chars, words, tags)
+    """
+    text = re.sub(r'\([^)]*\)', '', text)
+    tags = len(TAG_PATTERN.findall(text))
+    spoken = re.sub(r'\s+', ' ', TAG_PATTERN.sub(' ', text)).strip()
+    return len(spoken), len(spoken.split()), tags
+
+
+class SpeechDurationModel:
+    """
+    Linear speech-duration estimator with per-voice and per-model speaking rates.
+
+    A global least-squares fit maps (chars, words, tags) to seconds. Each
+    model_id and each (voice_id, model_id) pair then gets a rate multiplier,
+    the mean ratio of actual to predicted duration, shrunk toward its parent
+    so sparse voices fall back smoothly to the model-wide estimate.
+    """
+
+    def __init__(self):
+        self.coefficients = np.array([1.0 / DEFAULT_CHARS_PER_SECOND, 0.0, 0.0, 0.0])
+        self.model_rates: Dict[str, float] = {}
+        self.voice_rates: Dict[Tuple[str, str], float] = {}
+        self.sample_count = 0
+
+    @staticmethod
+    def load_samples(history_glob: str, max_runs: Optional[int] = None) -> List[Dict]:
+        """
+        Collect training samples from past debug_log.json files
+
+        Args:
+            history_glob: Glob pattern for debug logs
+            max_runs: Only read the most recently written logs (None reads all)
+
+        Returns:
+            List of dicts with chars, words, tags, duration, voice_id and model_id
+        """
+        paths = glob(history_glob)
+        if max_runs:
+            # Bound startup cost as run history grows
+            paths = sorted(paths, key=_mtime, reverse=True)[:max_runs]
+
+        samples = []
+        for path in paths:
+            try:
+                with open(path, "r") as f:
+                    debug_data = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            log_model_id = debug_data.get("config", {}).get("model_id")
+            for entry in debug_data.get("compression_attempts", []):
+                duration = entry.get("duration")
+                # Cancelled streams only hold a lower bound on duration
+                if not duration or entry.get("aborted_early"):
+                    continue
+
+                if "chars" in entry:
+                    chars, words, tags = entry["chars"], entry["words"], entry["tags"]
+                elif len(entry.get("dialogue", "")) < 100:
+                    # Older logs store the dialogue truncated to 100 chars
+                    chars, words, tags = text_features(entry["dialogue"])
+                else:
+                    continue
+
+                if chars == 0:
+                    continue
+
+                samples.append({
+                    "chars": chars,
+                    "words": words,
+                    "tags": tags,
+                    "duration": duration,
+                    "voice_id": entry.get("voice_id"),
+                    "model_id": entry.get("model_id", log_model_id)
+                })
+
+        return samples
+
+    def fit(self, samples: List[Dict]) -> "SpeechDurationModel":
+        """
+        Fit the global regression and per-model/per-voice rates
+
+        Args:
+            samples: Training samples from load_samples
+
+        Returns:
+            self
+        """
+        self.sample_count = len(samples)
+        if not samples:
+            return self
+
+        X = np.array([[s["chars"], s["words"], s["tags"], 1.0] for s in samples], dtype=np.float64)
+        y = np.array([s["duration"] for s in samples], dtype=np.float64)
+
+        if len(samples) >= 2 * X.shape[1]:
+            coefficients, *_ = np.linalg.lstsq(X, y, rcond=None)
+            # Guard against degenerate fits on narrow histories
+            if coefficients[0] > 0:
+                self.coefficients = coefficients
+            else:
+                self.coefficients = np.array([y.sum() / X[:, 0].sum(), 0.0, 0.0, 0.0])
+        else:
+            self.coefficients = np.array([y.sum() / X[:, 0].sum(), 0.0, 0.0, 0.0])
+
+        ratios = y / np.maximum(X @ self.coefficients, 1e-3)
+
+        model_ratios: Dict[str, List[float]] = {}
+        voice_ratios: Dict[Tuple[str, str], List[float]] = {}
+        for sample, ratio in zip(samples, ratios):
+            model_ratios.setdefault(sample["model_id"], []).append(ratio)
+            if sample["voice_id"]:
+                voice_ratios.setdefault((sample["voice_id"], sample["model_id"]), []).append(ratio)
+
+        self.model_rates = {
+            model_id: self._shrink(values, 1.0)
+            for model_id, values in model_ratios.items()
+        }
+        self.voice_rates = {
+            key: self._shrink(values, self.model_rates.get(key[1], 1.0))
+            for key, values in voice_ratios.items()
+        }
+        return self
+
+    @staticmethod
+    def _shrink(values: List[float], prior: float) -> float:
+        """Shrink the mean of values toward a prior by RATE_SHRINKAGE pseudo-counts"""
+        return (sum(values) + RATE_SHRINKAGE * prior) / (len(values) + RATE_SHRINKAGE)
+
+    def predict(self, text: str, voice_id: Optional[str] = None, model_id: Optional[str] = None) -> float:
+        """
+        Predict voiced duration for a line
+
+        Args:
+            text: Dialogue text
+            voice_id: ElevenLabs voice ID
+            model_id: ElevenLabs model ID
+
+        Returns:
+            Predicted duration in seconds
+        """
+        chars, words, tags = text_features(text)
+        base = float(np.dot(self.coefficients, [chars, words, tags, 1.0]))
+
+        rate = self.voice_rates.get((voice_id, model_id), self.model_rates.get(model_id, 1.0))
+        return max(0.0, base * rate)
+
+    def target_chars(self, text: str, target_duration: float, voice_id: Optional[str] = None,
+                     model_id: Optional[str] = None) -> int:
+        """
+        Estimate how many spoken characters fit in target_duration for this line
+
+        Args:
+            text: Dialogue text
+            target_duration: Desired duration in seconds
+            voice_id: ElevenLabs voice ID
+            model_id: ElevenLabs model ID
+
+        Returns:
+            Target spoken character count
+        """
+        chars, _, _ = text_features(text)
+        predicted = self.predict(text, voice_id, model_id)
+        if predicted <= 0:
+            return chars
+        return max(1, int(chars * target_duration / predicted))
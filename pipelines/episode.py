@@ -0,0 +1,260 @@
+"""
+Episode Assembly
+Streams mixed shots onto one timeline and encodes it in fixed-size blocks
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydub import AudioSegment
+
+from .mixing import load_segment, segment_to_array
+
+
+class StreamingEncoder:
+    """
+    Encodes float32 audio through an ffmpeg pipe in fixed-size blocks.
+
+    Samples are copied into one preallocated block buffer and handed to
+    ffmpeg only when the block is full, so memory use depends on the block
+    size and not on the length of the episode.
+    """
+
+    def __init__(self, output_path: str, sample_rate: int, channels: int,
+                 bitrate: str = "192k", block_seconds: float = 1.0):
+        """
+        Start the encoder
+
+        Args:
+            output_path: Encoded output file (format from its extension)
+            sample_rate: Input sample rate
+            channels: Input channel count
+            bitrate: Output bitrate
+            block_seconds: Length of each block written to the encoder
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.samples_written = 0
+
+        self._block = np.zeros((channels, max(1, int(block_seconds * sample_rate))), dtype=np.float32)
+        self._filled = 0
+
+        # Same ffmpeg binary pydub is configured to use
+        self._process = subprocess.Popen(
+            [
+                AudioSegment.converter, "-hide_banner", "-loglevel", "error", "-y",
+                "-f", "s16le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:0",
+                "-b:a", bitrate, output_path
+            ],
+            stdin=subprocess.PIPE
+        )
+
+    def _flush_block(self):
+        """Write the filled part of the block to ffmpeg"""
+        if not self._filled:
+            return
+        pcm = (np.clip(self._block[:, :self._filled], -1.0, 1.0).T * 32767.0).astype(np.int16)
+        self._process.stdin.write(pcm.tobytes())
+        self._filled = 0
+
+    def write(self, samples: np.ndarray):
+        """
+        Append samples to the output
+
+        Args:
+            samples: Float32 samples of shape (channels, n)
+        """
+        position = 0
+        total = samples.shape[1]
+        while position < total:
+            count = min(total - position, self._block.shape[1] - self._filled)
+            self._block[:, self._filled:self._filled + count] = samples[:, position:position + count]
+            self._filled += count
+            position += count
+            if self._filled == self._block.shape[1]:
+                self._flush_block()
+        self.samples_written += total
+
+    def write_silence(self, num_samples: int):
+        """Append num_samples of silence one block at a time"""
+        silence = np.zeros((self.channels, self._block.shape[1]), dtype=np.float32)
+        while num_samples > 0:
+            count = min(num_samples, silence.shape[1])
+            self.write(silence[:, :count])
+            num_samples -= count
+
+    def close(self):
+        """Flush the last partial block and wait for ffmpeg to finish"""
+        self._flush_block()
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self._process.returncode}")
+
+    def abort(self):
+        """Stop ffmpeg without finishing the output (the partial file is left for the caller)"""
+        self._process.kill()
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        self._process.wait()
+
+
+class EpisodeAssembler:
+    """
+    Lays clips end to end with a fixed gap or an equal-power crossfade.
+
+    Only the crossfade tail of the previous clip is held back between
+    clips; everything else goes straight to the encoder, so one decoded
+    shot is the largest buffer in memory at any time.
+    """
+
+    def __init__(self, encoder: StreamingEncoder, gap_seconds: float = 0.0, crossfade_seconds: float = 0.0):
+        """
+        Args:
+            encoder: Destination encoder
+            gap_seconds: Silence between clips (ignored when crossfading)
+            crossfade_seconds: Overlap between consecutive clips
+        """
+        self.encoder = encoder
+        self.gap = int(round(gap_seconds * encoder.sample_rate))
+        self.crossfade = int(round(crossfade_seconds * encoder.sample_rate))
+        self.cues: List[Dict] = []
+        self._tail: Optional[np.ndarray] = None
+
+    def add(self, audio_path: str, shot_number: int) -> Dict:
+        """
+        Decode a clip and append it to the timeline
+
+        Args:
+            audio_path: Clip to append
+            shot_number: Shot number for the cue sheet
+
+        Returns:
+            Cue entry with shot_number, source, start_s, duration_s
+        """
+        clip = segment_to_array(load_segment(audio_path), self.encoder.sample_rate, self.encoder.channels)
+        length = clip.shape[1]
+
+        if self._tail is not None:
+            overlap = min(self._tail.shape[1], length)
+            self.encoder.write(self._tail[:, :self._tail.shape[1] - overlap])
+            start = self.encoder.samples_written
+
+            # Equal-power fade keeps loudness steady through the overlap
+            fade = np.linspace(0.0, np.pi / 2, overlap, dtype=np.float32)
+            self.encoder.write(self._tail[:, self._tail.shape[1] - overlap:] * np.cos(fade)
+                               + clip[:, :overlap] * np.sin(fade))
+            clip = clip[:, overlap:]
+            self._tail = None
+        else:
+            if self.cues and self.gap:
+                self.encoder.write_silence(self.gap)
+            start = self.encoder.samples_written
+
+        hold = min(self.crossfade, clip.shape[1])
+        self.encoder.write(clip[:, :clip.shape[1] - hold])
+        if hold:
+            self._tail = clip[:, clip.shape[1] - hold:]
+
+        cue = {
+            "shot_number": shot_number,
+            "source": audio_path,
+            "start_s": round(start / self.encoder.sample_rate, 3),
+            "duration_s": round(length / self.encoder.sample_rate, 3)
+        }
+        self.cues.append(cue)
+        return cue
+
+    def finish(self) -> float:
+        """
+        Write the held crossfade tail and close the encoder
+
+        Returns:
+            Episode duration in seconds
+        """
+        if self._tail is not None:
+            self.encoder.write(self._tail)
+            self._tail = None
+        self.encoder.close()
+        return self.encoder.samples_written / self.encoder.sample_rate
+
+
+def format_timecode(seconds: float) -> str:
+    """Format seconds as HH:MM:SS.mmm"""
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+def assemble_episode(shots: List, output_dir: Path, settings: Dict) -> Optional[Dict]:
+    """
+    Stream mixed shots into one episode file
+
+    Args:
+        shots: Shot records in episode order; each assembled shot gets episode_start_s
+        output_dir: Directory the episode file is written to
+        settings: The "episode" config section
+
+    Returns:
+        Cue sheet, or None if no shot has combined audio
+    """
+    clips = []
+    missing = []
+    for shot in shots:
+        if shot.combined_audio_path and Path(shot.combined_audio_path).exists():
+            clips.append(shot)
+        else:
+            missing.append(shot.shot_number)
+    if missing:
+        print(f"Shots without combined audio (left out): {missing}")
+    if not clips:
+        print("No mixed shots to assemble")
+        return None
+
+    gap = settings.get("gap_seconds", 0.0)
+    crossfade = settings.get("crossfade_seconds", 0.0)
+    output_path = Path(output_dir) / settings.get("output_name", "episode.mp3")
+    # Encode under a temporary name (same extension, so ffmpeg picks the same format)
+    # so a failed run never leaves a truncated episode behind
+    temp_path = output_path.with_name(f".tmp_{output_path.name}")
+
+    encoder = StreamingEncoder(
+        str(temp_path),
+        sample_rate=settings.get("sample_rate", 44100),
+        channels=settings.get("channels", 2),
+        bitrate=settings.get("bitrate", "192k"),
+        block_seconds=settings.get("block_seconds", 1.0)
+    )
+    assembler = EpisodeAssembler(encoder, gap_seconds=gap, crossfade_seconds=crossfade)
+
+    joins = f"{crossfade}s crossfades" if crossfade else f"{gap}s gaps"
+    print(f"Streaming {len(clips)} shots to {output_path.name} with {joins}...")
+
+    try:
+        for shot in clips:
+            cue = assembler.add(shot.combined_audio_path, shot.shot_number)
+            shot.episode_start_s = cue["start_s"]
+            print(f"  Shot {shot.shot_number}: {format_timecode(cue['start_s'])}")
+        duration = assembler.finish()
+    except BaseException:
+        encoder.abort()
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+    temp_path.replace(output_path)
+
+    print(f"\n✓ Assembled {len(clips)} shots into {output_path.name} ({format_timecode(duration)})")
+
+    return {
+        "episode_path": str(output_path),
+        "duration_s": round(duration, 3),
+        "gap_seconds": 0.0 if crossfade else gap,
+        "crossfade_seconds": crossfade,
+        "cues": [
+            dict(cue, timecode=format_timecode(cue["start_s"])) for cue in assembler.cues
+        ],
+        "missing_shots": missing
+    }
@@ -0,0 +1,175 @@
+"""
+Request Hedging
+Per-call deadlines, jittered backoff and first-byte hedging for provider calls
+"""
+
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 20.0) -> float:
+    """
+    Exponential backoff with full jitter
+
+    Args:
+        attempt: Zero-based retry number
+        base: Delay scale in seconds
+        cap: Maximum delay in seconds
+
+    Returns:
+        Seconds to sleep before the next attempt
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class LatencyTracker:
+    """
+    Rolling time-to-first-byte samples per request kind (e.g. "tts", "sfx").
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, seconds: float):
+        """Record one time-to-first-byte sample"""
+        with self._lock:
+            self._samples.setdefault(kind, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, kind: str, pct: float, min_samples: int = 10) -> Optional[float]:
+        """
+        Latency percentile for a request kind
+
+        Returns:
+            Seconds, or None until min_samples have been recorded
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(kind, ()))
+        if len(samples) < min_samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+
+class _Attempt(threading.Thread):
+    """Starts one request and reports its first chunk (or error) to a shared queue"""
+
+    def __init__(self, start_fn: Callable[[], Iterable[bytes]], results: queue.Queue):
+        super().__init__(daemon=True)
+        self.start_fn = start_fn
+        self.results = results
+        self.started_at = time.monotonic()
+
+    def run(self):
+        try:
+            iterator = iter(self.start_fn())
+            first = next(iterator, b"")
+            self.results.put((self, iterator, first, None))
+        except Exception as e:
+            self.results.put((self, None, None, e))
+
+
+class _WinningStream:
+    """Replays the winning attempt's first chunk, then the rest of its stream"""
+
+    def __init__(self, first: bytes, iterator: Iterator[bytes]):
+        self._first = first
+        self._iterator = iterator
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        if self._first:
+            first, self._first = self._first, b""
+            return first
+        return next(self._iterator)
+
+    def close(self):
+        """Close the underlying response (drops the HTTP connection)"""
+        if hasattr(self._iterator, "close"):
+            self._iterator.close()
+
+
+def _discard_losers(results: queue.Queue, pending: int):
+    """Close iterators of hedged attempts that lost the race once they report"""
+    for _ in range(pending):
+        _, iterator, _, _ = results.get()
+        if iterator is not None and hasattr(iterator, "close"):
+            iterator.close()
+
+
+def hedged_stream(
+    start_fn: Callable[[], Iterable[bytes]],
+    deadline: float,
+    hedge_after: Optional[float] = None,
+    tracker: Optional[LatencyTracker] = None,
+    kind: str = "request"
+) -> Iterator[bytes]:
+    """
+    Start a streaming request, hedging it if the first byte is slow
+
+    If no chunk has arrived after ``hedge_after`` seconds a duplicate
+    request is started and whichever produces its first chunk first is
+    kept; the other is closed when it reports. The whole wait for a first
+    chunk is bounded by ``deadline``.
+
+    Args:
+        start_fn: Starts the request and returns its chunk iterator
+        deadline: Seconds to wait for a first chunk before giving up
+        hedge_after: Seconds before firing a duplicate (None disables hedging)
+        tracker: Records time-to-first-byte of the winning attempt
+        kind: Request kind for the tracker
+
+    Returns:
+        Iterator over the winning request's chunks, with a close() method
+
+    Raises:
+        TimeoutError: If no attempt produces a first chunk within the deadline
+    """
+    results = queue.Queue()
+    started = time.monotonic()
+    attempts = [_Attempt(start_fn, results)]
+    attempts[0].start()
+    reported = 0
+
+    while True:
+        remaining = deadline - (time.monotonic() - started)
+        can_hedge = hedge_after is not None and len(attempts) == 1
+        wait = min(remaining, hedge_after - (time.monotonic() - started)) if can_hedge else remaining
+
+        try:
+            attempt, iterator, first, error = results.get(timeout=max(wait, 0))
+        except queue.Empty:
+            if can_hedge and time.monotonic() - started < deadline:
+                print(f"    No response after {hedge_after:.1f}s, hedging {kind} request...")
+                hedge = _Attempt(start_fn, results)
+                attempts.append(hedge)
+                hedge.start()
+                continue
+            # Late reporters are closed in the background
+            threading.Thread(
+                target=_discard_losers, args=(results, len(attempts) - reported), daemon=True
+            ).start()
+            raise TimeoutError(f"{kind} request produced no data within {deadline:g}s deadline")
+
+        reported += 1
+        if error is not None:
+            if reported < len(attempts):
+                # The other attempt may still succeed
+                continue
+            raise error
+
+        if tracker:
+            tracker.record(kind, time.monotonic() - attempt.started_at)
+
+        pending = len(attempts) - reported
+        if pending:
+            threading.Thread(target=_discard_losers, args=(results, pending), daemon=True).start()
+
+        return _WinningStream(first, iterator)
@@ -0,0 +1,430 @@
+"""
+Job Queue
+SQLite-backed queue of pipeline runs with leases, retries and dependencies
+"""
+
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .hedging import backoff_delay
+
+
+DEFAULT_QUEUE_PATH = "outputs/jobs.db"
+
+PIPELINES = ("pitch_to_shotlist", "audio_generation")
+
+# Jobs in these states are never picked up again
+FINAL_STATES = ("done", "failed", "cancelled")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    episode TEXT NOT NULL,
+    pipeline TEXT NOT NULL,
+    config_path TEXT NOT NULL,
+    shot_list_path TEXT,
+    depends_on INTEGER REFERENCES jobs (id),
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    not_before REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    run_dir TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, not_before, id);
+CREATE INDEX IF NOT EXISTS jobs_by_dependency ON jobs (depends_on);
+"""
+
+
+class JobQueue:
+    """
+    Durable queue of pipeline jobs shared by any number of worker processes.
+
+    A job is one pipeline run for one episode. Workers claim a job with a
+    time-limited lease and keep extending it while the run is alive; a job
+    whose lease expires (worker crashed or was killed) is claimed again by
+    the next worker. Failed attempts are retried with backoff until
+    max_attempts, then the job and everything depending on it fail.
+    """
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit; claims use explicit BEGIN IMMEDIATE so only one worker wins a job
+        db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def enqueue(self, episode: str, pipeline: str, config_path: str,
+                shot_list_path: Optional[str] = None, depends_on: Optional[int] = None,
+                max_attempts: int = 3) -> int:
+        """
+        Add one pipeline job
+
+        Args:
+            episode: Episode label (groups related jobs)
+            pipeline: "pitch_to_shotlist" or "audio_generation"
+            config_path: Pipeline config file
+            shot_list_path: Shot list for an audio job (omit when depends_on is a pitch job)
+            depends_on: Job that must finish first
+            max_attempts: Attempts before the job is marked failed
+
+        Paths are stored absolute (resolved against the current directory),
+        since workers run jobs from the project root.
+
+        Returns:
+            New job ID
+        """
+        if pipeline not in PIPELINES:
+            raise ValueError(f"Unknown pipeline: {pipeline}")
+        if pipeline == "audio_generation" and not (shot_list_path or depends_on):
+            raise ValueError("An audio job needs a shot list or a pitch job to depend on")
+
+        config_path = os.path.abspath(config_path)
+        if shot_list_path:
+            shot_list_path = os.path.abspath(shot_list_path)
+
+        now = time.time()
+        with self._connect() as db:
+            cursor = db.execute(
+                "INSERT INTO jobs (episode, pipeline, config_path, shot_list_path, depends_on, max_attempts, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (episode, pipeline, config_path, shot_list_path, depends_on, max_attempts, now, now)
+            )
+            return cursor.lastrowid
+
+    def enqueue_episode(self, episode: str, pitch_config: str, audio_config: str, max_attempts: int = 3) -> List[int]:
+        """
+        Queue a full episode: pitch to shot list, then audio generation on its shot list
+
+        Returns:
+            [pitch job ID, audio job ID]
+        """
+        pitch_job = self.enqueue(episode, "pitch_to_shotlist", pitch_config, max_attempts=max_attempts)
+        audio_job = self.enqueue(episode, "audio_generation", audio_config,
+                                 depends_on=pitch_job, max_attempts=max_attempts)
+        return [pitch_job, audio_job]
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        """
+        Lease the oldest runnable job
+
+        A job is runnable when it is pending (and past its retry delay) or
+        running with an expired lease, and its dependency is done.
+
+        Returns:
+            The claimed job, or None if nothing is runnable
+        """
+        now = time.time()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+
+            # Workers that died on a job's last attempt leave it running with a stale lease
+            for stale in db.execute(
+                "SELECT id FROM jobs WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now,)
+            ).fetchall():
+                db.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'Lease expired on final attempt', "
+                    "lease_owner = NULL, lease_expires = NULL, updated_at = ? WHERE id = ?",
+                    (now, stale["id"])
+                )
+                self._close_dependents(db, stale["id"], "failed", f"Dependency job {stale['id']} failed")
+
+            row = db.execute(
+                "SELECT jobs.* FROM jobs LEFT JOIN jobs AS dependency ON dependency.id = jobs.depends_on "
+                "WHERE ((jobs.status = 'pending' AND jobs.not_before <= ?) "
+                "       OR (jobs.status = 'running' AND jobs.lease_expires < ?)) "
+                "AND (jobs.depends_on IS NULL OR dependency.status = 'done') "
+                "ORDER BY jobs.id LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+
+            job = dict(row)
+            if job["status"] == "running":
+                print(f"Reclaiming job {job['id']} (lease held by {job['lease_owner']} expired)")
+
+            # Audio jobs read the shot list their pitch job produced
+            if job["pipeline"] == "audio_generation" and job["depends_on"] and not job["shot_list_path"]:
+                dependency = db.execute("SELECT run_dir FROM jobs WHERE id = ?", (job["depends_on"],)).fetchone()
+                job["shot_list_path"] = os.path.join(dependency["run_dir"], "05_shot_list_final.json")
+
+            # The run directory is fixed on first claim so retries resume into it
+            if not job["run_dir"]:
+                stamp = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime(now))
+                job["run_dir"] = f"outputs/{job['pipeline']}_{stamp}_job{job['id']}"
+
+            job["attempts"] += 1
+            job["status"] = "running"
+            job["lease_owner"] = worker_id
+            job["lease_expires"] = now + lease_seconds
+            db.execute(
+                "UPDATE jobs SET status = 'running', attempts = ?, lease_owner = ?, lease_expires = ?, "
+                "run_dir = ?, shot_list_path = ?, updated_at = ? WHERE id = ?",
+                (job["attempts"], worker_id, job["lease_expires"], job["run_dir"],
+                 job["shot_list_path"], now, job["id"])
+            )
+            db.execute("COMMIT")
+            return job
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extend a lease
+
+        Returns:
+            False if the worker no longer holds the job (cancelled or reclaimed)
+        """
+        with self._connect() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (time.time() + lease_seconds, time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str):
+        """Mark a leased job done, releasing its dependents"""
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = 'done', error = NULL, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (time.time(), job_id, worker_id)
+            )
+
+    def fail(self, job_id: int, worker_id: str, error: str, backoff_base: float = 30.0, backoff_cap: float = 600.0):
+        """
+        Record a failed attempt
+
+        The job goes back to pending after a jittered backoff, or is marked
+        failed (with its dependents) once it has used all its attempts.
+        """
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return
+
+            if row["attempts"] < row["max_attempts"]:
+                delay = backoff_delay(row["attempts"] - 1, backoff_base, backoff_cap)
+                db.execute(
+                    "UPDATE jobs SET status = 'pending', error = ?, not_before = ?, lease_owner = NULL, "
+                    "lease_expires = NULL, updated_at = ? WHERE id = ?",
+                    (error, now + delay, now, job_id)
+                )
+            else:
+                db.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, lease_owner = NULL, lease_expires = NULL, "
+                    "updated_at = ? WHERE id = ?",
+                    (error, now, job_id)
+                )
+                self._close_dependents(db, job_id, "failed", f"Dependency job {job_id} failed")
+
+    def cancel(self, job_id: Optional[int] = None, episode: Optional[str] = None) -> int:
+        """
+        Cancel unfinished jobs (and the jobs depending on them)
+
+        Running jobs are stopped by their worker at its next heartbeat.
+
+        Returns:
+            Number of jobs cancelled
+        """
+        with self._connect() as db:
+            if job_id is not None:
+                ids = [row["id"] for row in db.execute(
+                    "SELECT id FROM jobs WHERE id = ? AND status NOT IN (?, ?, ?)", (job_id, *FINAL_STATES)
+                )]
+            else:
+                ids = [row["id"] for row in db.execute(
+                    "SELECT id FROM jobs WHERE episode = ? AND status NOT IN (?, ?, ?)", (episode, *FINAL_STATES)
+                )]
+
+            cancelled = 0
+            for cancel_id in ids:
+                cursor = db.execute(
+                    "UPDATE jobs SET status = 'cancelled', error = 'Cancelled', updated_at = ? "
+                    "WHERE id = ? AND status NOT IN (?, ?, ?)",
+                    (time.time(), cancel_id, *FINAL_STATES)
+                )
+                cancelled += cursor.rowcount
+                cancelled += self._close_dependents(db, cancel_id, "cancelled", f"Dependency job {cancel_id} cancelled")
+            return cancelled
+
+    def _close_dependents(self, db: sqlite3.Connection, job_id: int, status: str, reason: str) -> int:
+        """Give every unfinished job downstream of job_id a final status"""
+        closed = 0
+        for row in db.execute("SELECT id FROM jobs WHERE depends_on = ?", (job_id,)).fetchall():
+            cursor = db.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status NOT IN (?, ?, ?)",
+                (status, reason, time.time(), row["id"], *FINAL_STATES)
+            )
+            closed += cursor.rowcount
+            closed += self._close_dependents(db, row["id"], status, reason)
+        return closed
+
+    def job(self, job_id: int) -> Optional[Dict]:
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def jobs(self, episode: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Jobs, newest first, optionally filtered"""
+        query = "SELECT * FROM jobs WHERE 1 = 1"
+        params: List = []
+        if episode:
+            query += " AND episode = ?"
+            params.append(episode)
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as db:
+            return [dict(row) for row in db.execute(query, params)]
+
+
+def format_jobs(jobs: List[Dict]) -> str:
+    """Table of jobs for the CLI"""
+    if not jobs:
+        return "No jobs"
+
+    lines = [f"{'ID':>5}  {'EPISODE':<20} {'PIPELINE':<18} {'STATUS':<10} {'TRIES':>5}  {'DEPENDS':>7}  RUN DIR / ERROR"]
+    for job in jobs:
+        detail = job["error"] if job["error"] and job["status"] != "done" else (job["run_dir"] or "")
+        lines.append(
+            f"{job['id']:>5}  {job['episode'][:20]:<20} {job['pipeline']:<18} {job['status']:<10} "
+            f"{job['attempts']:>2}/{job['max_attempts']:<2}  {job['depends_on'] or '':>7}  {detail}"
+        )
+    return "\n".join(lines)
+
+
+
+class Worker:
+    """
+    Runs queued jobs one at a time, each as a subprocess of its runner script.
+
+    The lease is extended every lease_seconds / 3 while the run is alive.
+    If the job is cancelled or the lease is lost, the run is interrupted
+    (SIGINT, so it marks itself failed and cleans up as on Ctrl-C) and
+    killed if it hasn't exited within stop_seconds.
+    """
+
+    RUNNERS = {
+        "pitch_to_shotlist": "run_pitch_to_shotlist.py",
+        "audio_generation": "run_audio_generation.py"
+    }
+
+    def __init__(self, job_queue: JobQueue, worker_id: Optional[str] = None, lease_seconds: float = 120.0,
+                 poll_seconds: float = 10.0, stop_seconds: float = 60.0):
+        self.queue = job_queue
+        self.worker_id = worker_id or f"{os.uname().nodename}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.stop_seconds = stop_seconds
+        self.project_root = Path(__file__).resolve().parent.parent
+
+    def _path(self, path: str) -> str:
+        """A job path as the runner sees it (relative paths, like run_dir, are under the project root)"""
+        return str(self.project_root / path)
+
+    def _command(self, job: Dict) -> List[str]:
+        """Runner invocation for a claimed job"""
+        command = [
+            sys.executable, str(self.project_root / self.RUNNERS[job["pipeline"]]),
+            "--config", self._path(job["config_path"])
+        ]
+        if job["pipeline"] == "pitch_to_shotlist":
+            command += ["--output-dir", self._path(job["run_dir"])]
+        else:
+            # --resume reuses clips from the run's checkpoint journal on retries
+            command += ["--shot-list", self._path(job["shot_list_path"]), "--resume", self._path(job["run_dir"])]
+        return command
+
+    def _stop(self, process: subprocess.Popen, interrupt: bool = True):
+        """Interrupt a run, killing it if it doesn't exit within stop_seconds"""
+        if interrupt:
+            process.send_signal(signal.SIGINT)
+        try:
+            process.wait(timeout=self.stop_seconds)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def run_job(self, job: Dict):
+        """Run one claimed job to completion, failure or cancellation"""
+        run_dir = Path(self._path(job["run_dir"]))
+        run_dir.mkdir(parents=True, exist_ok=True)
+        log_path = run_dir / "job.log"
+        print(f"[{self.worker_id}] Job {job['id']}: {job['pipeline']} for {job['episode']} "
+              f"(attempt {job['attempts']}/{job['max_attempts']}) → {log_path}")
+
+        with open(log_path, "a") as log:
+            log.write(f"\n=== Attempt {job['attempts']} by {self.worker_id} at {time.ctime()} ===\n")
+            log.flush()
+            process = subprocess.Popen(self._command(job), stdout=log, stderr=subprocess.STDOUT,
+                                       cwd=str(self.project_root))
+            try:
+                while True:
+                    try:
+                        returncode = process.wait(timeout=self.lease_seconds / 3)
+                        break
+                    except subprocess.TimeoutExpired:
+                        if not self.queue.heartbeat(job["id"], self.worker_id, self.lease_seconds):
+                            print(f"[{self.worker_id}] Job {job['id']} cancelled or reclaimed, stopping run")
+                            self._stop(process)
+                            return
+            except BaseException as e:
+                # Ctrl-C in the worker's terminal has already reached the run
+                self._stop(process, interrupt=not isinstance(e, KeyboardInterrupt))
+                self.queue.fail(job["id"], self.worker_id, "Worker stopped during run")
+                raise
+
+        if returncode == 0:
+            self.queue.complete(job["id"], self.worker_id)
+            print(f"[{self.worker_id}] Job {job['id']} done")
+        else:
+            self.queue.fail(job["id"], self.worker_id, f"Exit status {returncode}, see {log_path}")
+            print(f"[{self.worker_id}] Job {job['id']} failed with exit status {returncode}")
+
+    def run(self, once: bool = False):
+        """
+        Claim and run jobs until interrupted
+
+        Args:
+            once: Exit when no job is runnable instead of polling
+        """
+        print(f"[{self.worker_id}] Worker started on {self.queue.path}")
+        while True:
+            job = self.queue.claim(self.worker_id, self.lease_seconds)
+            if job:
+                self.run_job(job)
+                continue
+            if once:
+                return
+            time.sleep(self.poll_seconds)
@@ -0,0 +1,156 @@
+"""
+Checkpoint Journal
+Append-only JSONL record of completed stage 1 assets for crash-safe resume
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def describe_asset(path: str) -> Dict:
+    """Size and checksum record for an asset file"""
+    return {"path": str(path), "size": os.path.getsize(path), "sha256": file_checksum(path)}
+
+
+def verify_asset(asset: Dict) -> bool:
+    """Whether an asset file still exists with the recorded size and checksum"""
+    path = asset.get("path")
+    if not path or not os.path.exists(path):
+        return False
+    if os.path.getsize(path) != asset.get("size"):
+        return False
+    return file_checksum(path) == asset.get("sha256")
+
+
+class ShotJournal:
+    """
+    Append-only journal of stage 1 results.
+
+    Each completed dialogue clip and SFX clip is appended as one
+    JSON line, written with a single write and fsynced, so a crash can
+    only lose the line being written. On load, a torn trailing line is
+    ignored and later records for the same key replace earlier ones.
+    Asset files are verified by size and SHA-256 before a record is
+    reused, so missing or corrupt clips are regenerated.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) a journal
+
+        Args:
+            path: Journal file path, e.g. <output_dir>/01_audio_journal.jsonl
+        """
+        self.path = Path(path)
+        self.dialogue: Dict[int, Dict] = {}
+        self.sfx: Dict[tuple, Dict] = {}
+        self._load()
+
+    def _load(self):
+        """Read existing records, skipping a torn final line"""
+        if not self.path.exists():
+            return
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        # Cut a torn final line so the next append starts on a fresh line
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(complete)
+
+        for line in data[:complete].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+
+            shot_number = record.get("shot_number")
+            if record.get("type") == "dialogue":
+                self.dialogue[shot_number] = record
+            elif record.get("type") == "sfx":
+                self.sfx[(shot_number, record.get("index"))] = record
+
+    def _append(self, record: Dict):
+        """Append one record durably"""
+        record["recorded_at"] = datetime.now().isoformat()
+        line = json.dumps(record) + "\n"
+        with open(self.path, "a") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record_dialogue(self, shot_number: int, source_dialogue: str, result: Dict):
+        """
+        Record a generated dialogue clip
+
+        Args:
+            shot_number: Shot number
+            source_dialogue: Dialogue from the shot list the clip was generated from
+            result: Dialogue fields of the shot data (dialogue_audio_path, final_dialogue, ...)
+        """
+        record = {
+            "type": "dialogue",
+            "shot_number": shot_number,
+            "source_dialogue": source_dialogue,
+            "result": result,
+            "assets": [describe_asset(result["dialogue_audio_path"])]
+        }
+        self.dialogue[shot_number] = record
+        self._append(record)
+
+    def record_sfx(self, shot_number: int, index: int, result: Dict):
+        """
+        Record a generated SFX clip
+
+        Args:
+            shot_number: Shot number
+            index: 1-based SFX index within the shot
+            result: SFX entry (description, audio_path, duration)
+        """
+        record = {
+            "type": "sfx",
+            "shot_number": shot_number,
+            "index": index,
+            "result": result,
+            "assets": [describe_asset(result["audio_path"])]
+        }
+        self.sfx[(shot_number, index)] = record
+        self._append(record)
+
+    @staticmethod
+    def _valid(record: Optional[Dict]) -> Optional[Dict]:
+        """Return the record if all of its assets verify"""
+        if record and all(verify_asset(asset) for asset in record.get("assets", [])):
+            return record
+        return None
+
+    def completed_dialogue(self, shot_number: int, source_dialogue: str) -> Optional[Dict]:
+        """Stored dialogue fields if the clip was generated from the same line and is intact"""
+        record = self.dialogue.get(shot_number)
+        if not record or record.get("source_dialogue") != source_dialogue:
+            return None
+        record = self._valid(record)
+        return record["result"] if record else None
+
+    def completed_sfx(self, shot_number: int, index: int, description: str) -> Optional[Dict]:
+        """Stored SFX entry if it was generated from the same description and is intact"""
+        record = self.sfx.get((shot_number, index))
+        if not record or record["result"].get("description") != description:
+            return None
+        record = self._valid(record)
+        return record["result"] if record else None
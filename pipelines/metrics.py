@@ -0,0 +1,276 @@
+"""
+Run Metrics
+Counters and histograms for a pipeline run, exported in Prometheus text format
+"""
+
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+
+DEFAULT_TEXTFILE_PATH = "outputs/metrics/{pipeline}_{run_id}.prom"
+PREFIX = "content_pipeline"
+
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+STAGE_BUCKETS = (10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 1800.0, 3600.0, 7200.0)
+ITERATION_BUCKETS = (0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 8.0)
+
+# name: (type, help, histogram buckets)
+METRICS = {
+    "api_calls_total": ("counter", "API calls by provider, model, stage and outcome", None),
+    "api_latency_seconds": ("histogram", "API call latency, request start to last byte", LATENCY_BUCKETS),
+    "api_retries_total": ("counter", "API calls retried after a failure", None),
+    "compression_iterations": ("histogram", "Compression rewrites per voiced dialogue line", ITERATION_BUCKETS),
+    "cache_hits_total": ("counter", "Work reused instead of redone", None),
+    "cache_misses_total": ("counter", "Cache lookups that found nothing reusable", None),
+    "audio_bytes_total": ("counter", "Bytes of audio received from providers", None),
+    "stage_duration_seconds": ("histogram", "Wall time per pipeline stage", STAGE_BUCKETS),
+    "run_start_timestamp_seconds": ("gauge", "Unix time the run started", None),
+    "run_end_timestamp_seconds": ("gauge", "Unix time the run finished, by final status", None),
+    "last_update_timestamp_seconds": ("gauge", "Unix time this file was last written", None)
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class RunMetrics:
+    """
+    Metrics for one pipeline run, written to a node_exporter textfile.
+
+    Every sample carries pipeline and run_id labels, so files of
+    concurrent runs never collide. The file is rewritten atomically,
+    after each stage and at most every interval seconds while API calls
+    complete, so scrapes see progress during the run. A finished run's
+    file is kept for retention seconds (so its final values get scraped)
+    and then removed by the next run that starts in the same directory,
+    as is the file of a run killed before it finished once it has gone
+    retention seconds without an update.
+    """
+
+    def __init__(self, path: str, pipeline: str, run_id: str, interval: float = 10.0,
+                 retention: float = 3600.0):
+        """
+        Args:
+            path: Textfile path; {pipeline} and {run_id} are filled in
+            pipeline: Pipeline name
+            run_id: Registry ID of the run
+            interval: Minimum seconds between writes triggered by API calls
+            retention: Seconds a finished run's file is kept
+        """
+        safe_run_id = re.sub(r"[^A-Za-z0-9_.-]", "_", run_id)
+        self.path = Path(path.format(pipeline=pipeline, run_id=safe_run_id))
+        self.pipeline = pipeline
+        self.run_id = run_id
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._values: Dict[str, Dict[LabelKey, object]] = {name: {} for name in METRICS}
+        self._last_write = 0.0
+        self.set("run_start_timestamp_seconds", time.time())
+        remove_finished(self.path.parent, retention)
+
+    @classmethod
+    def from_config(cls, settings: Dict, pipeline: str, run_id: str) -> Optional["RunMetrics"]:
+        """Metrics for a "metrics" config section, or None if disabled"""
+        if not settings.get("enabled", False):
+            return None
+        return cls(
+            path=settings.get("textfile_path", DEFAULT_TEXTFILE_PATH),
+            pipeline=pipeline,
+            run_id=run_id,
+            interval=settings.get("write_interval_seconds", 10.0),
+            retention=settings.get("finished_retention_seconds", 3600.0)
+        )
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(sorted(dict(labels, pipeline=self.pipeline, run_id=self.run_id).items()))
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[name][key] = self._values[name].get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self._values[name][self._key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        buckets = METRICS[name][2]
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values[name].get(key, ([0] * len(buckets), 0.0, 0))
+            counts = [n + (1 if value <= bound else 0) for n, bound in zip(counts, buckets)]
+            self._values[name][key] = (counts, total + value, count + 1)
+
+    # Pipeline events
+
+    def api_call(self, provider: str, model: str, stage: str, seconds: float, outcome: str = "ok"):
+        """Count one API call and record its latency"""
+        self.inc("api_calls_total", provider=provider, model=model, stage=stage, outcome=outcome)
+        self.observe("api_latency_seconds", seconds, provider=provider, model=model, stage=stage)
+        self.maybe_write()
+
+    def retry(self, provider: str, stage: str):
+        self.inc("api_retries_total", provider=provider, stage=stage)
+
+    def cache(self, cache: str, hit: bool):
+        self.inc("cache_hits_total" if hit else "cache_misses_total", cache=cache)
+
+    def stage(self, stage: str, seconds: float):
+        """Record a finished stage and write the file"""
+        self.observe("stage_duration_seconds", seconds, stage=stage)
+        self.write()
+
+    def finish(self, status: str):
+        """Mark the run finished and write the file (removed after the retention period)"""
+        self.set("run_end_timestamp_seconds", time.time(), status=status)
+        self.write()
+
+    def metered(self, provider: str, model: str, stage: str, start_fn: Callable[[], Iterable],
+                audio_kind: Optional[str] = None) -> Iterator:
+        """
+        Start a streamed API call and pass its items through, recording the call when it ends
+
+        Claude event streams end at message_stop (their model is taken from
+        message_start); audio streams end when exhausted, and with
+        audio_kind set their bytes are counted. Streams closed early are
+        recorded with outcome "aborted".
+        """
+        started = time.monotonic()
+        try:
+            stream = start_fn()
+        except Exception:
+            self.api_call(provider, model, stage, time.monotonic() - started, "error")
+            raise
+        return self._metered_items(stream, provider, model, stage, started, audio_kind)
+
+    def _metered_items(self, stream: Iterable, provider: str, model: str, stage: str,
+                       started: float, audio_kind: Optional[str]) -> Iterator:
+        recorded = False
+        received = 0
+        outcome = "error"
+        try:
+            for item in stream:
+                if audio_kind:
+                    received += len(item)
+                elif getattr(item, "type", None) == "message_start":
+                    model = getattr(item.message, "model", None) or model
+                elif getattr(item, "type", None) == "message_stop":
+                    # Callers stop reading here, so the call is complete
+                    self.api_call(provider, model, stage, time.monotonic() - started)
+                    recorded = True
+                yield item
+            outcome = "ok"
+        except GeneratorExit:
+            outcome = "aborted"
+            raise
+        finally:
+            # Closing the underlying stream drops its HTTP response
+            if hasattr(stream, "close"):
+                stream.close()
+            if received:
+                self.inc("audio_bytes_total", received, provider=provider, kind=audio_kind)
+            if not recorded:
+                self.api_call(provider, model, stage, time.monotonic() - started, outcome)
+
+    # Export
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, buckets) in METRICS.items():
+                samples = self._values[name]
+                if not samples:
+                    continue
+                full_name = f"{PREFIX}_{name}"
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} {kind}")
+                for labels, value in sorted(samples.items()):
+                    if kind != "histogram":
+                        lines.append(f"{full_name}{_format_labels(labels)} {_format_value(value)}")
+                        continue
+                    counts, total, count = value
+                    for bound, n in zip(buckets, counts):
+                        lines.append(f"{full_name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {n}")
+                    lines.append(f"{full_name}_bucket{_format_labels(labels, ('le', '+Inf'))} {count}")
+                    lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_value(round(total, 6))}")
+                    lines.append(f"{full_name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def _write_file(self):
+        """Atomically replace the textfile (the collector never sees a partial file)"""
+        self.set("last_update_timestamp_seconds", time.time())
+        text = self.render()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # No .prom suffix, so the collector ignores the file until it is renamed
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(text)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def write(self):
+        """Write the textfile now; a failed write never fails the run"""
+        self._last_write = time.monotonic()
+        try:
+            self._write_file()
+        except OSError as e:
+            print(f"  ⚠ Metrics textfile write failed: {e}")
+
+    def maybe_write(self):
+        """Write if the last write is older than the interval"""
+        if time.monotonic() - self._last_write >= self.interval:
+            self.write()
+
+
+def remove_finished(directory: Path, retention: float):
+    """
+    Delete textfiles of runs that ended more than retention seconds ago
+
+    A run has ended when it recorded run_end_timestamp_seconds, or when
+    its file has not been updated for the retention period (the process
+    was killed before it could record its end). Only files carrying this
+    module's last_update_timestamp_seconds are touched, so other
+    collectors' files in the directory are left alone.
+    """
+    end_metric = f"{PREFIX}_run_end_timestamp_seconds"
+    update_metric = f"{PREFIX}_last_update_timestamp_seconds"
+    cutoff = time.time() - retention
+    for path in Path(directory).glob("*.prom"):
+        try:
+            ends = []
+            updates = []
+            with open(path, "r") as f:
+                for line in f:
+                    if line.startswith(end_metric):
+                        ends.append(float(line.rsplit(" ", 1)[1]))
+                    elif line.startswith(update_metric):
+                        updates.append(float(line.rsplit(" ", 1)[1]))
+            if (ends and max(ends) < cutoff) or (updates and max(updates) < cutoff):
+                os.remove(path)
+        except (OSError, ValueError, IndexError):
+            continue
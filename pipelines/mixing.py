@@ -0,0 +1,302 @@
+"""
+Mixing Engine
+Float32 timeline mixing for dialogue and SFX clips
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydub import AudioSegment
+
+
+def load_segment(audio_path: str) -> AudioSegment:
+    """
+    Decode an audio file with pydub, normalized to 16-bit samples
+
+    Args:
+        audio_path: Path to audio file
+
+    Returns:
+        Decoded AudioSegment
+    """
+    return AudioSegment.from_file(audio_path).set_sample_width(2)
+
+
+def segment_to_array(segment: AudioSegment, sample_rate: int, channels: int) -> np.ndarray:
+    """
+    Convert an AudioSegment to a float32 array of shape (channels, samples)
+
+    Args:
+        segment: Decoded 16-bit AudioSegment
+        sample_rate: Output sample rate
+        channels: Output channel count
+
+    Returns:
+        Float32 samples in [-1.0, 1.0]
+    """
+    if segment.frame_rate != sample_rate:
+        segment = segment.set_frame_rate(sample_rate)
+    if segment.channels != channels:
+        segment = segment.set_channels(channels)
+
+    samples = np.frombuffer(segment.raw_data, dtype=np.int16)
+    return (samples.reshape(-1, channels).T / 32768.0).astype(np.float32)
+
+
+class ShotMix:
+    """
+    One shot's mix on a preallocated float32 timeline.
+
+    The timeline is allocated once at the target duration. Dialogue and SFX
+    are added into slices of it in place, so each clip costs time
+    proportional to its own length and the buffer is never copied between
+    overlays. Placement and trimming are resolved with index math before
+    any samples are touched.
+    """
+
+    def __init__(self, target_duration: float, sample_rate: int, channels: int = 1, sfx_volume: float = 0.7):
+        """
+        Allocate the shot timeline
+
+        Args:
+            target_duration: Length of the mixed clip in seconds
+            sample_rate: Timeline sample rate
+            channels: Timeline channel count
+            sfx_volume: Linear gain applied to every SFX (0.0-1.0)
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sfx_gain = float(sfx_volume)
+        self.length = int(round(target_duration * sample_rate))
+        self.timeline = np.zeros((channels, self.length), dtype=np.float32)
+
+        self.dialogue_start = 0
+        self.dialogue_length = 0
+        self.dialogue_placement: Optional[Dict] = None
+
+    def _add(self, clip: np.ndarray, position: int, gain: float = 1.0) -> int:
+        """
+        Add a clip into the timeline at a sample position, trimming to the window
+
+        Args:
+            clip: Float32 samples of shape (channels, samples)
+            position: Start sample on the timeline (may be negative)
+            gain: Linear gain applied while adding
+
+        Returns:
+            Number of samples actually mixed
+        """
+        src_start = max(0, -position)
+        dst_start = max(0, position)
+        count = min(clip.shape[1] - src_start, self.length - dst_start)
+        if count <= 0:
+            return 0
+
+        view = self.timeline[:, dst_start:dst_start + count]
+        source = clip[:, src_start:src_start + count]
+        if gain == 1.0:
+            view += source
+        else:
+            view += gain * source
+        np.clip(view, -1.0, 1.0, out=view)
+        return count
+
+    def place_dialogue(self, dialogue: np.ndarray, center: bool = True) -> Dict:
+        """
+        Position dialogue in the timeline (centered if configured, never cut unless over length)
+
+        Args:
+            dialogue: Float32 dialogue samples of shape (channels, samples)
+            center: Whether to center dialogue in the window
+
+        Returns:
+            Dict with start_s, duration_s and trimmed flag
+        """
+        length = dialogue.shape[1]
+        start = (self.length - length) // 2 if center else 0
+
+        # Ensure dialogue doesn't go past the end of the window
+        if start + length > self.length:
+            start = self.length - length
+
+        trimmed = start < 0
+        if trimmed:
+            # Dialogue is longer than the window - keep its head
+            start = 0
+            length = self.length
+
+        self._add(dialogue[:, :length], start)
+        self.dialogue_start = start
+        self.dialogue_length = length
+
+        self.dialogue_placement = {
+            "start_s": start / self.sample_rate,
+            "duration_s": length / self.sample_rate,
+            "trimmed": trimmed
+        }
+        return self.dialogue_placement
+
+    def add_sfx(self, sfx: np.ndarray, timing_pct: float) -> Optional[Dict]:
+        """
+        Add an SFX relative to the dialogue
+
+        Args:
+            sfx: Float32 SFX samples of shape (channels, samples)
+            timing_pct: Start position as a percentage of dialogue duration
+                (negative starts before the dialogue)
+
+        Returns:
+            Dict describing the placement, or None if the SFX falls outside the window
+        """
+        position = self.dialogue_start + int(round(timing_pct / 100.0 * self.dialogue_length))
+        head_trim = max(0, -position)
+        tail_trim = max(0, position + sfx.shape[1] - self.length)
+
+        mixed = self._add(sfx, position, self.sfx_gain)
+        if mixed == 0:
+            return None
+
+        return {
+            "requested_start_s": position / self.sample_rate,
+            "start_s": max(0, position) / self.sample_rate,
+            "duration_s": mixed / self.sample_rate,
+            "head_trim_s": head_trim / self.sample_rate,
+            "tail_trim_s": min(tail_trim, sfx.shape[1]) / self.sample_rate
+        }
+
+    @property
+    def duration(self) -> float:
+        """Duration of the mixed timeline in seconds"""
+        return self.length / self.sample_rate
+
+    def to_segment(self) -> AudioSegment:
+        """Convert the timeline to a 16-bit AudioSegment"""
+        pcm = (self.timeline.T * 32767.0).astype(np.int16)
+        return AudioSegment(
+            data=pcm.tobytes(),
+            sample_width=2,
+            frame_rate=self.sample_rate,
+            channels=self.channels
+        )
+
+    def export(self, output_path: str, bitrate: str = "128k"):
+        """
+        Encode the timeline to an MP3 file
+
+        Args:
+            output_path: Destination path
+            bitrate: MP3 bitrate
+        """
+        self.to_segment().export(output_path, format="mp3", bitrate=bitrate)
+
+
+def mix_shot(
+    dialogue_path: str,
+    sfx_entries: List[Dict],
+    target_duration: float = 10,
+    sfx_volume: float = 0.7,
+    center_dialogue: bool = True
+) -> ShotMix:
+    """
+    Decode a shot's clips and mix them onto one timeline
+
+    Every clip is converted to the highest sample rate and channel count
+    found among the shot's clips, matching pydub overlay behaviour.
+
+    Args:
+        dialogue_path: Path to the dialogue clip
+        sfx_entries: Dicts with "audio_path" and "timing_percentage"; each gets
+            a "placement" key (None if outside the window)
+        target_duration: Length of the mixed clip in seconds
+        sfx_volume: Linear SFX gain
+        center_dialogue: Whether to center dialogue in the window
+
+    Returns:
+        The mixed ShotMix (dialogue placement available as .dialogue_placement)
+    """
+    dialogue_segment = load_segment(dialogue_path)
+    sfx_segments = [load_segment(entry["audio_path"]) for entry in sfx_entries]
+
+    segments = [dialogue_segment] + sfx_segments
+    sample_rate = max(s.frame_rate for s in segments)
+    channels = max(s.channels for s in segments)
+
+    mix = ShotMix(target_duration, sample_rate, channels, sfx_volume)
+    mix.place_dialogue(
+        segment_to_array(dialogue_segment, sample_rate, channels),
+        center=center_dialogue
+    )
+
+    for entry, segment in zip(sfx_entries, sfx_segments):
+        entry["placement"] = mix.add_sfx(
+            segment_to_array(segment, sample_rate, channels),
+            entry.get("timing_percentage", 50)
+        )
+
+    return mix
+
+
+def run_mix_job(job: Dict) -> Dict:
+    """
+    Mix and encode one shot from a small, picklable job descriptor
+
+    Used both serially and as a process-pool task: only paths, timings and
+    settings go in, and only the result fields and log lines come back, so
+    no audio buffers cross process boundaries.
+
+    Args:
+        job: Dict with shot_number, dialogue_path, sfx (list of dicts with index,
+            audio_path, timing_percentage), output_path, target_duration,
+            sfx_volume, center_dialogue and bitrate
+
+    Returns:
+        Dict with shot_number, log (list of lines) and either
+        combined_audio_path/combined_duration/sfx_mixed_count or mixing_error
+    """
+    target_duration = job["target_duration"]
+    result = {"shot_number": job["shot_number"], "log": []}
+    log = result["log"]
+
+    try:
+        sfx_entries = [dict(entry) for entry in job["sfx"]]
+        mix = mix_shot(
+            job["dialogue_path"],
+            sfx_entries,
+            target_duration=target_duration,
+            sfx_volume=job["sfx_volume"],
+            center_dialogue=job["center_dialogue"]
+        )
+
+        dialogue_placement = mix.dialogue_placement
+        if dialogue_placement["trimmed"]:
+            log.append(f"  Warning: Dialogue exceeds {target_duration}s, trimmed")
+        log.append(f"  Dialogue positioned at {dialogue_placement['start_s']:.2f}s "
+                   f"({dialogue_placement['duration_s']:.2f}s)")
+
+        sfx_count = 0
+        for entry in sfx_entries:
+            placement = entry["placement"]
+            log.append(f"  SFX {entry['index']+1} timing: {entry['timing_percentage']}% "
+                       f"→ {(placement or {}).get('requested_start_s', 0):.2f}s")
+            if not placement:
+                log.append(f"    Skipped (outside {target_duration}s window)")
+                continue
+            if placement["head_trim_s"] > 0:
+                log.append(f"    Trimmed {placement['head_trim_s']:.2f}s from SFX start")
+            if placement["tail_trim_s"] > 0:
+                log.append(f"    Trimmed {placement['tail_trim_s']:.2f}s from SFX end")
+            sfx_count += 1
+            log.append(f"    ✓ Added SFX at {placement['start_s']:.2f}s ({placement['duration_s']:.2f}s duration)")
+
+        mix.export(job["output_path"], bitrate=job.get("bitrate", "128k"))
+
+        result["combined_audio_path"] = job["output_path"]
+        result["combined_duration"] = mix.duration
+        result["sfx_mixed_count"] = sfx_count
+        log.append(f"  ✓ Mixed {sfx_count} SFX into combined audio ({mix.duration:.2f}s)")
+
+    except Exception as e:
+        log.append(f"  ERROR mixing audio: {e}")
+        result["mixing_error"] = str(e)
+
+    return result
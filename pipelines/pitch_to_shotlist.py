@@ -3,14 +3,17 @@ Pitch to Shot List Pipeline
 5-stage pipeline for generating video production content from initial pitch to final shot lists
 """
 
+import json
 import os
 import re
 import yaml
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import anthropic
 from dotenv import load_dotenv
 
 from .base_pipeline import BasePipeline
+from .scheduling import format_schedule, run_longest_first, scene_cost
+from .transport import pool_stats, shared_clients
 
 # Load environment variables
 load_dotenv()
@@ -26,12 +29,14 @@ class PitchToShotlistPipeline(BasePipeline):
     5. Shot List Generation
     """
 
-    def __init__(self, config_path: str = "configs/pitch_to_shotlist.yaml", start_stage: int = 1):
+    def __init__(self, config_path: str = "configs/pitch_to_shotlist.yaml", start_stage: int = 1,
+                 output_dir: Optional[str] = None):
         """Initialize pipeline with Anthropic client"""
-        super().__init__(config_path, "pitch_to_shotlist", start_stage)
+        super().__init__(config_path, "pitch_to_shotlist", start_stage, output_dir)
 
-        # Initialize Anthropic client
-        self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        # Initialize Anthropic client on the shared pooled transport (pre-warmed in the background)
+        http_client = shared_clients(["anthropic"], self.config.get("http", {}))["anthropic"]
+        self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), http_client=http_client)
 
         # Validate required config fields
         self.validate_config([
@@ -178,7 +183,7 @@ class PitchToShotlistPipeline(BasePipeline):
         pitch_user_message = self.config.get("pitch_user_message", "")
 
         # Make API call with streaming to avoid timeout warning
-        stream = self.client.messages.create(
+        stream = self._claude_stream(1, lambda: self.client.messages.create(
             model="claude-opus-4-1-20250805",
             max_tokens=30000,
             temperature=0.7,
@@ -213,7 +218,7 @@ class PitchToShotlistPipeline(BasePipeline):
                     ]
                 }
             ]
-        )
+        ))
 
         # Collect streamed content
         print("  Streaming response...", end="", flush=True)
@@ -243,7 +248,7 @@ class PitchToShotlistPipeline(BasePipeline):
         output = {
             "episode_title": episode_title,
             "pitch_paragraph": pitch_paragraph,
-            "raw_response": content,
+            **self._raw_response(content),
             "fountain_content": fountain_content,
             "cleaned_pitch": fountain_content  # Already clean
         }
@@ -265,7 +270,7 @@ class PitchToShotlistPipeline(BasePipeline):
         pitch_paragraph = self.variables.get("pitch_paragraph", "")
         script_user_message = self.config.get("script_user_message", "")
 
-        stream = self.client.messages.create(
+        stream = self._claude_stream(2, lambda: self.client.messages.create(
             model="claude-opus-4-1-20250805",
             max_tokens=32000,
             temperature=0.7,
@@ -300,7 +305,7 @@ class PitchToShotlistPipeline(BasePipeline):
                     ]
                 }
             ]
-        )
+        ))
 
         # Collect streamed content
         print("  Streaming response...", end="", flush=True)
@@ -319,7 +324,7 @@ class PitchToShotlistPipeline(BasePipeline):
 
         output = {
             "script": script,
-            "raw_response": content,
+            **self._raw_response(content),
             "cleaned_script": script  # Store readable version
         }
         self._save_output(2, "script", output)
@@ -339,7 +344,7 @@ class PitchToShotlistPipeline(BasePipeline):
         bible = self.config.get("bible", "")
         script = self.variables.get("script", "")
 
-        stream = self.client.messages.create(
+        stream = self._claude_stream(3, lambda: self.client.messages.create(
             model="claude-opus-4-1-20250805",
             max_tokens=32000,
             temperature=0.4,
@@ -374,7 +379,7 @@ class PitchToShotlistPipeline(BasePipeline):
                     ]
                 }
             ]
-        )
+        ))
 
         # Collect streamed content
         print("  Streaming response...", end="", flush=True)
@@ -397,7 +402,7 @@ class PitchToShotlistPipeline(BasePipeline):
         output = {
             "script_tagged": script_tagged,
             "sfx_count": sfx_count,
-            "raw_response": content,
+            **self._raw_response(content),
             "cleaned_script_tagged": script_tagged  # Store readable version
         }
         self._save_output(3, "script_tagged", output)
@@ -417,7 +422,7 @@ class PitchToShotlistPipeline(BasePipeline):
         bible = self.config.get("bible", "")
         script_tagged = self.variables.get("script_tagged", "")
 
-        stream = self.client.messages.create(
+        stream = self._claude_stream(4, lambda: self.client.messages.create(
             model="claude-opus-4-1-20250805",
             max_tokens=32000,
             temperature=0.4,
@@ -452,7 +457,7 @@ class PitchToShotlistPipeline(BasePipeline):
                     ]
                 }
             ]
-        )
+        ))
 
         # Collect streamed content
         print("  Streaming response...", end="", flush=True)
@@ -477,7 +482,7 @@ class PitchToShotlistPipeline(BasePipeline):
             "script_blocking": script_blocking,
             "blocking_count": blocking_count,
             "props_count": props_count,
-            "raw_response": content,
+            **self._raw_response(content),
             "cleaned_script_blocking": script_blocking  # Store readable version
         }
         self._save_output(4, "script_blocking", output)
@@ -490,11 +495,98 @@ class PitchToShotlistPipeline(BasePipeline):
 
         return output
 
+    def _generate_scene_shot_list(self, scene: Dict, previous_shot_lists: str) -> Tuple[Any, str]:
+        """
+        Generate the shot list for one scene
+
+        Args:
+            scene: Scene from _split_into_scenes
+            previous_shot_lists: Shot lists of earlier scenes, as context
+
+        Returns:
+            Tuple of (parsed shot list, raw response)
+        """
+        bible = self.config.get("bible", "")
+        script_blocking = self.variables.get("script_blocking", "")
+
+        stream = self._claude_stream(5, lambda: self.client.messages.create(
+            model="claude-opus-4-1-20250805",
+            max_tokens=32000,
+            temperature=0.4,
+            stream=True,
+            system="You are a shot list specialist for an animated production, responsible for breaking scenes into individual shots for animation. You work with richly annotated scripts to create detailed shot breakdowns that preserve all dialogue, sound, and visual information.\n\nFUNDAMENTAL RULES:\n- Every line of dialogue must be its own shot\n- No shot can contain multiple dialogue lines\n- Add non-dialogue shots only when absolutely necessary for critical visual storytelling\n- Preserve ALL annotations and formatting exactly as they appear\n\nINPUT MATERIALS:\nYou receive:\n- A single scene (everything between two scene headings)\n- The project bible with character/environment descriptions\n- The full script for context\n- Any previously created shots\n\nOUTPUT STRUCTURE:\nGenerate a YAML payload containing all shots for the scene. Each shot must include:\n\n```yaml\nshots:\n  - shot_number: [sequential number]\n    character: [EXACT character name as in script, in CAPS, or \"none\" for non-dialogue shots]\n    additional_characters: [List of other bible characters visible in shot, or empty list]\n    dialogue: [Complete dialogue with all tags, no parentheticals, or \"none\"]\n    lip_sync_required: [true if dialogue exists AND character's face is visible, false otherwise]\n    props: [List of props from PROPS annotation that appear in this shot]\n    sound_effects: [List of exact SFX annotations from scene, or empty list]\n    image_prompt: [structured description - see below]\n    animation_prompt: [description of motion/action]\n```\n\nCRITICAL FIELD SPECIFICATIONS:\nadditional_characters: Only include characters from the bible who are visible in this shot but not the speaking character. Empty list if none.\nlip_sync_required: True when both conditions are met:\n\nThe shot contains dialogue\nThe speaking character's face would be visible given the shot framing\n\nprops: Extract only the props from the props annotations that would logically be visible in this specific shot based on the blocking and action.\n\nsound_effects: Each SFX annotation from the script becomes its own entry. If you see \"{{SFX: soft fabric rustling, fairy wings chiming}}\" split into:\nyamlCopysound_effects:\n  - \"{{SFX: soft fabric rustling}}\"\n  - \"{{SFX: fairy wings chiming}}\"\nIMAGE PROMPT STRUCTURE:\nMust follow this exact pattern:\n\"[Camera angle/shot type]. [Character description with appearance and expression/pose]. [Additional characters if visible with their descriptions]. [Scene details and props]. [Setting description from bible].\"\nPull character appearances and setting descriptions DIRECTLY from the bible. Every visible element must be described. The shot's framing should make sense within the scene's established blocking but be specific to this moment.\nANIMATION PROMPT:\nDescribe the motion that brings the still image to life during this shot. This animation will use the image prompt as a reference so don't add descriptions of things that would already be present in the image. Focus on:\n\nCharacter movements and gestures while speaking\nFacial expressions and emotional shifts\nAny physical actions mentioned in the script\nReactions and ambient movement\n\nSHOT BREAKDOWN LOGIC:\n\nStart with the first line of dialogue or essential establishing action\nCreate a new shot for each subsequent dialogue line\nIf critical action occurs between dialogue that affects understanding, create a non-dialogue shot\nMaintain visual continuity - consider what characters are visible based on blocking and prior shots\n\nEXAMPLE OUTPUT:\n\n```yaml\nscene: INT. TREEHOUSE - DAY\nshots:\n  - shot_number: 1\n    character: KIDDO\n    additional_characters: [\"BLOSSOM\"]\n    dialogue: \"[excited] Look what I found in the garden!\"\n    lip_sync_required: true\n    props: [\"glowing seed\", \"handmade furniture\"]\n    sound_effects:\n      - \"{{SFX: wooden door creaking open}}\"\n      - \"{{SFX: footsteps on wooden floor}}\"\n    image_prompt: \"Medium shot. A young anthropomorphic fox kit with orange fur and bright green eyes, wearing a blue hoodie and shorts, holding up a glowing seed with an excited expression. Blossom visible in background at her desk. Wooden treehouse interior with handmade furniture. Warm sunlight through circular window.\"\n    animation_prompt: \"Kiddo bursts through the door holding up the seed triumphantly, eyes wide with excitement. Blossom looks up from her book.\"\n```\n\nRemember: You're creating a technical document that preserves every detail while breaking the scene into animatable shots. Each shot should be visually specific enough to generate consistently while maintaining the scene's emotional flow.",
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": f"Here is the story bible for the project this script was based on for context:\n\n{bible}\n\nHere is the full script just as a high level context as you're creating shots:\n\n{script_blocking}\n\n---\n\nHere any previous shot lists you've created for prior scenes:\n\n{previous_shot_lists}"
+                        }
+                    ]
+                },
+                {
+                    "role": "assistant",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": "Wonderful! Can you send me the individual scene you want me to break out into a shot list?"
+                        }
+                    ]
+                },
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": f"Here is the scene I need you to create a shot list for: {scene['content']}"
+                        }
+                    ]
+                }
+            ]
+        ))
+
+        # Collect streamed content
+        content = ""
+        for event in stream:
+            if event.type == "content_block_delta":
+                content += event.delta.text
+            elif event.type == "message_stop":
+                break
+
+        return self._extract_yaml_content(content), content
+
+    def _schedule_scenes(self, scenes: List[Dict], workers: int) -> List[Tuple[Any, str]]:
+        """
+        Generate scene shot lists concurrently, most expensive scenes first
+
+        Scenes are generated without earlier shot lists as context, so shots
+        are renumbered in scene order afterwards.
+        """
+        def generate(scene: Dict) -> Tuple[Any, str]:
+            print(f"  Processing scene: {scene['heading']}...")
+            return self._generate_scene_shot_list(scene, "")
+
+        results, schedule = run_longest_first(
+            scenes, generate, scene_cost, workers, label=lambda scene: scene["heading"]
+        )
+        self._write_run_file("05_schedule.json", json.dumps(schedule, indent=2))
+        print(f"  {format_schedule(schedule)}")
+
+        shot_number = 1
+        for shot_list_yaml, _ in results:
+            shots = shot_list_yaml.get("shots") if isinstance(shot_list_yaml, dict) else None
+            for shot in shots if isinstance(shots, list) else []:
+                if isinstance(shot, dict):
+                    shot["shot_number"] = shot_number
+                    shot_number += 1
+
+        return results
+
     def stage_5_shot_lists(self):
         """Generate shot lists for each scene"""
         self.print_stage_header(5, "Shot List Generation")
 
-        bible = self.config.get("bible", "")
         script_blocking = self.variables.get("script_blocking", "")
 
         # Split script into scenes
@@ -512,61 +604,21 @@ class PitchToShotlistPipeline(BasePipeline):
         all_shot_lists = []
         previous_shot_lists = ""
 
+        workers = self.config.get("scheduling", {}).get("workers", 1)
+        scheduled = self._schedule_scenes(scenes, workers) if workers > 1 and len(scenes) > 1 else None
+
         for i, scene in enumerate(scenes, 1):
-            print(f"  Processing scene {i}/{len(scenes)}...")
-
-            stream = self.client.messages.create(
-                model="claude-opus-4-1-20250805",
-                max_tokens=32000,
-                temperature=0.4,
-                stream=True,
-                system="You are a shot list specialist for an animated production, responsible for breaking scenes into individual shots for animation. You work with richly annotated scripts to create detailed shot breakdowns that preserve all dialogue, sound, and visual information.\n\nFUNDAMENTAL RULES:\n- Every line of dialogue must be its own shot\n- No shot can contain multiple dialogue lines\n- Add non-dialogue shots only when absolutely necessary for critical visual storytelling\n- Preserve ALL annotations and formatting exactly as they appear\n\nINPUT MATERIALS:\nYou receive:\n- A single scene (everything between two scene headings)\n- The project bible with character/environment descriptions\n- The full script for context\n- Any previously created shots\n\nOUTPUT STRUCTURE:\nGenerate a YAML payload containing all shots for the scene. Each shot must include:\n\n```yaml\nshots:\n  - shot_number: [sequential number]\n    character: [EXACT character name as in script, in CAPS, or \"none\" for non-dialogue shots]\n    additional_characters: [List of other bible characters visible in shot, or empty list]\n    dialogue: [Complete dialogue with all tags, no parentheticals, or \"none\"]\n    lip_sync_required: [true if dialogue exists AND character's face is visible, false otherwise]\n    props: [List of props from PROPS annotation that appear in this shot]\n    sound_effects: [List of exact SFX annotations from scene, or empty list]\n    image_prompt: [structured description - see below]\n    animation_prompt: [description of motion/action]\n```\n\nCRITICAL FIELD SPECIFICATIONS:\nadditional_characters: Only include characters from the bible who are visible in this shot but not the speaking character. Empty list if none.\nlip_sync_required: True when both conditions are met:\n\nThe shot contains dialogue\nThe speaking character's face would be visible given the shot framing\n\nprops: Extract only the props from the props annotations that would logically be visible in this specific shot based on the blocking and action.\n\nsound_effects: Each SFX annotation from the script becomes its own entry. If you see \"{{SFX: soft fabric rustling, fairy wings chiming}}\" split into:\nyamlCopysound_effects:\n  - \"{{SFX: soft fabric rustling}}\"\n  - \"{{SFX: fairy wings chiming}}\"\nIMAGE PROMPT STRUCTURE:\nMust follow this exact pattern:\n\"[Camera angle/shot type]. [Character description with appearance and expression/pose]. [Additional characters if visible with their descriptions]. [Scene details and props]. [Setting description from bible].\"\nPull character appearances and setting descriptions DIRECTLY from the bible. Every visible element must be described. The shot's framing should make sense within the scene's established blocking but be specific to this moment.\nANIMATION PROMPT:\nDescribe the motion that brings the still image to life during this shot. This animation will use the image prompt as a reference so don't add descriptions of things that would already be present in the image. Focus on:\n\nCharacter movements and gestures while speaking\nFacial expressions and emotional shifts\nAny physical actions mentioned in the script\nReactions and ambient movement\n\nSHOT BREAKDOWN LOGIC:\n\nStart with the first line of dialogue or essential establishing action\nCreate a new shot for each subsequent dialogue line\nIf critical action occurs between dialogue that affects understanding, create a non-dialogue shot\nMaintain visual continuity - consider what characters are visible based on blocking and prior shots\n\nEXAMPLE OUTPUT:\n\n```yaml\nscene: INT. TREEHOUSE - DAY\nshots:\n  - shot_number: 1\n    character: KIDDO\n    additional_characters: [\"BLOSSOM\"]\n    dialogue: \"[excited] Look what I found in the garden!\"\n    lip_sync_required: true\n    props: [\"glowing seed\", \"handmade furniture\"]\n    sound_effects:\n      - \"{{SFX: wooden door creaking open}}\"\n      - \"{{SFX: footsteps on wooden floor}}\"\n    image_prompt: \"Medium shot. A young anthropomorphic fox kit with orange fur and bright green eyes, wearing a blue hoodie and shorts, holding up a glowing seed with an excited expression. Blossom visible in background at her desk. Wooden treehouse interior with handmade furniture. Warm sunlight through circular window.\"\n    animation_prompt: \"Kiddo bursts through the door holding up the seed triumphantly, eyes wide with excitement. Blossom looks up from her book.\"\n```\n\nRemember: You're creating a technical document that preserves every detail while breaking the scene into animatable shots. Each shot should be visually specific enough to generate consistently while maintaining the scene's emotional flow.",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": f"Here is the story bible for the project this script was based on for context:\n\n{bible}\n\nHere is the full script just as a high level context as you're creating shots:\n\n{script_blocking}\n\n---\n\nHere any previous shot lists you've created for prior scenes:\n\n{previous_shot_lists}"
-                            }
-                        ]
-                    },
-                    {
-                        "role": "assistant",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "Wonderful! Can you send me the individual scene you want me to break out into a shot list?"
-                            }
-                        ]
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": f"Here is the scene I need you to create a shot list for: {scene['content']}"
-                            }
-                        ]
-                    }
-                ]
-            )
-
-            # Collect streamed content
-            content = ""
-            for event in stream:
-                if event.type == "content_block_delta":
-                    content += event.delta.text
-                elif event.type == "message_stop":
-                    break
-
-            shot_list_yaml = self._extract_yaml_content(content)
+            if scheduled:
+                shot_list_yaml, content = scheduled[i - 1]
+            else:
+                print(f"  Processing scene {i}/{len(scenes)}...")
+                shot_list_yaml, content = self._generate_scene_shot_list(scene, previous_shot_lists)
 
             # Save individual scene shot list
             scene_output = {
                 "scene_heading": scene["heading"],
                 "shot_list": shot_list_yaml,
-                "raw_response": content
+                **self._raw_response(content)
             }
             filename = f"shot_list_scene_{i:02d}"
             self._save_output(5, filename, scene_output)
@@ -631,6 +683,11 @@ Files Generated:
         for stage in self.stage_outputs:
             summary += f"  {stage['stage']}. {stage['name']} → {stage['file']}\n"
 
+        summary += "\nHTTP Connection Pools:\n"
+        for provider, stats in pool_stats().items():
+            summary += (f"  {provider}: {stats['requests']} requests over {stats['connections_opened']} connections "
+                        f"(reuse {stats['reuse_ratio']}, HTTP/2: {stats['http2']})\n")
+
         summary += f"""
 Configuration: config.yaml
 Output Directory: {self.output_dir}
@@ -649,26 +706,25 @@ Output Directory: {self.output_dir}
 
         try:
             # Run stages based on start point
-            if self.start_stage <= 1:
-                self.stage_1_pitch()
-
-            if self.start_stage <= 2:
-                self.stage_2_script()
-
-            if self.start_stage <= 3:
-                self.stage_3_sfx_dialogue()
-
-            if self.start_stage <= 4:
-                self.stage_4_blocking_props()
-
-            if self.start_stage <= 5:
-                self.stage_5_shot_lists()
+            stages = [
+                (1, self.stage_1_pitch),
+                (2, self.stage_2_script),
+                (3, self.stage_3_sfx_dialogue),
+                (4, self.stage_4_blocking_props),
+                (5, self.stage_5_shot_lists)
+            ]
+            for stage_num, stage_func in stages:
+                if self.start_stage <= stage_num:
+                    self._run_stage(stage_num, stage_func)
 
             # Create summary
             self.create_summary()
 
             self.print_success()
+            self._finish_run("completed")
 
-        except Exception as e:
-            self.print_error(e)
+        except BaseException as e:
+            # BaseException so Ctrl-C and SystemExit don't leave the run marked running
+            self.print_error(e if isinstance(e, Exception) else type(e).__name__)
+            self._finish_run("failed")
             raise
\ No newline at end of file
@@ -0,0 +1,453 @@
+"""
+Run Planner
+Dry-run estimates of API calls, tokens, ElevenLabs usage and wall time
+"""
+
+import json
+import math
+import os
+import re
+from glob import glob
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .artifacts import ArtifactStore
+from .duration_model import DEFAULT_CHARS_PER_SECOND, text_features
+
+
+# Rough English tokenization rate for Claude
+CHARS_PER_TOKEN = 4.0
+
+# Fallbacks used when no past runs are available
+DEFAULT_SECONDS = {
+    "tts_call": 4.0,
+    "sfx_call": 6.0,
+    "compression_call": 6.0,
+    "timing_call": 20.0,
+    "waveform_clip": 0.2,
+    "mix_shot": 1.5,
+    "episode_shot": 0.2,
+    "claude_output_tokens_per_second": 40.0,
+    "claude_call_overhead": 5.0
+}
+DEFAULT_TTS_ATTEMPTS_PER_LINE = 1.3
+DEFAULT_LLM_TIMING_FRACTION = 0.5
+DEFAULT_SCENES = 6
+
+# Approximate prompt sizes (tokens) for requests whose prompts live in code
+COMPRESSION_PROMPT_TOKENS = 700
+COMPRESSION_OUTPUT_TOKENS = 120
+TIMING_PROMPT_TOKENS = 600
+TIMING_SHOT_TOKENS = 80
+TIMING_OUTPUT_TOKENS_PER_SFX = 15
+PITCH_SYSTEM_PROMPT_TOKENS = 1200
+PITCH_OUTPUT_TOKENS = {"pitch": 2500, "script": 3500, "script_tagged": 4500, "script_blocking": 5000, "scene": 4000}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate Claude token count of a text"""
+    return int(math.ceil(len(text or "") / CHARS_PER_TOKEN))
+
+
+def _stage_durations(run_dir: str, files: List[str]) -> Optional[List[float]]:
+    """
+    Seconds spent in each stage of a past run, from output file modification times
+
+    The run starts at the manifest's started_at (or when config.yaml was
+    written, for runs without a manifest); each listed stage file is
+    written when its stage finishes.
+    """
+    manifest_file = os.path.join(run_dir, "manifest.json")
+    start_file = os.path.join(run_dir, "config.yaml")
+    if os.path.exists(manifest_file):
+        with open(manifest_file) as f:
+            previous = json.load(f)["started_at"]
+    elif os.path.exists(start_file):
+        previous = os.path.getmtime(start_file)
+    else:
+        return None
+
+    durations = []
+    for name in files:
+        path = os.path.join(run_dir, name)
+        if not os.path.exists(path):
+            return None
+        finished = os.path.getmtime(path)
+        durations.append(max(0.0, finished - previous))
+        previous = finished
+    return durations
+
+
+def _output_text(path: str, store: Optional[ArtifactStore]) -> str:
+    """Text of a stage output, including a raw response kept in the artifact store"""
+    text = Path(path).read_text()
+    digest = json.loads(text).get("raw_response_blob")
+    if digest and store:
+        try:
+            text += store.get_text(digest)
+        except (FileNotFoundError, RuntimeError):
+            pass
+    return text
+
+
+def _run_store(run_dir: str) -> Optional[ArtifactStore]:
+    """Artifact store named in a run's manifest, if it has one"""
+    manifest_file = os.path.join(run_dir, "manifest.json")
+    if not os.path.exists(manifest_file):
+        return None
+    with open(manifest_file) as f:
+        return ArtifactStore(json.load(f)["store"])
+
+
+def calibrate_audio(history_glob: str = "outputs/audio_generation_*") -> Dict:
+    """
+    Per-unit costs learned from past audio runs
+
+    TTS attempts per line come from debug_log.json; per-shot stage times come
+    from stage output timestamps; the share of shots timed by Claude comes
+    from the timing_method recorded in 03_refined_timings.json.
+
+    Returns:
+        Dict with runs, tts_attempts_per_line, llm_timing_fraction and
+        stage_seconds_per_shot (stage number -> seconds, when known)
+    """
+    attempts, lines = 0, 0
+    llm_sfx, timed_sfx = 0, 0
+    per_shot: Dict[int, List[float]] = {}
+    runs = 0
+
+    for run_dir in sorted(glob(history_glob)):
+        try:
+            with open(os.path.join(run_dir, "debug_log.json"), "r") as f:
+                debug_data = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        runs += 1
+        statistics = debug_data.get("statistics", {})
+        attempts += len(debug_data.get("compression_attempts", []))
+        lines += statistics.get("dialogue_generated", 0)
+        total_shots = statistics.get("total_shots", 0)
+
+        try:
+            with open(os.path.join(run_dir, "03_refined_timings.json"), "r") as f:
+                for shot in json.load(f).get("shots", []):
+                    for sfx in shot.get("sfx", []):
+                        if sfx.get("timing_method"):
+                            timed_sfx += 1
+                            llm_sfx += sfx["timing_method"] == "llm"
+        except (OSError, ValueError):
+            pass
+
+        stage_files = ["01_audio_generated.json", "02_waveforms.json", "03_refined_timings.json",
+                       "04_mixed_audio.json"]
+        durations = _stage_durations(run_dir, stage_files)
+        if durations and total_shots:
+            for stage, seconds in enumerate(durations, 1):
+                per_shot.setdefault(stage, []).append(seconds / total_shots)
+
+    return {
+        "runs": runs,
+        "tts_attempts_per_line": attempts / lines if lines else DEFAULT_TTS_ATTEMPTS_PER_LINE,
+        "llm_timing_fraction": llm_sfx / timed_sfx if timed_sfx else None,
+        "stage_seconds_per_shot": {stage: sorted(values)[len(values) // 2] for stage, values in per_shot.items()}
+    }
+
+
+def plan_audio(config: Dict, shots: List[Dict], history_glob: str = "outputs/audio_generation_*") -> Dict:
+    """
+    Plan an audio generation run without calling any API
+
+    Args:
+        config: Loaded audio_generation.yaml
+        shots: Shots that the run would process (limits already applied)
+        history_glob: Glob for past audio_generation output directories
+
+    Returns:
+        Plan dict with per-stage estimates, totals and calibration notes
+    """
+    from .timing_engine import estimate_sfx_duration
+
+    calibration = calibrate_audio(history_glob)
+    measured = calibration["stage_seconds_per_shot"]
+    timing_config = config.get("timing_refinement", {})
+    sfx_settings = config.get("sfx_settings", {})
+    mixing_config = config.get("mixing", {})
+    window = mixing_config.get("target_duration", 10)
+
+    dialogue_lines = [
+        re.sub(r'\([^)]*\)', '', shot["dialogue"])
+        for shot in shots
+        if shot.get("dialogue") and shot.get("character") and str(shot["character"]).lower() != "none"
+    ]
+    line_chars = [text_features(line)[0] for line in dialogue_lines]
+    attempts_per_line = calibration["tts_attempts_per_line"]
+
+    sfx_count = 0
+    sfx_seconds = 0.0
+    for shot in shots:
+        dialogue_duration = None
+        if shot.get("dialogue") and str(shot.get("character", "")).lower() != "none":
+            dialogue_duration = text_features(shot["dialogue"])[0] / DEFAULT_CHARS_PER_SECOND
+        for sfx in shot.get("sound_effects", []) or []:
+            sfx_text = sfx.get("sfx", sfx.get("description", "")) if isinstance(sfx, dict) else str(sfx)
+            sfx_text = re.sub(r'\{\{SFX:\s*|\}\}', '', sfx_text).strip()
+            sfx_count += 1
+            if sfx_settings.get("duration_targeting", True):
+                sfx_seconds += estimate_sfx_duration(
+                    sfx_text, dialogue_duration, window, config.get("sfx_duration_limit", 10),
+                    sfx_settings.get("impulse_duration", 1.5), sfx_settings.get("default_duration", 3.0),
+                    sfx_settings.get("sustain_padding", 1.0)
+                )
+            else:
+                sfx_seconds += config.get("sfx_duration_limit", 10)
+
+    # Stage 1: TTS attempts, compression calls between attempts, SFX requests
+    tts_calls = len(dialogue_lines) * attempts_per_line
+    compression_calls = len(dialogue_lines) * max(0.0, attempts_per_line - 1)
+    stage_1_seconds = (
+        tts_calls * DEFAULT_SECONDS["tts_call"]
+        + compression_calls * DEFAULT_SECONDS["compression_call"]
+        + sfx_count * DEFAULT_SECONDS["sfx_call"]
+    )
+    if 1 in measured:
+        stage_1_seconds = measured[1] * len(shots)
+
+    # Concurrent shots start longest first; the stage ends with the busiest worker
+    generation_workers = config.get("scheduling", {}).get("workers", 1)
+    pipelined = config.get("pipelining", {}).get("enabled", False)
+    if generation_workers > 1 and len(shots) > 1 and not pipelined:
+        from .scheduling import critical_path, shot_cost
+        costs = [shot_cost(shot) for shot in shots]
+        serial = sum(costs)
+        if serial > 0:
+            order = sorted(range(len(costs)), key=lambda index: costs[index], reverse=True)
+            stage_1_seconds *= critical_path(costs, order, generation_workers) / serial
+
+    # Stage 3: shots with SFX that the local engine is expected to hand to Claude
+    shots_with_sfx = [shot for shot in shots if shot.get("sound_effects")]
+    if timing_config.get("local_engine", False):
+        llm_fraction = calibration["llm_timing_fraction"]
+        if llm_fraction is None:
+            llm_fraction = DEFAULT_LLM_TIMING_FRACTION
+    else:
+        llm_fraction = 1.0
+    llm_shots = len(shots_with_sfx) * llm_fraction
+    if timing_config.get("batched", True) and llm_shots > 1:
+        timing_calls = math.ceil(llm_shots / timing_config.get("batch_max_shots", 25))
+    else:
+        timing_calls = math.ceil(llm_shots)
+    sfx_per_shot = sfx_count / len(shots_with_sfx) if shots_with_sfx else 0
+    timing_input = timing_calls * TIMING_PROMPT_TOKENS + llm_shots * (
+        TIMING_SHOT_TOKENS + sfx_per_shot * (timing_config.get("waveform_chars", 40) + 30)
+    )
+    timing_output = llm_shots * sfx_per_shot * TIMING_OUTPUT_TOKENS_PER_SFX
+
+    workers = mixing_config.get("workers", 1) or os.cpu_count() or 1
+    mixable = sum(1 for shot in shots if shot.get("dialogue") and str(shot.get("character", "")).lower() != "none")
+
+    stages = [
+        {
+            "stage": 1, "name": "Audio generation",
+            "claude_calls": compression_calls,
+            "tts_calls": tts_calls,
+            "sfx_calls": sfx_count,
+            "input_tokens": compression_calls * COMPRESSION_PROMPT_TOKENS,
+            "output_tokens": compression_calls * COMPRESSION_OUTPUT_TOKENS,
+            "tts_characters": sum(line_chars) * attempts_per_line,
+            "sfx_seconds": sfx_seconds,
+            "wall_seconds": stage_1_seconds
+        },
+        {
+            "stage": 2, "name": "Waveforms",
+            "wall_seconds": measured.get(2, DEFAULT_SECONDS["waveform_clip"] * 2) * len(shots)
+        },
+        {
+            "stage": 3, "name": "Timing refinement",
+            "claude_calls": timing_calls,
+            "input_tokens": timing_input,
+            "output_tokens": timing_output,
+            "wall_seconds": measured.get(3, 0) * len(shots) if 3 in measured
+            else timing_calls * DEFAULT_SECONDS["timing_call"]
+        },
+        {
+            "stage": 4, "name": "Mixing",
+            "wall_seconds": measured.get(4, DEFAULT_SECONDS["mix_shot"]) * mixable / (1 if 4 in measured else workers)
+        },
+        {
+            "stage": 5, "name": "Episode assembly",
+            "wall_seconds": DEFAULT_SECONDS["episode_shot"] * mixable
+            if config.get("episode", {}).get("enabled", True) else 0.0
+        }
+    ]
+
+    plan = _finish_plan("audio_generation", stages, calibration["runs"])
+    if config.get("pipelining", {}).get("enabled", False):
+        # Stages 1-4 overlap; the run is bounded by the slowest of them
+        overlapped = max(stage["wall_seconds"] for stage in stages[:4])
+        plan["totals"]["wall_seconds"] = overlapped + stages[4]["wall_seconds"]
+        plan["notes"].append("Pipelined execution: stages 1-4 overlap, wall time follows the slowest stage")
+    if generation_workers > 1 and len(shots) > 1 and not pipelined:
+        plan["notes"].append(f"Stage 1 runs {generation_workers} shots at a time, longest first")
+    plan["notes"].append(f"{len(shots)} shots, {len(dialogue_lines)} dialogue lines, {sfx_count} SFX")
+    plan["notes"].append(f"{attempts_per_line:.2f} TTS attempts per line"
+                         + (" (from past runs)" if calibration["runs"] else " (default)"))
+    return plan
+
+
+def calibrate_pitch(history_glob: str = "outputs/pitch_to_shotlist_*") -> Dict:
+    """
+    Stage times, output sizes and scene counts from past pitch runs
+
+    Returns:
+        Dict with runs, scenes, output_tokens (stage key -> tokens) and
+        stage_seconds (stage number -> seconds; stage 5 is per scene)
+    """
+    keys = ["pitch", "script", "script_tagged", "script_blocking"]
+    outputs: Dict[str, List[int]] = {}
+    seconds: Dict[int, List[float]] = {}
+    scenes: List[int] = []
+    runs = 0
+
+    for run_dir in sorted(glob(history_glob)):
+        scene_files = sorted(glob(os.path.join(run_dir, "05_shot_list_scene_*.json")))
+        stage_files = [f"0{i}_{key}.json" for i, key in enumerate(keys, 1)]
+        if not scene_files or not all(os.path.exists(os.path.join(run_dir, name)) for name in stage_files):
+            continue
+
+        runs += 1
+        scenes.append(len(scene_files))
+        store = _run_store(run_dir)
+        for key, name in zip(keys, stage_files):
+            outputs.setdefault(key, []).append(estimate_tokens(_output_text(os.path.join(run_dir, name), store)))
+        outputs.setdefault("scene", []).extend(estimate_tokens(_output_text(p, store)) for p in scene_files)
+
+        durations = _stage_durations(run_dir, stage_files + ["05_shot_list_final.json"])
+        if durations:
+            for stage, value in enumerate(durations[:4], 1):
+                seconds.setdefault(stage, []).append(value)
+            seconds.setdefault(5, []).append(durations[4] / len(scene_files))
+
+    def median(values):
+        return sorted(values)[len(values) // 2]
+
+    return {
+        "runs": runs,
+        "scenes": median(scenes) if scenes else None,
+        "output_tokens": {key: median(values) for key, values in outputs.items()},
+        "stage_seconds": {stage: median(values) for stage, values in seconds.items()}
+    }
+
+
+def plan_pitch(config: Dict, start_stage: int = 1, history_glob: str = "outputs/pitch_to_shotlist_*") -> Dict:
+    """
+    Plan a pitch-to-shot-list run without calling any API
+
+    Each stage sends the bible plus the previous stage's output; stage 5
+    makes one call per scene and re-sends the full script and every
+    earlier scene's shot list, so its input grows with each scene.
+
+    Args:
+        config: Loaded pitch_to_shotlist.yaml
+        start_stage: First stage that would run
+        history_glob: Glob for past pitch_to_shotlist output directories
+
+    Returns:
+        Plan dict with per-stage estimates, totals and calibration notes
+    """
+    calibration = calibrate_pitch(history_glob)
+    outputs = dict(PITCH_OUTPUT_TOKENS, **calibration["output_tokens"])
+    bible = estimate_tokens(config.get("bible", ""))
+    scenes = calibration["scenes"] or DEFAULT_SCENES
+
+    def claude_seconds(stage: int, output_tokens: float, calls: int = 1) -> float:
+        if stage in calibration["stage_seconds"]:
+            return calibration["stage_seconds"][stage] * calls
+        return calls * DEFAULT_SECONDS["claude_call_overhead"] + \
+            output_tokens / DEFAULT_SECONDS["claude_output_tokens_per_second"]
+
+    chain = [("Pitch", "pitch", 0), ("Script", "script", outputs["pitch"]),
+             ("SFX & dialogue tags", "script_tagged", outputs["script"]),
+             ("Blocking & props", "script_blocking", outputs["script_tagged"])]
+    stages = []
+    for stage, (name, key, previous) in enumerate(chain, 1):
+        stages.append({
+            "stage": stage, "name": name, "claude_calls": 1,
+            "input_tokens": PITCH_SYSTEM_PROMPT_TOKENS + bible + previous,
+            "output_tokens": outputs[key],
+            "wall_seconds": claude_seconds(stage, outputs[key])
+        })
+
+    # Concurrent scenes are generated without earlier shot lists as context; scene sizes
+    # aren't known before the script exists, so every scene counts the same
+    workers = config.get("scheduling", {}).get("workers", 1)
+    scheduled = workers > 1 and scenes > 1
+    scene_output = outputs["scene"]
+    scene_input = sum(
+        PITCH_SYSTEM_PROMPT_TOKENS + bible + outputs["script_blocking"] + (0 if scheduled else i * scene_output)
+        + outputs["script_blocking"] / scenes
+        for i in range(scenes)
+    )
+    if scheduled:
+        from .scheduling import critical_path
+        stage_5_seconds = critical_path([claude_seconds(5, scene_output)] * scenes, range(scenes), workers)
+    else:
+        stage_5_seconds = claude_seconds(5, scene_output * scenes, scenes)
+    stages.append({
+        "stage": 5, "name": "Shot lists", "claude_calls": scenes,
+        "input_tokens": scene_input,
+        "output_tokens": scene_output * scenes,
+        "wall_seconds": stage_5_seconds
+    })
+
+    plan = _finish_plan("pitch_to_shotlist", [s for s in stages if s["stage"] >= start_stage], calibration["runs"])
+    plan["notes"].append(f"{scenes} scenes" + (" (median of past runs)" if calibration["scenes"] else " (default)"))
+    if scheduled and start_stage <= 5:
+        plan["notes"].append(f"Stage 5 runs {workers} scenes at a time")
+    return plan
+
+
+def _finish_plan(pipeline: str, stages: List[Dict], runs: int) -> Dict:
+    """Add totals and calibration notes to a list of stage estimates"""
+    fields = ["claude_calls", "tts_calls", "sfx_calls", "input_tokens", "output_tokens",
+              "tts_characters", "sfx_seconds", "wall_seconds"]
+    totals = {field: sum(stage.get(field, 0) for stage in stages) for field in fields}
+    notes = [f"Calibrated from {runs} past run(s)" if runs else "No past runs found - using default rates"]
+    return {"pipeline": pipeline, "stages": stages, "totals": totals, "notes": notes}
+
+
+def _format_duration(seconds: float) -> str:
+    """Format seconds as e.g. 1h 02m or 4m 30s"""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}m {seconds % 60:02d}s"
+
+
+def format_plan(plan: Dict) -> str:
+    """
+    Render a plan as a text report
+
+    Args:
+        plan: Result of plan_audio or plan_pitch
+
+    Returns:
+        Human-readable multi-line report
+    """
+    lines = [f"Run Plan: {plan['pipeline']}", "=" * 50]
+    for stage in plan["stages"] + [dict(plan["totals"], stage="", name="TOTAL")]:
+        header = f"{stage['stage']}. {stage['name']}" if stage["stage"] else stage["name"]
+        lines.append(f"\n{header}  (~{_format_duration(stage.get('wall_seconds', 0))})")
+        if stage.get("claude_calls"):
+            lines.append(f"  Claude calls: {stage['claude_calls']:.0f}  "
+                         f"(~{stage.get('input_tokens', 0):,.0f} input / ~{stage.get('output_tokens', 0):,.0f} output tokens)")
+        if stage.get("tts_calls"):
+            lines.append(f"  ElevenLabs TTS calls: {stage['tts_calls']:.0f}  "
+                         f"(~{stage.get('tts_characters', 0):,.0f} characters)")
+        if stage.get("sfx_calls"):
+            lines.append(f"  ElevenLabs SFX calls: {stage['sfx_calls']:.0f}  "
+                         f"(~{stage.get('sfx_seconds', 0):.0f}s of audio requested)")
+
+    lines.append("")
+    lines.extend(f"Note: {note}" for note in plan["notes"])
+    return "\n".join(lines)
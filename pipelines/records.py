@@ -0,0 +1,183 @@
+"""
+Shot Records
+Slotted record types for shots moving through the audio generation pipeline
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class _Record:
+    """
+    Base for fixed-field records.
+
+    Subclasses list their fields in __slots__; fields in _ALWAYS are
+    written to JSON even when None, the rest only once they are set.
+    """
+
+    __slots__ = ()
+    _ALWAYS: Tuple[str, ...] = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"Unknown {type(self).__name__} fields: {', '.join(fields)}")
+
+    def to_json(self) -> Dict[str, Any]:
+        """Plain dict for JSON output"""
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name in self._ALWAYS or getattr(self, name) is not None
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]):
+        """Rebuild a record from to_json output, ignoring keys it doesn't know"""
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.to_json().items())
+        return f"{type(self).__name__}({fields})"
+
+
+class SfxRecord(_Record):
+    """One sound effect of a shot, from generation through timing"""
+
+    __slots__ = (
+        "description",
+        "audio_path",
+        "duration",
+        "error",
+        "waveform",
+        "waveforms",
+        "refined_timing_percentage",
+        "timing_confidence",
+        "timing_method"
+    )
+    _ALWAYS = ("description",)
+
+    @property
+    def ok(self) -> bool:
+        """Generated successfully and has audio"""
+        return not self.error and bool(self.audio_path)
+
+
+class DialogueRender(_Record):
+    """A voiced dialogue clip and how it was compressed"""
+
+    __slots__ = (
+        "audio_path",
+        "final_dialogue",
+        "duration",
+        "compression_iterations",
+        "original_dialogue",
+        "words"
+    )
+    _ALWAYS = ("audio_path", "final_dialogue", "duration", "compression_iterations", "original_dialogue")
+
+    # JSON keys match the flat shot fields written by earlier versions
+    _JSON_KEYS = {
+        "audio_path": "dialogue_audio_path",
+        "final_dialogue": "final_dialogue",
+        "duration": "dialogue_duration",
+        "compression_iterations": "compression_iterations",
+        "original_dialogue": "original_dialogue",
+        "words": "dialogue_words"
+    }
+
+    def to_json(self) -> Dict[str, Any]:
+        return {self._JSON_KEYS[name]: value for name, value in super().to_json().items()}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> Optional["DialogueRender"]:
+        """Rebuild from flat shot fields; None if the data holds no dialogue clip"""
+        if not data.get("dialogue_audio_path"):
+            return None
+        return cls(**{name: data[key] for name, key in cls._JSON_KEYS.items() if key in data})
+
+
+class ShotRecord(_Record):
+    """A shot with its dialogue render, SFX, timing and mixing results"""
+
+    __slots__ = (
+        "shot_number",
+        "dialogue",
+        "character",
+        "render",
+        "dialogue_error",
+        "dialogue_skipped",
+        "dialogue_waveform",
+        "dialogue_waveforms",
+        "sfx",
+        "combined_audio_path",
+        "combined_duration",
+        "sfx_mixed_count",
+        "mixing_error",
+        "episode_start_s"
+    )
+    _ALWAYS = ("shot_number", "dialogue", "character", "sfx")
+
+    def __init__(self, **fields):
+        super().__init__(**fields)
+        if self.sfx is None:
+            self.sfx = []
+
+    # Dialogue render fields, read through the shot
+
+    @property
+    def dialogue_audio_path(self) -> Optional[str]:
+        return self.render.audio_path if self.render else None
+
+    @property
+    def dialogue_duration(self) -> Optional[float]:
+        return self.render.duration if self.render else None
+
+    @property
+    def final_dialogue(self) -> Optional[str]:
+        return self.render.final_dialogue if self.render else None
+
+    @property
+    def dialogue_words(self) -> Optional[List[Dict]]:
+        return self.render.words if self.render else None
+
+    @property
+    def compression_iterations(self) -> int:
+        if not self.render:
+            return 0
+        return self.render.compression_iterations or 0
+
+    @property
+    def generated_sfx(self) -> List[SfxRecord]:
+        """SFX that were generated successfully"""
+        return [sfx for sfx in self.sfx if sfx.ok]
+
+    def to_json(self) -> Dict[str, Any]:
+        data = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if name == "render":
+                if value:
+                    data.update(value.to_json())
+            elif name == "sfx":
+                data["sfx"] = [sfx.to_json() for sfx in value]
+            elif name in self._ALWAYS or value is not None:
+                data[name] = value
+        return data
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "ShotRecord":
+        fields = {name: data[name] for name in cls.__slots__ if name in data}
+        fields["render"] = DialogueRender.from_json(data)
+        fields["sfx"] = [SfxRecord.from_json(sfx) for sfx in data.get("sfx", [])]
+        return cls(**fields)
+
+
+def shots_to_json(shots: List[ShotRecord]) -> List[Dict[str, Any]]:
+    """Serialize shots for a stage output file"""
+    return [shot.to_json() for shot in shots]
+
+
+def shots_from_json(data: List[Dict[str, Any]]) -> List[ShotRecord]:
+    """Load shots from a stage output file's "shots" list"""
+    return [ShotRecord.from_json(shot) for shot in data]
@@ -0,0 +1,180 @@
+"""
+Run Registry
+SQLite index of pipeline runs, stage completions and artifacts
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+DEFAULT_REGISTRY_PATH = "outputs/runs.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    pipeline TEXT NOT NULL,
+    show TEXT,
+    config_hash TEXT,
+    output_dir TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id TEXT NOT NULL,
+    stage INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    completed_at REAL NOT NULL,
+    seconds REAL,
+    PRIMARY KEY (run_id, stage, name)
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT NOT NULL,
+    stage INTEGER,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS runs_by_pipeline ON runs (pipeline, show, status, started_at);
+CREATE INDEX IF NOT EXISTS artifacts_by_name ON artifacts (name, created_at);
+"""
+
+
+def config_hash(config: Dict) -> str:
+    """Stable short hash of a loaded config"""
+    encoded = json.dumps(config, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def show_name(config: Dict) -> Optional[str]:
+    """
+    Identify the show a config belongs to
+
+    Uses an explicit "show" key, otherwise the first Markdown heading of the
+    bible (e.g. "# The Milo & Sebby Show Bible").
+    """
+    if config.get("show"):
+        return str(config["show"])
+    match = re.search(r"^#\s+(.+)$", config.get("bible") or "", re.MULTILINE)
+    return match.group(1).strip() if match else None
+
+
+class RunRegistry:
+    """
+    Records runs as they start, complete stages and finish.
+
+    Every call opens its own short-lived connection, so the registry can
+    be used from worker threads and by several pipeline processes at once
+    (SQLite serializes the writes).
+    """
+
+    def __init__(self, path: str = DEFAULT_REGISTRY_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(str(self.path), timeout=30)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def start_run(self, run_id: str, pipeline: str, output_dir: str,
+                  show: Optional[str] = None, config_digest: Optional[str] = None):
+        """Register a run (or re-open a resumed one) as running"""
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO runs (run_id, pipeline, show, config_hash, output_dir, status, started_at) "
+                "VALUES (?, ?, ?, ?, ?, 'running', ?) "
+                "ON CONFLICT(run_id) DO UPDATE SET status = 'running', finished_at = NULL, "
+                "config_hash = excluded.config_hash",
+                (run_id, pipeline, show, config_digest, output_dir, time.time())
+            )
+
+    def record_stage(self, run_id: str, stage: int, name: str, seconds: Optional[float] = None):
+        """Mark a stage output as written"""
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO stages (run_id, stage, name, completed_at, seconds) VALUES (?, ?, ?, ?, ?)",
+                (run_id, stage, name, time.time(), seconds)
+            )
+
+    def record_artifact(self, run_id: str, name: str, path: str, stage: Optional[int] = None):
+        """Record an output file of a run under a stable artifact name"""
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO artifacts (run_id, stage, name, path, created_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, stage, name, str(path), time.time())
+            )
+
+    def finish_run(self, run_id: str, status: str = "completed"):
+        """Mark a run completed or failed"""
+        with self._connect() as db:
+            db.execute(
+                "UPDATE runs SET status = ?, finished_at = ? WHERE run_id = ?",
+                (status, time.time(), run_id)
+            )
+
+    def latest_artifact(self, name: str, pipeline: Optional[str] = None, show: Optional[str] = None,
+                        status: Optional[str] = "completed", pattern: Optional[str] = None) -> Optional[str]:
+        """
+        Path of the newest artifact with this name
+
+        Args:
+            name: Artifact name, e.g. "shot_list_final"
+            pipeline: Only runs of this pipeline
+            show: Only runs of this show
+            status: Only runs with this status (None for any)
+            pattern: Only paths matching this glob pattern (matched against the absolute path)
+
+        Returns:
+            Absolute path of the newest artifact that still exists, or None
+        """
+        query = ("SELECT artifacts.path FROM artifacts JOIN runs USING (run_id) "
+                 "WHERE artifacts.name = ?")
+        params: List = [name]
+        for column, value in (("runs.pipeline", pipeline), ("runs.show", show), ("runs.status", status)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value)
+        query += " ORDER BY artifacts.created_at DESC"
+
+        if pattern is not None:
+            pattern = str(Path(pattern).absolute())
+
+        with self._connect() as db:
+            for row in db.execute(query, params):
+                if pattern is not None and not fnmatch(row["path"], pattern):
+                    continue
+                # Runs deleted from disk stay in the index; skip them
+                if Path(row["path"]).exists():
+                    return row["path"]
+        return None
+
+    def run_for_path(self, path: str) -> Optional[Dict]:
+        """The run that produced an artifact path, if registered"""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT runs.* FROM artifacts JOIN runs USING (run_id) WHERE artifacts.path = ?",
+                (str(Path(path).resolve()),)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def runs(self, pipeline: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """Most recent runs, newest first"""
+        query = "SELECT * FROM runs"
+        params: List = []
+        if pipeline:
+            query += " WHERE pipeline = ?"
+            params.append(pipeline)
+        query += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as db:
+            return [dict(row) for row in db.execute(query, params)]
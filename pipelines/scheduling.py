@@ -0,0 +1,122 @@
+"""
+Work Scheduling
+Longest-first dispatch of scenes and shots across worker threads
+"""
+
+import heapq
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .planner import (
+    DEFAULT_SECONDS, DEFAULT_TTS_ATTEMPTS_PER_LINE, estimate_tokens
+)
+
+
+# Character cue lines in a Fountain script (speaker names in caps, optional extension)
+_CHARACTER_CUE = re.compile(r"^[A-Z][A-Z0-9 .'\-]*(\s*\(.*\))?$")
+_NON_CUE = re.compile(r"^(INT\.|EXT\.)|TO:$")
+
+# Approximate YAML output per shot of a shot list
+SHOT_OUTPUT_TOKENS = 250
+
+# Typical dialogue line length; longer lines take longer to voice and compress more often
+LINE_CHARS = 100
+
+
+def dialogue_count(script: str) -> int:
+    """Number of dialogue blocks (character cues) in a Fountain scene"""
+    count = 0
+    for line in script.split("\n"):
+        line = line.strip()
+        if line and _CHARACTER_CUE.match(line) and not _NON_CUE.search(line):
+            count += 1
+    return count
+
+
+def scene_cost(scene: Dict) -> float:
+    """
+    Estimated seconds to generate one scene's shot list
+
+    Every dialogue line becomes a shot, so output grows with the dialogue
+    count; the annotated scene text is carried into the shots as well.
+    """
+    content = scene.get("content", "")
+    output_tokens = SHOT_OUTPUT_TOKENS * max(1, dialogue_count(content)) + estimate_tokens(content)
+    return DEFAULT_SECONDS["claude_call_overhead"] + output_tokens / DEFAULT_SECONDS["claude_output_tokens_per_second"]
+
+
+def shot_cost(shot: Dict) -> float:
+    """Estimated seconds to voice one shot's dialogue and generate its SFX"""
+    seconds = 0.0
+    dialogue = shot.get("dialogue")
+    character = shot.get("character")
+    if dialogue and character and str(character).lower() != "none":
+        seconds += (
+            DEFAULT_SECONDS["tts_call"] * DEFAULT_TTS_ATTEMPTS_PER_LINE
+            * max(1.0, len(str(dialogue)) / LINE_CHARS)
+        )
+    seconds += DEFAULT_SECONDS["sfx_call"] * len(shot.get("sound_effects") or [])
+    return seconds
+
+
+def critical_path(costs: Sequence[float], order: Sequence[int], workers: int) -> float:
+    """Finish time of the last unit when units start in order on the first free worker"""
+    finish_times = [0.0] * max(1, min(workers, len(order)))
+    for index in order:
+        heapq.heapreplace(finish_times, finish_times[0] + costs[index])
+    return max(finish_times)
+
+
+def run_longest_first(items: Sequence[Any], work: Callable[[Any], Any], cost: Callable[[Any], float],
+                      workers: int, label: Callable[[Any], str] = str) -> Tuple[List[Any], Dict]:
+    """
+    Run work on every item across worker threads, most expensive first
+
+    Args:
+        items: Work units
+        work: Function run on each item
+        cost: Estimated seconds for an item, computed before dispatch
+        workers: Number of worker threads
+        label: Name of an item for the report
+
+    Returns:
+        Tuple of (results in item order, schedule report)
+    """
+    costs = [cost(item) for item in items]
+    order = sorted(range(len(items)), key=lambda index: costs[index], reverse=True)
+    actual = [0.0] * len(items)
+
+    def timed(index: int):
+        started = time.monotonic()
+        try:
+            return work(items[index])
+        finally:
+            actual[index] = time.monotonic() - started
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {index: executor.submit(timed, index) for index in order}
+        results = [futures[index].result() for index in range(len(items))]
+    elapsed = time.monotonic() - started
+
+    report = {
+        "workers": workers,
+        "estimated_critical_path_s": round(critical_path(costs, order, workers), 1),
+        "estimated_in_order_s": round(critical_path(costs, range(len(items)), workers), 1),
+        "actual_critical_path_s": round(elapsed, 1),
+        "units": [
+            {"unit": label(items[index]), "estimated_s": round(costs[index], 1), "actual_s": round(actual[index], 1)}
+            for index in order
+        ]
+    }
+    return results, report
+
+
+def format_schedule(report: Dict) -> str:
+    """One-line estimated versus actual critical path"""
+    return (
+        f"Critical path with {report['workers']} workers: estimated {report['estimated_critical_path_s']:.0f}s "
+        f"(in order: {report['estimated_in_order_s']:.0f}s), actual {report['actual_critical_path_s']:.0f}s"
+    )
@@ -0,0 +1,239 @@
+"""
+Shard Merging
+Combines audio generation shards into one run, as if a single host had produced it
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .base_pipeline import BasePipeline
+from .records import ShotRecord, shots_from_json, shots_to_json
+
+
+# Stage outputs every shard writes, merged shot by shot
+SHARD_STAGES = [
+    (1, "audio_generated"),
+    (2, "waveforms"),
+    (3, "refined_timings"),
+    (4, "mixed_audio")
+]
+
+
+def parse_shard(value: str) -> tuple:
+    """Parse "i/N" into (i, N), with 1 <= i <= N"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {value!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and N, got {value!r}")
+    return index, count
+
+
+def shard_dir(run_dir: str, index: int, count: int) -> Path:
+    """Directory of one shard inside the shared run directory"""
+    return Path(run_dir) / f"shard_{index}of{count}"
+
+
+def find_shards(run_dir: str) -> List[Dict]:
+    """
+    Read the shard.json of every shard in a run directory
+
+    Raises:
+        ValueError: If shards are missing, incomplete or disagree
+    """
+    shards = []
+    for path in sorted(Path(run_dir).glob("shard_*of*/shard.json")):
+        with open(path, "r") as f:
+            shard = json.load(f)
+        shard["dir"] = path.parent
+        shards.append(shard)
+
+    if not shards:
+        raise ValueError(f"No shards found in {run_dir}")
+
+    count = shards[0]["count"]
+    if any(shard["count"] != count for shard in shards):
+        raise ValueError("Shards were run with different shard counts")
+    if len({shard["shot_list_path"] for shard in shards}) > 1:
+        raise ValueError("Shards were run on different shot lists")
+
+    missing = sorted(set(range(1, count + 1)) - {shard["index"] for shard in shards})
+    if missing:
+        raise ValueError(f"Missing shard(s) {', '.join(f'{i}/{count}' for i in missing)}")
+
+    unfinished = [
+        f"{shard['index']}/{count}" for shard in shards
+        if not (shard["dir"] / "04_mixed_audio.json").exists()
+    ]
+    if unfinished:
+        raise ValueError(f"Shard(s) {', '.join(unfinished)} have not finished mixing")
+
+    total_shots = shards[0]["total_shots"]
+    positions = sorted(position for shard in shards for position in shard["positions"])
+    if positions != list(range(total_shots)):
+        raise ValueError("Shards do not cover the shot list exactly once")
+
+    return sorted(shards, key=lambda shard: shard["index"])
+
+
+def _link_file(source: Path, dest: Path):
+    """Hardlink source to dest (copying where links aren't supported), replacing dest"""
+    temp_path = dest.with_name(f".tmp_{dest.name}")
+    if temp_path.exists():
+        os.remove(temp_path)
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copyfile(source, temp_path)
+    os.replace(temp_path, dest)
+
+
+class ShardMerge(BasePipeline):
+    """
+    Merges the shards of a sharded audio generation run.
+
+    Shards run with --shard i/N write into <run_dir>/shard_<i>of<N>/.
+    The merge links their clips into <run_dir>/audio/, interleaves the
+    shots back into shot list order and writes the stage outputs, debug
+    log, enhanced shot list and episode a single-host run would have
+    written, with clip paths pointing into <run_dir>/audio/.
+    """
+
+    def __init__(self, run_dir: str, config_path: Optional[str] = None):
+        """
+        Args:
+            run_dir: Run directory holding the shard directories
+            config_path: Config for the merged run (default: the config the shards ran with)
+        """
+        self.shards = find_shards(run_dir)
+        # Set before base init, which registers the run under the shot list's show
+        self.shot_list_path = self.shards[0]["shot_list_path"]
+        super().__init__(
+            config_path or str(self.shards[0]["dir"] / "config.yaml"), "audio_generation", 1, run_dir
+        )
+        self.audio_dir = self.output_dir / "audio"
+        self.audio_dir.mkdir(exist_ok=True)
+
+    def get_stage_count(self) -> int:
+        return 5
+
+    def _show_name(self) -> Optional[str]:
+        """Inherit the show from the pitch_to_shotlist run that produced the shot list"""
+        source_run = None
+        if self.registry is not None:
+            try:
+                source_run = self.registry.run_for_path(self.shot_list_path)
+            except sqlite3.Error:
+                pass
+        if source_run and source_run.get("show"):
+            return source_run["show"]
+        return super()._show_name()
+
+    def _link_audio(self, shard: Dict) -> int:
+        """Link one shard's clips into the run's audio directory"""
+        linked = 0
+        for clip in sorted(Path(shard["audio_dir"]).glob("*.mp3")):
+            if clip.name.startswith("temp_"):
+                continue
+            _link_file(clip, self.audio_dir / clip.name)
+            linked += 1
+        return linked
+
+    def _relocate(self, shot: ShotRecord, shard: Dict):
+        """Point a shard shot's clip paths at the run's audio directory"""
+        prefix = str(Path(shard["audio_dir"]))
+
+        def moved(path: Optional[str]) -> Optional[str]:
+            if path and path.startswith(prefix):
+                return str(self.audio_dir) + path[len(prefix):]
+            return path
+
+        if shot.render:
+            shot.render.audio_path = moved(shot.render.audio_path)
+        for sfx in shot.sfx:
+            sfx.audio_path = moved(sfx.audio_path)
+        shot.combined_audio_path = moved(shot.combined_audio_path)
+
+    def _merge_stage(self, stage_num: int, stage_name: str) -> List[ShotRecord]:
+        """Shots of one stage from every shard, back in shot list order"""
+        by_position = {}
+        for shard in self.shards:
+            data = self._load_previous_output(str(shard["dir"] / f"{stage_num:02d}_{stage_name}.json"))
+            shots = shots_from_json(data.get("shots", []))
+            if len(shots) != len(shard["positions"]):
+                raise ValueError(
+                    f"Shard {shard['index']}/{shard['count']} has {len(shots)} shots in "
+                    f"{stage_num:02d}_{stage_name}.json, expected {len(shard['positions'])}"
+                )
+            for position, shot in zip(shard["positions"], shots):
+                self._relocate(shot, shard)
+                by_position[position] = shot
+        return [by_position[position] for position in sorted(by_position)]
+
+    def _merge_debug_logs(self):
+        """One debug log with every shard's TTS attempts (feeds duration prediction)"""
+        merged = None
+        for shard in self.shards:
+            path = shard["dir"] / "debug_log.json"
+            if not path.exists():
+                continue
+            debug_log = self._load_previous_output(str(path))
+            if merged is None:
+                # Pool stats are per host and don't add up
+                merged = dict(debug_log, http_pools=None)
+                continue
+            merged["compression_attempts"].extend(debug_log.get("compression_attempts", []))
+            for key, value in debug_log.get("statistics", {}).items():
+                merged["statistics"][key] = merged["statistics"].get(key, 0) + value
+
+        if merged is not None:
+            merged["shards"] = len(self.shards)
+            with open(self.output_dir / "debug_log.json", "w") as f:
+                json.dump(merged, f, indent=2)
+            print("  → Saved debug log to debug_log.json")
+
+    def run(self):
+        """Merge the shards into the run directory"""
+        from .episode import assemble_episode
+        from .shot_list import build_enhanced_shot_list
+
+        count = self.shards[0]["count"]
+        self.print_header(f"Merging {count} shards into {self.output_dir}")
+
+        try:
+            for shard in self.shards:
+                linked = self._link_audio(shard)
+                print(f"Shard {shard['index']}/{count}: {len(shard['positions'])} shots, {linked} clips")
+
+            merged = {}
+            for stage_num, stage_name in SHARD_STAGES:
+                merged[stage_name] = self._merge_stage(stage_num, stage_name)
+                self._save_output(stage_num, stage_name, {"shots": shots_to_json(merged[stage_name])})
+
+            self._merge_debug_logs()
+
+            enhanced, shots_updated = build_enhanced_shot_list(
+                self.shot_list_path, merged["refined_timings"], self.config.get("model_id", "eleven_v3")
+            )
+            with open(self.output_dir / "enhanced_shot_list.json", 'w') as f:
+                json.dump(enhanced, f, indent=2)
+            print(f"  Updated {shots_updated} shots with compressed dialogue for lip sync")
+
+            episode_config = self.config.get("episode", {})
+            if episode_config.get("enabled", True):
+                cue_sheet = assemble_episode(merged["mixed_audio"], self.output_dir, episode_config)
+                if cue_sheet:
+                    self._save_output(5, "episode_cue_sheet", cue_sheet)
+        except BaseException:
+            # BaseException so Ctrl-C and SystemExit don't leave the run marked running
+            self._finish_run("failed")
+            raise
+
+        self.create_summary()
+        self.print_success()
+        self._finish_run("completed")
@@ -0,0 +1,305 @@
+"""
+Shot List Loading
+Flattens pitch_to_shotlist output into the shot sequence processed by audio generation
+"""
+
+import json
+import re
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .records import ShotRecord, shots_to_json
+
+
+# Scene fields audio generation needs; everything else (notably raw_response) is skipped unparsed
+SCENE_FIELDS = ("scene_heading", "shot_list")
+
+_NON_WS = re.compile(r"\S")
+_STRING_STOP = re.compile(r'["\\]')
+_STRUCTURE = re.compile(r'["{}\[\]]')
+_SCALAR_END = re.compile(r"[,\]}\s]")
+
+
+class _JsonReader:
+    """
+    Minimal incremental JSON reader over a text file.
+
+    Values are located with a bracket- and string-aware scan and only the
+    ones asked for are decoded. Skipped values are discarded as the scan
+    passes them, so memory is bounded by the largest value actually read
+    plus one read chunk.
+    """
+
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.mark: Optional[int] = None
+
+    def _fill(self) -> bool:
+        """Read another chunk, dropping consumed text before pos (or the mark)"""
+        data = self.f.read(self.chunk_size)
+        if not data:
+            return False
+        keep = self.pos if self.mark is None else self.mark
+        self.buf = self.buf[keep:] + data
+        self.pos -= keep
+        if self.mark is not None:
+            self.mark = 0
+        return True
+
+    def _need_more(self):
+        if not self._fill():
+            raise ValueError("Unexpected end of JSON input")
+
+    def _peek(self) -> str:
+        """Next non-whitespace character (not consumed), or "" at end of input"""
+        while True:
+            match = _NON_WS.search(self.buf, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buf[self.pos]
+            self.pos = len(self.buf)
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON input, found {found!r}")
+        self.pos += 1
+
+    def _scan_string(self):
+        """Advance past the string starting at pos"""
+        self.pos += 1
+        while True:
+            match = _STRING_STOP.search(self.buf, self.pos)
+            if not match:
+                self.pos = len(self.buf)
+                self._need_more()
+            elif match.group() == "\\":
+                if match.end() >= len(self.buf):
+                    # Escaped character is in the next chunk
+                    self.pos = match.start()
+                    self._need_more()
+                else:
+                    self.pos = match.end() + 1
+            else:
+                self.pos = match.end()
+                return
+
+    def skip_value(self):
+        """Advance past the next value without decoding it"""
+        char = self._peek()
+        if char == '"':
+            self._scan_string()
+        elif char in "{[":
+            depth = 0
+            while True:
+                match = _STRUCTURE.search(self.buf, self.pos)
+                if not match:
+                    self.pos = len(self.buf)
+                    self._need_more()
+                    continue
+                if match.group() == '"':
+                    self.pos = match.start()
+                    self._scan_string()
+                    continue
+                self.pos = match.end()
+                depth += 1 if match.group() in "{[" else -1
+                if depth == 0:
+                    return
+        elif char:
+            while True:
+                match = _SCALAR_END.search(self.buf, self.pos)
+                if match:
+                    self.pos = match.start()
+                    return
+                self.pos = len(self.buf)
+                if not self._fill():
+                    return
+        else:
+            raise ValueError("Unexpected end of JSON input")
+
+    def read_value(self):
+        """Decode and return the next value"""
+        self._peek()
+        self.mark = self.pos
+        try:
+            self.skip_value()
+            return json.loads(self.buf[self.mark:self.pos])
+        finally:
+            self.mark = None
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Yield the keys of the object at pos
+
+        The caller must consume each key's value (read_value or skip_value)
+        before asking for the next key.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            separator = self._peek()
+            self.pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or '}}' in JSON object, found {separator!r}")
+
+    def iter_array(self) -> Iterator[None]:
+        """Yield once per element of the array at pos; the caller consumes each element"""
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield None
+            separator = self._peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {separator!r}")
+
+
+def iter_scenes(path: str, fields: Tuple[str, ...] = SCENE_FIELDS) -> Iterator[Dict]:
+    """
+    Stream the scenes of a shot list file one at a time
+
+    Only the requested fields of each scene are decoded, and nothing past
+    the last scene the caller asks for is read from disk.
+
+    Args:
+        path: Path to 05_shot_list_final.json
+        fields: Scene fields to decode
+
+    Yields:
+        Scene dicts containing only the requested fields
+    """
+    with open(path, 'r') as f:
+        reader = _JsonReader(f)
+        for key in reader.iter_object():
+            if key != "all_shot_lists":
+                reader.skip_value()
+                continue
+            for _ in reader.iter_array():
+                scene = {}
+                for field in reader.iter_object():
+                    if field in fields:
+                        scene[field] = reader.read_value()
+                    else:
+                        reader.skip_value()
+                yield scene
+            return
+
+
+def _collect_shots(scenes: Iterable[Dict], scene_limit: Optional[int],
+                   max_shots: Optional[int]) -> Tuple[List[Dict], int]:
+    """Take shots from scenes in order until a limit is reached"""
+    all_shots = []
+    scenes_processed = 0
+
+    for scene_data in scenes:
+        scene_shots = scene_data.get('shot_list', {}).get('shots', [])
+        all_shots.extend(scene_shots)
+        scenes_processed += 1
+
+        # Apply shot limit if configured
+        if max_shots and len(all_shots) >= max_shots:
+            all_shots = all_shots[:max_shots]
+            print(f"Shot limit ({max_shots}) reached")
+            break
+
+        # Apply scene limit if configured (checked here so the next scene is never read)
+        if scene_limit and scenes_processed >= scene_limit:
+            print(f"Scene limit ({scene_limit}) reached, stopping shot list loading")
+            break
+
+    return all_shots, scenes_processed
+
+
+def extract_shots(raw_data: Dict, scene_limit: Optional[int] = None,
+                  max_shots: Optional[int] = None) -> Tuple[List[Dict], int]:
+    """
+    Collect shots from a shot list in scene order
+
+    Args:
+        raw_data: Parsed 05_shot_list_final.json
+        scene_limit: Only take the first N scenes
+        max_shots: Only take the first N shots overall
+
+    Returns:
+        Tuple of (shots, scenes_processed)
+    """
+    return _collect_shots(raw_data.get('all_shot_lists', []), scene_limit, max_shots)
+
+
+def load_shots(path: str, scene_limit: Optional[int] = None,
+               max_shots: Optional[int] = None) -> Tuple[List[Dict], int]:
+    """
+    Stream shots from a shot list file in scene order
+
+    Same result as extract_shots on the parsed file, but raw responses are
+    never decoded and parsing stops as soon as the limits are reached.
+
+    Args:
+        path: Path to 05_shot_list_final.json
+        scene_limit: Only take the first N scenes
+        max_shots: Only take the first N shots overall
+
+    Returns:
+        Tuple of (shots, scenes_processed)
+    """
+    return _collect_shots(iter_scenes(path), scene_limit, max_shots)
+
+
+def build_enhanced_shot_list(shot_list_path: str, shots: List[ShotRecord],
+                             model_id: str) -> Tuple[Dict, int]:
+    """
+    The original shot list with compressed dialogue for lip sync
+
+    Args:
+        shot_list_path: Path to the 05_shot_list_final.json the shots came from
+        shots: Refined shot records
+        model_id: Voice model used for the dialogue
+
+    Returns:
+        Tuple of (enhanced shot list, number of shots updated)
+    """
+    # Create mapping of shot numbers to final dialogue
+    dialogue_updates = {}
+    for shot in shots:
+        if shot.final_dialogue and shot.compression_iterations > 0:
+            dialogue_updates[shot.shot_number] = shot.final_dialogue
+
+    # Stream the original scenes (headings and shot lists only, without raw responses)
+    scenes = []
+    shots_updated = 0
+
+    for scene_data in iter_scenes(shot_list_path):
+        scenes.append(scene_data)
+        for shot in scene_data.get('shot_list', {}).get('shots', []):
+            shot_num = shot.get('shot_number')
+            if shot_num in dialogue_updates:
+                shot['original_dialogue'] = shot.get('dialogue')
+                shot['dialogue'] = dialogue_updates[shot_num]
+                shot['was_compressed'] = True
+                shots_updated += 1
+
+    enhanced_shot_list = {
+        "original_shot_list_path": shot_list_path,
+        "generation_timestamp": datetime.now().isoformat(),
+        "model_id": model_id,
+        "compressed_dialogues_count": shots_updated,
+        "audio_generation_results": shots_to_json(shots),
+        "enhanced_shot_lists": scenes
+    }
+    return enhanced_shot_list, shots_updated
@@ -0,0 +1,399 @@
+"""
+Local Timing Engine
+Deterministic SFX placement from onset, pause and energy analysis
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .records import ShotRecord
+
+
+# SFX that play under a line rather than punctuating it
+SUSTAINED_KEYWORDS = (
+    "ambient", "ambience", "background", "hum", "humming", "buzz", "buzzing", "drone",
+    "rumble", "rumbling", "whirring", "whirr", "rhythmic", "rhythmically", "sustained",
+    "continuous", "steady", "constant", "loop", "rain", "wind", "crackling", "bubbling"
+)
+
+# SFX that are a single short hit
+IMPULSE_KEYWORDS = {
+    "click", "bang", "thud", "slam", "knock", "beep", "pop", "snap", "crash", "clang", "ding",
+    "whoosh", "swoosh", "zap", "boom", "thump", "clap", "tap", "chime", "crack", "splash", "blip",
+    "boop", "clink", "plink", "thwack", "smack", "punch", "gunshot", "shot"
+}
+
+# Words too generic to anchor an SFX to the dialogue text
+STOP_WORDS = {
+    "the", "and", "then", "with", "into", "onto", "from", "that", "this", "followed",
+    "sound", "sounds", "soft", "loud", "sharp", "deep", "high", "low", "bright", "dull",
+    "close", "distant", "quick", "slow", "seconds", "second", "against", "over", "off"
+}
+
+
+def _stem(word: str) -> str:
+    """Strip common inflections so 'clicks'/'clicking' match 'click'"""
+    return re.sub(r"(ing|ed|es|s)$", "", word)
+
+
+def estimate_sfx_duration(
+    description: str,
+    dialogue_duration: Optional[float],
+    window: float,
+    limit: float,
+    impulse_duration: float = 1.5,
+    default_duration: float = 3.0,
+    sustain_padding: float = 1.0
+) -> float:
+    """
+    Estimate how much of an SFX will survive mixing, to request only that much audio
+
+    Sustained sounds are bedded from the first word, so they need to cover
+    the dialogue plus a short tail but never more than the rest of the mix
+    window after a centered line starts. Impulses need one short hit per
+    event ("X followed by Y" counts two). Everything else gets the default,
+    shortened for brief lines.
+
+    Args:
+        description: SFX description
+        dialogue_duration: Voiced dialogue length in seconds (None if the shot has no dialogue)
+        window: Mix window length in seconds
+        limit: Hard upper bound (sfx_duration_limit)
+        impulse_duration: Seconds per impulsive event
+        default_duration: Seconds for effects that are neither sustained nor impulsive
+        sustain_padding: Seconds a sustained sound runs past the end of the line
+
+    Returns:
+        Requested duration in seconds (at least 0.5, the provider minimum)
+    """
+    description_lower = description.lower()
+    words = re.findall(r"[a-z']+", description_lower)
+
+    if any(keyword in words for keyword in SUSTAINED_KEYWORDS):
+        if dialogue_duration:
+            target = min(dialogue_duration + sustain_padding, (window + dialogue_duration) / 2)
+        else:
+            target = window
+    elif any(word in IMPULSE_KEYWORDS or _stem(word) in IMPULSE_KEYWORDS for word in words):
+        events = 1 + len(re.findall(r"\bfollowed by\b|\bthen\b", description_lower))
+        target = impulse_duration * events
+    elif dialogue_duration:
+        target = min(default_duration, dialogue_duration + sustain_padding)
+    else:
+        target = default_duration
+
+    return round(float(max(0.5, min(target, limit, window))), 1)
+
+
+class LocalTimingEngine:
+    """
+    Places SFX relative to dialogue without an LLM.
+
+    Dialogue is segmented into speech and pauses with an energy-based
+    voice activity detector; each SFX's attack onset is found from its
+    onset-strength envelope. The SFX is then positioned so its attack
+    lands on an anchor: under the line for sustained sounds, on a word
+    the description mentions, or in the most prominent pause. When the
+    shot carries TTS word alignment, words and pauses come from it
+    directly and the dialogue audio is not decoded. Each placement
+    carries a confidence score so ambiguous shots can still be sent to
+    Claude.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 22050,
+        hop_length: int = 512,
+        silence_db: float = -35.0,
+        min_pause: float = 0.15
+    ):
+        """
+        Configure the analysis
+
+        Args:
+            sample_rate: Analysis sample rate (clips are resampled on load)
+            hop_length: Samples between analysis frames
+            silence_db: Frames this far below the clip's loudest frame count as silence
+            min_pause: Shortest silence inside speech treated as a pause, in seconds
+        """
+        self.sample_rate = sample_rate
+        self.hop_length = hop_length
+        self.silence_db = silence_db
+        self.min_pause = min_pause
+
+    def _load(self, audio_path: str) -> np.ndarray:
+        """Load a clip as mono at the analysis sample rate"""
+        import librosa  # Deferred: only needed when clips are actually decoded
+
+        y, _ = librosa.load(audio_path, sr=self.sample_rate, mono=True)
+        return y
+
+    def _frame_db(self, y: np.ndarray) -> np.ndarray:
+        """Per-frame RMS in dB relative to the loudest frame"""
+        import librosa
+
+        rms = librosa.feature.rms(y=y, hop_length=self.hop_length)[0]
+        return librosa.amplitude_to_db(rms, ref=np.max(rms) if rms.size and np.max(rms) > 0 else 1.0)
+
+    def analyze_dialogue(self, audio_path: str) -> Dict:
+        """
+        Find speech boundaries and pauses in a dialogue clip
+
+        Args:
+            audio_path: Path to dialogue audio
+
+        Returns:
+            Dict with duration, speech_start, speech_end, pauses [(start, end)]
+            and voiced_segments [(start, end)], all in seconds
+        """
+        y = self._load(audio_path)
+        duration = len(y) / self.sample_rate
+        frame_time = self.hop_length / self.sample_rate
+
+        voiced = self._frame_db(y) > self.silence_db
+        if not voiced.any():
+            return {
+                "duration": duration,
+                "speech_start": 0.0,
+                "speech_end": duration,
+                "pauses": [],
+                "voiced_segments": [(0.0, duration)]
+            }
+
+        # Run boundaries of the voiced mask
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+        segments = [(start * frame_time, end * frame_time) for start, end in zip(edges[::2], edges[1::2])]
+
+        # Merge segments separated by gaps shorter than a pause
+        merged = [segments[0]]
+        for start, end in segments[1:]:
+            if start - merged[-1][1] < self.min_pause:
+                merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+
+        pauses = [(merged[i][1], merged[i + 1][0]) for i in range(len(merged) - 1)]
+
+        return {
+            "duration": duration,
+            "speech_start": merged[0][0],
+            "speech_end": min(merged[-1][1], duration),
+            "pauses": pauses,
+            "voiced_segments": merged
+        }
+
+    def dialogue_from_words(self, words: List[Dict], duration: float) -> Dict:
+        """
+        Build dialogue analysis from TTS word alignment instead of the audio
+
+        Args:
+            words: Per-word timings (word, start, end) from TTS alignment
+            duration: Dialogue clip duration in seconds
+
+        Returns:
+            Same structure as analyze_dialogue, plus the aligned words
+        """
+        if not words:
+            return {
+                "duration": duration,
+                "speech_start": 0.0,
+                "speech_end": duration,
+                "pauses": [],
+                "voiced_segments": [(0.0, duration)],
+                "words": []
+            }
+
+        segments = [(words[0]["start"], words[0]["end"])]
+        for word in words[1:]:
+            if word["start"] - segments[-1][1] < self.min_pause:
+                segments[-1] = (segments[-1][0], word["end"])
+            else:
+                segments.append((word["start"], word["end"]))
+
+        return {
+            "duration": duration,
+            "speech_start": segments[0][0],
+            "speech_end": segments[-1][1],
+            "pauses": [(segments[i][1], segments[i + 1][0]) for i in range(len(segments) - 1)],
+            "voiced_segments": segments,
+            "words": words
+        }
+
+    def analyze_sfx(self, audio_path: str) -> Dict:
+        """
+        Find the attack onset of an SFX clip
+
+        Args:
+            audio_path: Path to SFX audio
+
+        Returns:
+            Dict with duration, attack_time (seconds of lead-in before the
+            sound), attack_strength (onset peak over median, >= 1) and
+            active_ratio (fraction of the clip that is not silent)
+        """
+        import librosa
+
+        y = self._load(audio_path)
+        duration = len(y) / self.sample_rate
+
+        onset_env = librosa.onset.onset_strength(y=y, sr=self.sample_rate, hop_length=self.hop_length)
+        frame_db = self._frame_db(y)
+
+        if onset_env.size == 0 or onset_env.max() <= 0:
+            return {"duration": duration, "attack_time": 0.0, "attack_strength": 1.0, "active_ratio": 0.0}
+
+        onsets = librosa.onset.onset_detect(
+            onset_envelope=onset_env, sr=self.sample_rate, hop_length=self.hop_length, backtrack=True
+        )
+        if len(onsets):
+            attack_frame = int(onsets[0])
+        else:
+            # No distinct onset - use the first frame that is not silent
+            active = np.flatnonzero(frame_db > self.silence_db)
+            attack_frame = int(active[0]) if active.size else 0
+
+        median = float(np.median(onset_env)) or 1e-6
+        return {
+            "duration": duration,
+            "attack_time": attack_frame * self.hop_length / self.sample_rate,
+            "attack_strength": float(onset_env.max() / median),
+            "active_ratio": float(np.mean(frame_db > self.silence_db))
+        }
+
+    def _word_time(self, dialogue_info: Dict, dialogue_text: str, word: str) -> Optional[float]:
+        """
+        Estimate when a word is spoken by spreading the text's characters over the voiced segments
+
+        Returns:
+            Time in seconds, or None if the word is not in the text
+        """
+        if dialogue_info.get("words"):
+            # Exact timing from TTS alignment
+            for aligned in dialogue_info["words"]:
+                if re.sub(r"[^\w']", "", aligned["word"].lower()).startswith(word):
+                    return aligned["start"]
+            return None
+
+        spoken = re.sub(r'\[[^\]]*\]|\([^)]*\)', ' ', dialogue_text).lower()
+        spoken = re.sub(r'\s+', ' ', spoken).strip()
+        match = re.search(rf'\b{re.escape(word)}', spoken)
+        if not match or not spoken:
+            return None
+
+        fraction = match.start() / len(spoken)
+        segments = dialogue_info["voiced_segments"]
+        total = sum(end - start for start, end in segments)
+        target = fraction * total
+        for start, end in segments:
+            if target <= end - start:
+                return start + target
+            target -= end - start
+        return segments[-1][1]
+
+    def place(self, dialogue_info: Dict, dialogue_text: str, sfx_info: Dict, description: str) -> Tuple[float, float, str]:
+        """
+        Choose a start position for one SFX
+
+        Args:
+            dialogue_info: Result of analyze_dialogue
+            dialogue_text: Spoken dialogue text
+            sfx_info: Result of analyze_sfx
+            description: SFX description
+
+        Returns:
+            Tuple of (timing_percentage, confidence 0-1, reason)
+        """
+        duration = max(dialogue_info["duration"], 1e-3)
+        description_lower = description.lower()
+        words = re.findall(r"[a-z']+", description_lower)
+
+        # Attack clarity: strong isolated onsets are easy to align
+        attack_clarity = min(1.0, max(0.0, (sfx_info["attack_strength"] - 1.0) / 9.0))
+
+        keyword_sustained = any(keyword in words for keyword in SUSTAINED_KEYWORDS)
+        dense = sfx_info["active_ratio"] > 0.8
+        if keyword_sustained or dense:
+            # Bed the sound under the whole line: attack at the first word
+            anchor = dialogue_info["speech_start"]
+            active_ratio = min(1.0, sfx_info["active_ratio"])
+            if keyword_sustained and dense:
+                # Description and audio agree
+                confidence = 0.75 + 0.2 * active_ratio
+            elif keyword_sustained:
+                confidence = 0.5 + 0.2 * active_ratio
+            else:
+                # Density alone can be a long tail after a hit; a clear attack makes that likelier
+                confidence = 0.4 + 0.25 * (1.0 - attack_clarity)
+            reason = "sustained sound under dialogue"
+        else:
+            mentioned = [
+                (word, self._word_time(dialogue_info, dialogue_text, word))
+                for word in words if len(word) > 3 and word not in STOP_WORDS
+            ]
+            mentioned = [(word, t) for word, t in mentioned if t is not None]
+            pauses = sorted(dialogue_info["pauses"], key=lambda p: p[1] - p[0], reverse=True)
+
+            if mentioned:
+                word, anchor = mentioned[0]
+                if dialogue_info.get("words"):
+                    # Word timing is exact, only the SFX attack is estimated
+                    confidence = 0.75 + 0.2 * attack_clarity
+                else:
+                    confidence = 0.55 + 0.35 * attack_clarity
+                reason = f"aligned to spoken word '{word}'"
+            elif pauses:
+                longest = pauses[0][1] - pauses[0][0]
+                runner_up = pauses[1][1] - pauses[1][0] if len(pauses) > 1 else 0.0
+                # A single dominant pause is an unambiguous slot
+                dominance = 1.0 - runner_up / longest if longest > 0 else 0.0
+                anchor = pauses[0][0] + min(0.05, longest / 2)
+                confidence = 0.35 + 0.35 * dominance + 0.25 * attack_clarity
+                reason = f"in {longest:.2f}s pause"
+            else:
+                # No pauses - punctuate the start of the line
+                anchor = dialogue_info["speech_start"]
+                confidence = 0.3 + 0.3 * attack_clarity
+                reason = "at start of line (no pauses found)"
+
+        start_time = anchor - sfx_info["attack_time"]
+        timing_pct = round(100.0 * start_time / duration, 1)
+        return timing_pct, round(min(confidence, 1.0), 3), reason
+
+    def refine_shot(self, shot_data: ShotRecord) -> List[Dict]:
+        """
+        Compute placements for every successful SFX in a shot
+
+        Args:
+            shot_data: Shot record with dialogue and SFX audio paths
+
+        Returns:
+            One dict per SFX (same order as shot_data.sfx) with timing,
+            confidence and reason; failed SFX get None
+        """
+        sfx_list = shot_data.sfx
+
+        if not shot_data.dialogue_audio_path:
+            # Nothing to align against - these shots are not mixed
+            return [
+                None if sfx.error else {"timing": 0.0, "confidence": 1.0, "reason": "no dialogue"}
+                for sfx in sfx_list
+            ]
+
+        if shot_data.dialogue_words is not None and shot_data.dialogue_duration:
+            dialogue_info = self.dialogue_from_words(shot_data.dialogue_words, shot_data.dialogue_duration)
+        else:
+            dialogue_info = self.analyze_dialogue(shot_data.dialogue_audio_path)
+        dialogue_text = shot_data.final_dialogue or shot_data.dialogue or ""
+
+        placements = []
+        for sfx in sfx_list:
+            if not sfx.ok:
+                placements.append(None)
+                continue
+            sfx_info = self.analyze_sfx(sfx.audio_path)
+            timing, confidence, reason = self.place(dialogue_info, dialogue_text, sfx_info, sfx.description or "")
+            placements.append({"timing": timing, "confidence": confidence, "reason": reason})
+
+        return placements
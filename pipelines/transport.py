@@ -0,0 +1,180 @@
+"""
+Shared HTTP Transport
+Pooled keep-alive httpx clients shared by the Anthropic and ElevenLabs SDK clients
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+
+
+# Provider API hosts; each gets its own pool so limits apply per host
+PROVIDER_URLS = {
+    "anthropic": "https://api.anthropic.com",
+    "elevenlabs": "https://api.elevenlabs.io"
+}
+
+DEFAULT_SETTINGS = {
+    "http2": True,
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 120.0,
+    "connect_timeout": 10.0,
+    "prewarm": True
+}
+
+_clients: Dict[str, httpx.Client] = {}
+_stats: Dict[str, Dict] = {}
+_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _make_hooks(provider: str):
+    """Event hooks that count requests, new connections and time to response headers"""
+    stats = _stats[provider]
+
+    def on_trace(event_name: str, info: Dict):
+        if event_name == "connection.connect_tcp.complete":
+            with _lock:
+                stats["connections_opened"] += 1
+
+    def on_request(request: httpx.Request):
+        request.extensions["trace"] = on_trace
+        request.extensions["pool_started_at"] = time.monotonic()
+        with _lock:
+            stats["requests"] += 1
+
+    def on_response(response: httpx.Response):
+        started = response.request.extensions.get("pool_started_at")
+        with _lock:
+            stats["responses"] += 1
+            if response.http_version == "HTTP/2":
+                stats["http2_responses"] += 1
+            if started is not None:
+                stats["header_seconds_total"] += time.monotonic() - started
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+def get_http_client(provider: str, settings: Optional[Dict] = None) -> httpx.Client:
+    """
+    Shared pooled client for a provider, created on first use
+
+    Args:
+        provider: "anthropic" or "elevenlabs"
+        settings: Optional "http" config section (only used when the client is first created)
+
+    Returns:
+        httpx.Client to pass to the provider SDK
+    """
+    with _lock:
+        if provider in _clients:
+            return _clients[provider]
+
+    settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+    http2 = settings["http2"] and _http2_available()
+
+    with _lock:
+        if provider not in _clients:
+            _stats[provider] = {
+                "requests": 0,
+                "responses": 0,
+                "connections_opened": 0,
+                "http2_responses": 0,
+                "header_seconds_total": 0.0,
+                "http2": http2
+            }
+            _clients[provider] = httpx.Client(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings["max_connections"],
+                    max_keepalive_connections=settings["max_keepalive_connections"],
+                    keepalive_expiry=settings["keepalive_expiry"]
+                ),
+                timeout=httpx.Timeout(600.0, connect=settings["connect_timeout"]),
+                event_hooks=_make_hooks(provider)
+            )
+        return _clients[provider]
+
+
+def prewarm(provider: str, settings: Optional[Dict] = None):
+    """
+    Open a connection to the provider in the background
+
+    TLS setup happens while the pipeline is still loading config and data,
+    so the first real request reuses a warm connection. Any failure is
+    ignored; the first request will simply connect as usual.
+
+    Args:
+        provider: "anthropic" or "elevenlabs"
+        settings: Optional "http" config section
+    """
+    client = get_http_client(provider, settings)
+
+    def warm():
+        try:
+            client.head(PROVIDER_URLS[provider], timeout=10.0)
+        except httpx.HTTPError:
+            pass
+
+    threading.Thread(target=warm, daemon=True).start()
+
+
+def shared_clients(providers, settings: Optional[Dict] = None) -> Dict[str, httpx.Client]:
+    """
+    Shared clients for several providers, pre-warmed unless disabled in settings
+
+    Args:
+        providers: Provider names
+        settings: Optional "http" config section
+
+    Returns:
+        Dict of provider -> httpx.Client
+    """
+    settings = settings or {}
+    clients = {}
+    for provider in providers:
+        clients[provider] = get_http_client(provider, settings)
+        if settings.get("prewarm", DEFAULT_SETTINGS["prewarm"]):
+            prewarm(provider, settings)
+    return clients
+
+
+def pool_stats() -> Dict[str, Dict]:
+    """
+    Connection pool statistics per provider
+
+    Returns:
+        Dict of provider -> requests, connections_opened, reuse_ratio,
+        open_connections, http2 and average seconds to response headers
+    """
+    report = {}
+    with _lock:
+        for provider, stats in _stats.items():
+            client = _clients[provider]
+            # httpx exposes no public pool API; read the httpcore pool if present
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = getattr(pool, "connections", None)
+
+            requests = stats["requests"]
+            report[provider] = {
+                "requests": requests,
+                "connections_opened": stats["connections_opened"],
+                "reuse_ratio": round(1 - stats["connections_opened"] / requests, 3) if requests else None,
+                "open_connections": len(connections) if connections is not None else None,
+                "http2": stats["http2"],
+                "http2_responses": stats["http2_responses"],
+                "avg_header_seconds": round(stats["header_seconds_total"] / stats["responses"], 3)
+                if stats["responses"] else None
+            }
+    return report
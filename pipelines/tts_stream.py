@@ -0,0 +1,196 @@
+"""
+TTS Stream Helpers
+Incremental duration tracking and word alignment for TTS audio
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+
+# Bitrates (kbps) for Layer III, indexed by bitrate index
+MPEG1_L3_BITRATES = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0]
+MPEG2_L3_BITRATES = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0]
+
+# Sample rates (Hz) indexed by version bits, then sample rate index
+SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG1
+    2: [22050, 24000, 16000],  # MPEG2
+    0: [11025, 12000, 8000],   # MPEG2.5
+}
+
+
+class StreamDurationTracker:
+    """
+    Tracks the playable duration of an audio stream as bytes arrive.
+
+    MP3 streams are measured by walking MPEG frame headers (each Layer III
+    frame carries a fixed number of samples), so the duration is exact
+    without decoding. PCM streams are measured from the byte count.
+    """
+
+    def __init__(self, output_format: str):
+        """
+        Create a tracker for an ElevenLabs output format
+
+        Args:
+            output_format: ElevenLabs output format, e.g. "mp3_44100_128" or "pcm_24000"
+        """
+        self.output_format = output_format
+        self.codec = output_format.split("_")[0]
+        self.duration = 0.0
+        self.bytes_received = 0
+
+        self._buffer = b""
+        self._id3_checked = False
+        self._skip = 0
+        self._first_frame = True
+
+        if self.codec == "pcm":
+            self._pcm_rate = int(output_format.split("_")[1])
+
+    @classmethod
+    def supports(cls, output_format: str) -> bool:
+        """Whether durations for this output format can be tracked incrementally"""
+        return output_format.split("_")[0] in ("mp3", "pcm")
+
+    def feed(self, chunk: bytes) -> float:
+        """
+        Consume a chunk of the stream
+
+        Args:
+            chunk: Raw bytes received from the TTS stream
+
+        Returns:
+            Total duration in seconds of complete audio received so far
+        """
+        self.bytes_received += len(chunk)
+
+        if self.codec == "pcm":
+            # 16-bit mono little-endian samples
+            self.duration = (self.bytes_received // 2) / self._pcm_rate
+            return self.duration
+
+        self._buffer += chunk
+        self._consume_mp3_frames()
+        return self.duration
+
+    def _consume_mp3_frames(self):
+        """Walk complete MP3 frames in the buffer and accumulate their duration"""
+        if not self._id3_checked:
+            if len(self._buffer) < 10:
+                return
+            if self._buffer[:3] == b"ID3":
+                size_bytes = self._buffer[6:10]
+                tag_size = (size_bytes[0] << 21) | (size_bytes[1] << 14) | (size_bytes[2] << 7) | size_bytes[3]
+                self._skip = 10 + tag_size
+            self._id3_checked = True
+
+        if self._skip:
+            dropped = min(self._skip, len(self._buffer))
+            self._buffer = self._buffer[dropped:]
+            self._skip -= dropped
+            if self._skip:
+                return
+
+        position = 0
+        buffer = self._buffer
+        while position + 4 <= len(buffer):
+            frame = self._parse_frame_header(buffer, position)
+            if frame is None:
+                # Not a frame boundary - resync on the next byte
+                position += 1
+                continue
+
+            frame_length, samples, sample_rate = frame
+            if position + frame_length > len(buffer):
+                break
+
+            # The first frame may be a Xing/Info header that carries no audio
+            if self._first_frame:
+                self._first_frame = False
+                header_frame = buffer[position:position + frame_length]
+                if b"Xing" in header_frame or b"Info" in header_frame:
+                    position += frame_length
+                    continue
+
+            self.duration += samples / sample_rate
+            position += frame_length
+
+        self._buffer = buffer[position:]
+
+    @staticmethod
+    def _parse_frame_header(buffer: bytes, position: int) -> Optional[tuple]:
+        """
+        Parse a Layer III frame header
+
+        Returns:
+            Tuple of (frame_length, samples_per_frame, sample_rate) or None if invalid
+        """
+        b0, b1, b2 = buffer[position], buffer[position + 1], buffer[position + 2]
+        if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+            return None
+
+        version = (b1 >> 3) & 0x03
+        layer = (b1 >> 1) & 0x03
+        bitrate_index = (b2 >> 4) & 0x0F
+        sample_rate_index = (b2 >> 2) & 0x03
+        padding = (b2 >> 1) & 0x01
+
+        if version == 1 or layer != 1 or sample_rate_index == 3:
+            return None
+
+        bitrates = MPEG1_L3_BITRATES if version == 3 else MPEG2_L3_BITRATES
+        bitrate = bitrates[bitrate_index] * 1000
+        if bitrate == 0:
+            return None
+
+        sample_rate = SAMPLE_RATES[version][sample_rate_index]
+        if version == 3:
+            return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+        return 72 * bitrate // sample_rate + padding, 576, sample_rate
+
+
+def alignment_to_words(
+    characters: Sequence[str],
+    start_times: Sequence[float],
+    end_times: Sequence[float]
+) -> List[Dict]:
+    """
+    Group ElevenLabs character alignment into spoken words
+
+    [Bracketed] delivery tags are not spoken and are dropped.
+
+    Args:
+        characters: Aligned characters
+        start_times: Start time of each character in seconds
+        end_times: End time of each character in seconds
+
+    Returns:
+        List of dicts with word, start and end (seconds)
+    """
+    words = []
+    current = ""
+    start = end = 0.0
+    in_tag = False
+
+    for char, char_start, char_end in zip(characters, start_times, end_times):
+        if char == "[":
+            in_tag = True
+        if in_tag or char.isspace():
+            if current:
+                words.append({"word": current, "start": start, "end": end})
+                current = ""
+            if char == "]":
+                in_tag = False
+            continue
+
+        if not current:
+            start = char_start
+        current += char
+        end = char_end
+
+    if current:
+        words.append({"word": current, "start": start, "end": end})
+
+    # Drop tokens that are only punctuation
+    return [w for w in words if re.search(r"\w", w["word"])]
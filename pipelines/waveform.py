@@ -0,0 +1,206 @@
+"""
+Waveform Engine
+Vectorized RMS envelopes and Unicode waveform rendering for batches of audio clips
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import librosa
+import numpy as np
+
+
+WAVEFORM_CHARS = "▁▂▃▄▅▆▇█"
+
+# RMS level that maps to the top character when scaling is "absolute"
+FULL_SCALE_RMS = 0.1
+
+SCALING_MODES = ("absolute", "peak", "loudness")
+
+
+class WaveformEnvelopes:
+    """
+    Precomputed RMS envelopes for a batch of clips.
+
+    Each clip is reduced to per-frame energy (sum of squares over
+    ``frame_length`` samples) as soon as it arrives, so only one decoded
+    clip is held at a time and the batch keeps frame_length times less
+    data than its samples. Frame energies are kept as a cumulative sum,
+    which lets any number of resolutions be rendered later without
+    touching the samples again.
+    """
+
+    def __init__(self, signals: Iterable[Optional[np.ndarray]], frame_length: int = 512):
+        """
+        Build envelopes for a batch of mono signals
+
+        Args:
+            signals: Mono float signals, one per clip (None or empty for missing clips);
+                a generator lets each clip be decoded, reduced and released in turn
+            frame_length: Samples per envelope frame
+        """
+        self.frame_length = frame_length
+
+        lengths = []
+        energies = []
+        counts = []
+        for signal in signals:
+            length = 0 if signal is None else len(signal)
+            lengths.append(length)
+            if not length:
+                continue
+
+            # Pad to whole frames and take every frame's energy in one reduction
+            num_frames = -(-length // frame_length)  # ceil division
+            padded = np.zeros(num_frames * frame_length, dtype=np.float32)
+            padded[:length] = signal
+            framed = padded.reshape(num_frames, frame_length)
+            energies.append(np.einsum("ij,ij->i", framed, framed, dtype=np.float64))
+
+            clip_counts = np.full(num_frames, frame_length, dtype=np.int64)
+            clip_counts[-1] = length - (num_frames - 1) * frame_length
+            counts.append(clip_counts)
+
+        lengths = np.array(lengths, dtype=np.int64)
+        frames = -(-lengths // frame_length)
+        energy = np.concatenate(energies) if energies else np.zeros(0, dtype=np.float64)
+        count = np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64)
+
+        self.num_clips = len(lengths)
+        self.lengths = lengths
+        self.frames = frames
+        self.frame_offsets = np.concatenate(([0], np.cumsum(frames)))
+        self.energy_cumsum = np.concatenate(([0.0], np.cumsum(energy)))
+        self.count_cumsum = np.concatenate(([0], np.cumsum(count)))
+
+    def clip_rms(self) -> np.ndarray:
+        """Return the overall RMS of every clip (0 for empty clips)"""
+        start = self.frame_offsets[:-1]
+        end = self.frame_offsets[1:]
+        energy = self.energy_cumsum[end] - self.energy_cumsum[start]
+        counts = self.count_cumsum[end] - self.count_cumsum[start]
+        return np.sqrt(energy / np.maximum(counts, 1))
+
+    def rms(self, num_bins: int) -> np.ndarray:
+        """
+        Aggregate the envelopes of every clip into ``num_bins`` RMS values
+
+        Args:
+            num_bins: Output resolution (bins per clip)
+
+        Returns:
+            Array of shape (num_clips, num_bins)
+        """
+        # Bin edges in frame units for every clip at once: (num_clips, num_bins + 1)
+        steps = np.linspace(0.0, 1.0, num_bins + 1)
+        local_edges = np.floor(np.outer(self.frames, steps)).astype(np.int64)
+
+        lo = local_edges[:, :-1]
+        hi = local_edges[:, 1:]
+        # Clips shorter than num_bins frames repeat their nearest frame
+        hi = np.minimum(np.maximum(hi, lo + 1), self.frames[:, None])
+        lo = np.minimum(lo, np.maximum(hi - 1, 0))
+
+        base = self.frame_offsets[:-1, None]
+        energy = self.energy_cumsum[base + hi] - self.energy_cumsum[base + lo]
+        counts = self.count_cumsum[base + hi] - self.count_cumsum[base + lo]
+        return np.sqrt(energy / np.maximum(counts, 1))
+
+    def render(
+        self,
+        num_chars: int = 40,
+        scaling: str = "absolute",
+        loudness_target_db: float = -26.0
+    ) -> List[str]:
+        """
+        Render every clip as a Unicode waveform string
+
+        Args:
+            num_chars: Number of Unicode characters per waveform
+            scaling: "absolute" (fixed full scale), "peak" (loudest bin is full
+                height) or "loudness" (clips gain-matched to a target RMS first)
+            loudness_target_db: Target clip RMS in dBFS for "loudness" scaling
+
+        Returns:
+            One waveform string per clip
+        """
+        if scaling not in SCALING_MODES:
+            raise ValueError(f"Unknown waveform scaling '{scaling}', expected one of {SCALING_MODES}")
+
+        rms = self.rms(num_chars)
+
+        if scaling == "peak":
+            peak = rms.max(axis=1, keepdims=True)
+            levels = rms / np.where(peak > 0, peak, 1.0)
+        elif scaling == "loudness":
+            target = 10 ** (loudness_target_db / 20)
+            clip_rms = self.clip_rms()[:, None]
+            gain = np.where(clip_rms > 0, target / np.where(clip_rms > 0, clip_rms, 1.0), 0.0)
+            levels = rms * gain / FULL_SCALE_RMS
+        else:
+            levels = rms / FULL_SCALE_RMS
+
+        top = len(WAVEFORM_CHARS) - 1
+        indices = np.clip((levels * len(WAVEFORM_CHARS)).astype(np.int64), 0, top)
+        indices[self.frames == 0] = 0
+
+        charset = np.array(list(WAVEFORM_CHARS))
+        return [''.join(row) for row in charset[indices]]
+
+
+def load_clip(audio_path: str) -> Optional[np.ndarray]:
+    """
+    Decode an audio file to a mono float signal
+
+    Args:
+        audio_path: Path to audio file
+
+    Returns:
+        Mono signal, or None if the file is missing, empty or unreadable
+    """
+    path = Path(audio_path)
+    if not path.exists():
+        print(f"    Warning: Audio file does not exist: {audio_path}")
+        return None
+
+    if path.stat().st_size == 0:
+        print(f"    Warning: Audio file is empty: {audio_path}")
+        return None
+
+    try:
+        y, _ = librosa.load(audio_path, sr=None, mono=True)
+        return y
+    except Exception as e:
+        print(f"    Error loading audio for waveform {audio_path}: {e}")
+        return None
+
+
+def render_waveforms(
+    audio_paths: Sequence[str],
+    resolutions: Sequence[int] = (40,),
+    scaling: str = "absolute",
+    loudness_target_db: float = -26.0,
+    frame_length: int = 512
+) -> Dict[int, List[str]]:
+    """
+    Decode a batch of clips and render their waveforms at one or more resolutions
+
+    Missing, empty or unreadable files render as a flat waveform.
+
+    Args:
+        audio_paths: Paths to audio files
+        resolutions: Waveform lengths (in characters) to render
+        scaling: Scaling mode passed to WaveformEnvelopes.render
+        loudness_target_db: Target clip RMS in dBFS for "loudness" scaling
+        frame_length: Samples per envelope frame
+
+    Returns:
+        Dict mapping each resolution to a list of waveforms aligned with audio_paths
+    """
+    # Clips are decoded one at a time and reduced to frame energies as they load
+    envelopes = WaveformEnvelopes((load_clip(path) for path in audio_paths), frame_length=frame_length)
+
+    return {
+        num_chars: envelopes.render(num_chars, scaling, loudness_target_db)
+        for num_chars in resolutions
+    }
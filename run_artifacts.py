@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Artifact Store Maintenance
+Export runs out of the shared artifact store and delete unreferenced blobs
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Maintain the content-addressed artifact store (artifacts.enabled in the configs)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Turn a run into plain, editable files with raw responses inline:
+  python run_artifacts.py export outputs/pitch_to_shotlist_2025-01-01_12-00-00
+
+  # See what gc would delete, then delete it:
+  python run_artifacts.py gc --dry-run
+  python run_artifacts.py gc
+
+Notes:
+  - Run files in a store-backed run are read-only hardlinks shared with other
+    runs; export a run before editing its files by hand
+  - gc keeps every blob named by a manifest.json under --outputs (repeat the
+    flag for runs kept elsewhere) and blobs younger than --min-age
+        """
+    )
+    parser.add_argument(
+        "--store",
+        default="outputs/.store",
+        help="Store directory (default: outputs/.store)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Make run directories independent of the store")
+    export.add_argument("run_dirs", nargs="+", help="Run directories to export")
+
+    gc = commands.add_parser("gc", help="Delete blobs no run manifest refers to")
+    gc.add_argument("--outputs", action="append", default=None,
+                    help="Directory searched for run manifests (default: outputs)")
+    gc.add_argument("--min-age", type=float, default=3600.0,
+                    help="Keep blobs written in the last N seconds (default: 3600)")
+    gc.add_argument("--dry-run", action="store_true", help="Report without deleting")
+
+    args = parser.parse_args()
+
+    from pipelines.artifacts import ArtifactStore, export_run
+
+    if args.command == "export":
+        for run_dir in args.run_dirs:
+            if not (Path(run_dir) / "manifest.json").exists():
+                print(f"Skipping {run_dir}: no manifest.json (not stored in the artifact store)")
+                continue
+            count = export_run(run_dir)
+            print(f"Exported {run_dir}: {count} files")
+
+    elif args.command == "gc":
+        if not Path(args.store).exists():
+            print(f"ERROR: No artifact store at {args.store}")
+            sys.exit(1)
+        result = ArtifactStore(args.store).gc(args.outputs or ["outputs"], args.min_age, args.dry_run)
+        action = "Would remove" if args.dry_run else "Removed"
+        print(f"{action} {result['blobs_removed']} blob(s), {result['bytes_freed'] / 1e6:.1f} MB; "
+              f"kept {result['blobs_kept']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,8 +16,6 @@ load_dotenv()
 # Add the project root to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from pipelines.audio_generation import AudioGenerationPipeline
-
 
 def main():
     parser = argparse.ArgumentParser(
@@ -28,16 +26,33 @@ Examples:
   # Generate audio from latest pitch_to_shotlist run:
   python run_audio_generation.py --shot-list outputs/pitch_to_shotlist_*/05_shot_list_final.json
 
+  # Latest completed shot list for one show (looked up in the run registry):
+  python run_audio_generation.py --shot-list "outputs/*" --show "The Milo & Sebby Show Bible"
+
   # Use specific config:
   python run_audio_generation.py --shot-list path/to/shots.json --config configs/audio_generation.yaml
 
   # Resume from specific stage:
   python run_audio_generation.py --shot-list path/to/shots.json --start-from-stage 2
 
+  # Estimate API calls, tokens, ElevenLabs usage and wall time without running:
+  python run_audio_generation.py --shot-list path/to/shots.json --plan
+
+  # Resume an interrupted run (reuses clips recorded in its checkpoint journal):
+  python run_audio_generation.py --shot-list path/to/shots.json --resume outputs/audio_generation_2025-09-30_10-00-00
+
+  # Split one episode across 4 hosts sharing outputs/, then merge:
+  python run_audio_generation.py --shot-list path/to/shots.json --output-dir outputs/audio_generation_ep01 --shard 1/4
+  ...
+  python run_audio_generation.py --shot-list path/to/shots.json --output-dir outputs/audio_generation_ep01 --shard 4/4
+  python run_audio_generation.py --merge outputs/audio_generation_ep01
+
 Notes:
   - Requires ELEVENLABS_API_KEY in .env or config
   - Requires voice_mappings in config for character voices
   - Enforces 10-second dialogue limit through compression
+  - Shards take every Nth shot; re-running a shard resumes it from its journal
+  - The merged run has the same outputs as a single-host run of the shot list
         """
     )
 
@@ -58,12 +73,85 @@ Notes:
         "--start-from-stage",
         type=int,
         default=1,
-        choices=[1, 2, 3, 4],
-        help="Start from a specific stage (1: audio generation, 2: waveforms, 3: timing refinement, 4: audio mixing)"
+        choices=[1, 2, 3, 4, 5],
+        help="Start from a specific stage (1: audio generation, 2: waveforms, 3: timing refinement, "
+             "4: audio mixing, 5: episode assembly)"
+    )
+
+    parser.add_argument(
+        "--resume",
+        default=None,
+        metavar="RUN_DIR",
+        help="Resume into an existing audio_generation output directory, skipping clips already in its journal"
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        help="Run directory to write to (default: outputs/audio_generation_<timestamp>); "
+             "required with --shard, where all shards share it"
+    )
+
+    parser.add_argument(
+        "--shard",
+        default=None,
+        metavar="I/N",
+        help="Process only shard I of N (every Nth shot) into <output-dir>/shard_<I>of<N>"
+    )
+
+    parser.add_argument(
+        "--merge",
+        default=None,
+        metavar="RUN_DIR",
+        help="Merge the finished shards in RUN_DIR into one run, then exit"
+    )
+
+    parser.add_argument(
+        "--show",
+        default=None,
+        help="With a wildcard --shot-list, only consider shot lists from runs of this show"
+    )
+
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Print planned API calls, token/character usage and wall time, then exit (no API calls)"
     )
 
     args = parser.parse_args()
 
+    if args.merge:
+        # Merging makes no API calls and uses the config the shards ran with
+        from pipelines.sharding import ShardMerge
+        try:
+            ShardMerge(args.merge).run()
+        except ValueError as e:
+            print(f"ERROR: Cannot merge shards: {e}")
+            sys.exit(1)
+        return
+
+    if args.resume and not Path(args.resume).is_dir():
+        print(f"ERROR: Run directory not found: {args.resume}")
+        sys.exit(1)
+
+    if args.resume and args.output_dir:
+        print("ERROR: Use either --resume or --output-dir")
+        sys.exit(1)
+
+    shard = None
+    output_dir = args.resume or args.output_dir
+    if args.shard:
+        from pipelines.sharding import parse_shard, shard_dir
+        if not args.output_dir:
+            print("ERROR: --shard needs --output-dir, the run directory shared by all shards")
+            sys.exit(1)
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        output_dir = str(shard_dir(args.output_dir, *shard))
+
     # Load config to get shot_list_path if not provided via CLI
     config_path = Path(args.config)
     if not config_path.exists():
@@ -85,21 +173,45 @@ Notes:
         print("Provide via --shot-list flag or set shot_list_path in config file")
         sys.exit(1)
 
-    # Handle wildcard patterns
-    from glob import glob
-    matching_files = glob(shot_list_pattern)
+    import sqlite3
+    from pipelines.registry import RunRegistry
+    try:
+        registry = RunRegistry()
+    except sqlite3.Error as e:
+        print(f"⚠ Run registry unavailable ({e}), searching outputs/ instead")
+        registry = None
+
+    def latest_shot_list(pattern=None):
+        if registry is None:
+            return None
+        try:
+            return registry.latest_artifact(
+                "shot_list_final", pipeline="pitch_to_shotlist", show=args.show, pattern=pattern
+            )
+        except sqlite3.Error as e:
+            print(f"⚠ Run registry lookup failed ({e}), searching outputs/ instead")
+            return None
+
+    # Handle wildcard patterns: newest completed run in the registry first,
+    # then a directory scan for files the registry doesn't know about
+    from glob import glob, has_magic
+    if has_magic(shot_list_pattern):
+        latest = latest_shot_list(shot_list_pattern)
+        if latest:
+            matching_files = [latest]
+        else:
+            # --show filters by registered show; without a registry there is nothing to filter by
+            matching_files = [] if args.show and registry is not None else glob(shot_list_pattern)
+    else:
+        matching_files = [shot_list_pattern] if Path(shot_list_pattern).exists() else []
 
     if not matching_files:
         print(f"ERROR: No shot list found matching: {shot_list_pattern}")
 
-        # Try to find the latest shot list
-        outputs_dir = Path("outputs")
-        if outputs_dir.exists():
-            shot_lists = list(outputs_dir.glob("pitch_to_shotlist_*/05_shot_list_final.json"))
-            if shot_lists:
-                latest = max(shot_lists, key=lambda p: p.stat().st_mtime)
-                print(f"\nLatest available shot list: {latest}")
-                print(f"Update your config or use: --shot-list {latest}")
+        latest = latest_shot_list()
+        if latest:
+            print(f"\nLatest completed shot list: {latest}")
+            print(f"Update your config or use: --shot-list {latest}")
         sys.exit(1)
 
     # Use the most recent file if multiple matches
@@ -111,6 +223,15 @@ Notes:
 
     print(f"Using shot list: {shot_list_path}")
 
+    if args.plan:
+        from pipelines.planner import format_plan, plan_audio
+        from pipelines.shot_list import load_shots
+
+        shots, _ = load_shots(str(shot_list_path), config.get("scene_limit"), config.get("max_shots"))
+        print()
+        print(format_plan(plan_audio(config, shots)))
+        return
+
     # Check for API keys
     if not os.getenv("ANTHROPIC_API_KEY"):
         print("ERROR: ANTHROPIC_API_KEY not found in environment")
@@ -121,12 +242,17 @@ Notes:
         print("WARNING: ELEVENLABS_API_KEY not found in environment")
         print("Will try to use key from config file if provided")
 
-    # Run the pipeline
+    # Run the pipeline (imported only after arguments and inputs are validated,
+    # since the audio stack is slow to import)
     try:
+        from pipelines.audio_generation import AudioGenerationPipeline
+
         pipeline = AudioGenerationPipeline(
             config_path=str(config_path),
             shot_list_path=str(shot_list_path),
-            start_stage=args.start_from_stage
+            start_stage=args.start_from_stage,
+            output_dir=output_dir,
+            shard=shard
         )
 
         pipeline.run()
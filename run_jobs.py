@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Job Queue Runner
+Queue pipeline runs per episode and process them with long-lived workers
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Queue pipeline runs and run workers that process them",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Queue a full episode (audio starts automatically when its shot list lands):
+  python run_jobs.py enqueue --episode ep01
+
+  # Queue audio generation for an existing shot list:
+  python run_jobs.py enqueue --episode ep01 --pipeline audio_generation --shot-list path/to/shots.json
+
+  # Start a worker (run as many as you like on this machine):
+  python run_jobs.py worker
+
+  # Inspect the queue, one job, or cancel:
+  python run_jobs.py list --episode ep01
+  python run_jobs.py inspect 7
+  python run_jobs.py cancel 7
+  python run_jobs.py cancel --episode ep01
+
+Notes:
+  - One job is one pipeline run; failed runs are retried with backoff
+  - A job whose worker dies is picked up again once its lease expires
+  - Retried audio jobs resume from their checkpoint journal
+  - Workers must share the queue and outputs/ on a local filesystem; SQLite
+    locking is unreliable on network filesystems (NFS/SMB)
+  - Relative --shot-list and config paths are resolved from the current directory
+        """
+    )
+    parser.add_argument(
+        "--queue",
+        default="outputs/jobs.db",
+        help="Queue database (default: outputs/jobs.db)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Queue an episode or a single pipeline run")
+    enqueue.add_argument("--episode", required=True, help="Episode label")
+    enqueue.add_argument(
+        "--pipeline",
+        choices=["episode", "pitch_to_shotlist", "audio_generation"],
+        default="episode",
+        help="What to queue (default: episode = pitch_to_shotlist then audio_generation)"
+    )
+    enqueue.add_argument("--pitch-config", default="configs/pitch_to_shotlist.yaml")
+    enqueue.add_argument("--audio-config", default="configs/audio_generation.yaml")
+    enqueue.add_argument("--shot-list", default=None, help="Shot list for an audio_generation job")
+    enqueue.add_argument("--max-attempts", type=int, default=3)
+
+    listing = commands.add_parser("list", help="List jobs")
+    listing.add_argument("--episode", default=None)
+    listing.add_argument("--status", choices=["pending", "running", "done", "failed", "cancelled"], default=None)
+    listing.add_argument("--limit", type=int, default=50)
+
+    inspect = commands.add_parser("inspect", help="Show one job")
+    inspect.add_argument("job_id", type=int)
+
+    cancel = commands.add_parser("cancel", help="Cancel a job or every unfinished job of an episode")
+    cancel.add_argument("job_id", type=int, nargs="?")
+    cancel.add_argument("--episode", default=None)
+
+    worker = commands.add_parser("worker", help="Process jobs until interrupted")
+    worker.add_argument("--worker-id", default=None, help="Worker name (default: host:pid)")
+    worker.add_argument("--lease", type=float, default=120.0, help="Lease length in seconds (default: 120)")
+    worker.add_argument("--poll", type=float, default=10.0, help="Seconds between polls when idle (default: 10)")
+    worker.add_argument("--stop-timeout", type=float, default=60.0,
+                        help="Seconds a cancelled run gets to clean up before it is killed (default: 60)")
+    worker.add_argument("--once", action="store_true", help="Exit when no job is runnable")
+
+    args = parser.parse_args()
+
+    from pipelines.job_queue import JobQueue, Worker, format_jobs
+    queue = JobQueue(args.queue)
+
+    if args.command == "enqueue":
+        if args.pipeline == "episode":
+            job_ids = queue.enqueue_episode(args.episode, args.pitch_config, args.audio_config, args.max_attempts)
+        elif args.pipeline == "pitch_to_shotlist":
+            job_ids = [queue.enqueue(args.episode, args.pipeline, args.pitch_config, max_attempts=args.max_attempts)]
+        else:
+            if not args.shot_list or not Path(args.shot_list).exists():
+                print(f"ERROR: Shot list not found: {args.shot_list}")
+                sys.exit(1)
+            job_ids = [queue.enqueue(args.episode, args.pipeline, args.audio_config,
+                                     shot_list_path=args.shot_list, max_attempts=args.max_attempts)]
+        print(f"Queued job(s) {', '.join(map(str, job_ids))} for {args.episode}")
+
+    elif args.command == "list":
+        print(format_jobs(queue.jobs(args.episode, args.status, args.limit)))
+
+    elif args.command == "inspect":
+        job = queue.job(args.job_id)
+        if not job:
+            print(f"ERROR: No job {args.job_id}")
+            sys.exit(1)
+        print(json.dumps(job, indent=2))
+
+    elif args.command == "cancel":
+        if args.job_id is None and not args.episode:
+            print("ERROR: Give a job ID or --episode")
+            sys.exit(1)
+        cancelled = queue.cancel(job_id=args.job_id, episode=args.episode)
+        print(f"Cancelled {cancelled} job(s)")
+
+    elif args.command == "worker":
+        try:
+            Worker(queue, args.worker_id, args.lease, args.poll, args.stop_timeout).run(once=args.once)
+        except KeyboardInterrupt:
+            print("\nWorker stopped")
+
+
+if __name__ == "__main__":
+    main()
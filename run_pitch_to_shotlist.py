@@ -13,8 +13,6 @@ from dotenv import load_dotenv
 # Add pipelines to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from pipelines.pitch_to_shotlist import PitchToShotlistPipeline
-
 # Load environment variables
 load_dotenv()
 
@@ -37,8 +35,33 @@ def main():
         help="Start from specific stage (default: 1)"
     )
 
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        help="Write outputs to this directory instead of a new timestamped one"
+    )
+
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Print planned Claude calls, token usage and wall time, then exit (no API calls)"
+    )
+
     args = parser.parse_args()
 
+    if args.plan:
+        if not Path(args.config).exists():
+            print(f"❌ Error: Config file not found: {args.config}")
+            sys.exit(1)
+
+        import yaml
+        from pipelines.planner import format_plan, plan_pitch
+
+        with open(args.config) as f:
+            config = yaml.safe_load(f)
+        print(format_plan(plan_pitch(config, args.start_from_stage)))
+        return
+
     # Check for API key
     if not os.getenv("ANTHROPIC_API_KEY"):
         print("❌ Error: ANTHROPIC_API_KEY not found in environment")
@@ -54,9 +77,11 @@ def main():
         print("Please create the config file with your input variables")
         sys.exit(1)
 
-    # Run pipeline
+    # Run pipeline (imported after validation so argument errors return immediately)
     try:
-        pipeline = PitchToShotlistPipeline(args.config, args.start_from_stage)
+        from pipelines.pitch_to_shotlist import PitchToShotlistPipeline
+
+        pipeline = PitchToShotlistPipeline(args.config, args.start_from_stage, args.output_dir)
         pipeline.run()
     except KeyboardInterrupt:
         print("\n\n⚠️  Pipeline interrupted by user")